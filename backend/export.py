@@ -0,0 +1,67 @@
+"""
+Bulk export: every matching article as NDJSON, streamed.
+
+The index is walked with the same keyset order and cursor as the list
+endpoints (backend/pagination.py), one page of EXPORT_PAGE_SIZE at a time.
+While a page is being encoded and sent, the next one is already being
+fetched; at most two pages are held in memory whatever the result size.
+Pages go straight to the search backend: an export would only flush the
+query cache.
+
+With gzip the stream is one gzip member compressed incrementally and sent
+as an application/gzip file download (news.ndjson.gz), not with
+Content-Encoding: clients and proxies leave the bytes alone, so the saved
+file really is gzip. Decode it with gunzip or zcat.
+"""
+import zlib
+import asyncio
+from typing import Optional
+
+from backend.filters import and_filters
+from backend.pagination import PAGE_ORDER, PAGE_SELECT, Cursor, keyset_filter
+from backend.serializers import dumps, to_article
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+GZIP_MEDIA_TYPE = "application/gzip"
+
+
+def export_payload(query: str, filters: Optional[str], after: Optional[Cursor], page_size: int) -> dict:
+    payload = {"search": query, "top": page_size, "orderby": PAGE_ORDER, "select": PAGE_SELECT}
+    flt = and_filters(filters, keyset_filter(after) if after else None)
+    if flt:
+        payload["filter"] = flt
+    return payload
+
+
+async def export_stream(
+    fetch,
+    query: str = "*",
+    filters: Optional[str] = None,
+    after: Optional[Cursor] = None,
+    page_size: int = 1000,
+    compress: bool = False,
+):
+    """Yields NDJSON chunks, one per page; `await fetch(payload)` → (raw, body)."""
+    gz = zlib.compressobj(6, zlib.DEFLATED, 31) if compress else None
+    pending = asyncio.ensure_future(fetch(export_payload(query, filters, after, page_size)))
+    try:
+        while pending is not None:
+            _, body = await pending
+            docs = body.get("value", [])
+            pending = None
+            if len(docs) == page_size:
+                last = docs[-1]["content"]
+                pending = asyncio.ensure_future(
+                    fetch(export_payload(query, filters, Cursor(last["published"], last["id"]), page_size))
+                )
+            chunk = b"".join(dumps(to_article(d)) + b"\n" for d in docs)
+            if gz is not None:
+                chunk = gz.compress(chunk)
+            if chunk:
+                yield chunk
+        if gz is not None:
+            yield gz.flush()
+    finally:
+        # İstemci koparsa önceden başlatılan sayfa isteği de iptal
+        if pending is not None:
+            pending.cancel()
@@ -0,0 +1,90 @@
+"""
+OData filter builder for the list, query and stats endpoints.
+
+Every user value reaches Azure Search as an escaped string literal (quotes
+doubled), so a value can never close the literal and add clauses of its own.
+All filters of a request are compiled into one `$filter`, evaluated inside
+the index; only matching documents leave it.
+"""
+from typing import Optional
+from datetime import datetime
+
+from fastapi import HTTPException, Query
+
+SENTIMENTS = ["positive", "neutral", "negative"]
+
+
+def odata_string(value: str) -> str:
+    return "'" + value.replace("'", "''") + "'"
+
+
+def and_filters(*filters: Optional[str]) -> Optional[str]:
+    parts = [f"({f})" for f in filters if f]
+    return " and ".join(parts) or None
+
+
+def eq(field: str, value: Optional[str]) -> Optional[str]:
+    return value and f"{field} eq {odata_string(value)}"
+
+
+def phrase_match(field: str, phrase: Optional[str]) -> Optional[str]:
+    if not phrase:
+        return None
+    # Önce simple query syntax içinde tırnaklı ifade, sonra OData literal'i
+    quoted = '"' + phrase.replace("\\", "\\\\").replace('"', '\\"') + '"'
+    return f"search.ismatch({odata_string(quoted)}, {odata_string(field)})"
+
+
+def iso_date(value: Optional[str], name: str) -> Optional[str]:
+    if not value:
+        return None
+    try:
+        datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"{name} must be an ISO 8601 date")
+    return value
+
+
+class NewsFilter:
+    def __init__(
+        self,
+        q: str = "*",
+        sentiment: Optional[str] = None,
+        category: Optional[str] = None,
+        source: Optional[str] = None,
+        start: Optional[str] = None,
+        end: Optional[str] = None,
+        keyphrase: Optional[str] = None,
+    ):
+        if sentiment and sentiment not in SENTIMENTS:
+            raise HTTPException(status_code=400, detail=f"sentiment must be one of {', '.join(SENTIMENTS)}")
+        self.q = q or "*"
+        self.sentiment = sentiment
+        self.category = category
+        self.source = source
+        self.start = iso_date(start, "start")
+        self.end = iso_date(end, "end")
+        self.keyphrase = keyphrase
+
+    def to_odata(self) -> Optional[str]:
+        return and_filters(
+            eq("content/sentiment", self.sentiment),
+            eq("content/category", self.category),
+            eq("content/source", self.source),
+            self.start and f"content/published ge {odata_string(self.start)}",
+            self.end and f"content/published le {odata_string(self.end)}",
+            phrase_match("content/keyphrases", self.keyphrase),
+        )
+
+
+def news_filter(
+    q: str = Query("*", description="Search query"),
+    sentiment: Optional[str] = Query(None, enum=SENTIMENTS),
+    category: Optional[str] = None,
+    source: Optional[str] = None,
+    start: Optional[str] = Query(None, description="Published on or after (ISO 8601)"),
+    end: Optional[str] = Query(None, description="Published on or before (ISO 8601)"),
+    keyphrase: Optional[str] = None,
+) -> NewsFilter:
+    """FastAPI dependency: the filter query parameters shared by /query and /stats."""
+    return NewsFilter(q, sentiment, category, source, start, end, keyphrase)
@@ -0,0 +1,477 @@
+"""
+In-memory search index over the ingester's article documents.
+
+Answers the same request payloads the backend sends to Azure Search
+(`search`, `filter`, `orderby`, `top`, `skip`, `select`, `count`, `facets`)
+with the same response shape, so everything above `post_search()` (cache,
+pagination, stats, batch lookups) works unchanged on top of it.
+
+* Full text: BM25F over title, keyphrases and summary (k1=1.2, b=0.75, the
+  Azure defaults), any-term matching like searchMode=any.
+* Filters: the OData subset the backend produces — eq/ne/lt/le/gt/ge,
+  and/or/not, parentheses, search.in() and search.ismatch().
+* Filtering, sorting and facets work on numpy columns, so a filtered page
+  costs a few vectorised passes over the corpus, not a Python loop per doc.
+
+Documents are added and replaced one at a time; postings only ever grow and
+replaced or removed documents are masked out until the next compact().
+"""
+import re
+import math
+from array import array
+from collections import Counter
+
+import numpy as np
+
+K1 = 1.2
+B = 0.75
+# BM25F alan ağırlıkları
+FIELD_WEIGHTS = {"title": 3.0, "keyphrases": 2.0, "summary": 1.0}
+# Filtre / sıralama / facet için sütun tutulan alanlar
+COLUMNS = ("id", "url", "title", "source", "published", "sentiment", "category", "engine")
+# Türetilmiş sütunlar → kaynak alan
+DERIVED_COLUMNS = {"published_day": "published", "keyphrase_count": "keyphrases"}
+DEFAULT_FACET_COUNT = 10
+
+_TOKEN = re.compile(r"\w+")
+
+
+def tokenize(text) -> list:
+    if isinstance(text, list):
+        text = " ".join(t for t in text if t)
+    return _TOKEN.findall((text or "").lower())
+
+
+class QueryError(ValueError):
+    """A search, filter, orderby or facet expression this index cannot evaluate."""
+
+
+class LocalIndex:
+    def __init__(self):
+        self.keys = []          # doc no → document key
+        self.docs = []          # doc no → article dict (build_doc şekli)
+        self.positions = {}     # key → doc no
+        self.live = bytearray()
+        self.postings = {f: {} for f in FIELD_WEIGHTS}   # field → term → (doc nos, tfs)
+        self.lengths = {f: array("I") for f in FIELD_WEIGHTS}
+        self.length_sums = {f: 0 for f in FIELD_WEIGHTS}
+        self._columns = None
+        self._filters = {}
+
+    def __len__(self) -> int:
+        return len(self.positions)
+
+    # ── Yazma ────────────────────────────────────────────
+    def add(self, key: str, doc: dict):
+        """Adds or replaces the document stored under `key`."""
+        self.remove(key)
+        no = len(self.docs)
+        self.keys.append(key)
+        self.docs.append(doc)
+        self.positions[key] = no
+        self.live.append(1)
+        for field, postings in self.postings.items():
+            counts = Counter(tokenize(doc.get(field)))
+            length = sum(counts.values())
+            self.lengths[field].append(length)
+            self.length_sums[field] += length
+            for term, tf in counts.items():
+                entry = postings.get(term)
+                if entry is None:
+                    entry = postings[term] = (array("i"), array("H"))
+                entry[0].append(no)
+                entry[1].append(min(tf, 0xFFFF))
+        self._changed()
+
+    def remove(self, key: str) -> bool:
+        no = self.positions.pop(key, None)
+        if no is None:
+            return False
+        self.live[no] = 0
+        for field in self.postings:
+            self.length_sums[field] -= self.lengths[field][no]
+        self._changed()
+        return True
+
+    def get(self, key: str):
+        no = self.positions.get(key)
+        return None if no is None else self.docs[no]
+
+    def compact(self):
+        """Rebuilds the postings without replaced and removed documents."""
+        live = [(self.keys[no], self.docs[no]) for no in sorted(self.positions.values())]
+        self.__init__()
+        for key, doc in live:
+            self.add(key, doc)
+
+    @property
+    def garbage(self) -> int:
+        return len(self.docs) - len(self.positions)
+
+    def _changed(self):
+        self._columns = None
+
+    # ── Sütunlar ─────────────────────────────────────────
+    def codes(self, field: str):
+        """
+        (sorted distinct values, code per doc no) for a column. Codes follow
+        the value order, so comparisons, sorting and facets run on ints.
+        """
+        if field in DERIVED_COLUMNS:
+            source = DERIVED_COLUMNS[field]
+        elif field in COLUMNS:
+            source = field
+        else:
+            raise QueryError(f"content/{field} is not filterable, sortable or facetable")
+        if self._columns is None:
+            self._columns = {}
+        cached = self._columns.get(field)
+        if cached is None:
+            if field == "keyphrase_count":
+                # Eski belgelerde alan yok; listeden say
+                values = np.array([str(len(d.get(source) or [])) for d in self.docs], dtype=str)
+            else:
+                values = np.array([str(d.get(source) or "") for d in self.docs], dtype=str)
+            if field == "published_day":
+                values = values.astype("<U10")
+            uniques, codes = np.unique(values, return_inverse=True)
+            cached = self._columns[field] = (uniques, codes.astype(np.int64))
+        return cached
+
+    def rank(self, field: str) -> np.ndarray:
+        """Sort rank of every document's value; equal values share a rank."""
+        return self.codes(field)[1]
+
+    def compare(self, field: str, op: str, value: str) -> np.ndarray:
+        uniques, codes = self.codes(field)
+        left = np.searchsorted(uniques, value, "left")
+        right = np.searchsorted(uniques, value, "right")
+        if op == "eq":
+            return codes == left if left < right else np.zeros(len(codes), dtype=np.bool_)
+        if op == "ne":
+            return codes != left if left < right else np.ones(len(codes), dtype=np.bool_)
+        if op == "lt":
+            return codes < left
+        if op == "le":
+            return codes < right
+        if op == "gt":
+            return codes >= right
+        return codes >= left  # ge
+
+    def isin(self, field: str, values: list) -> np.ndarray:
+        uniques, codes = self.codes(field)
+        found = np.zeros(len(uniques), dtype=np.bool_)
+        if len(uniques) and values:
+            wanted = np.array(values, dtype=str)
+            pos = np.minimum(np.searchsorted(uniques, wanted), len(uniques) - 1)
+            found[pos[uniques[pos] == wanted]] = True
+        return found[codes]
+
+    def live_mask(self) -> np.ndarray:
+        return np.frombuffer(bytes(self.live), dtype=np.bool_) if self.live else np.zeros(0, dtype=np.bool_)
+
+    # ── Tam metin ────────────────────────────────────────
+    def scores(self, text: str) -> np.ndarray:
+        """BM25F score per doc no; 0 where no query term occurs."""
+        n = len(self.docs)
+        total = np.zeros(n, dtype=np.float64)
+        live = self.live_mask()
+        count = max(1, len(self.positions))
+        norms = {}
+        for field in FIELD_WEIGHTS:
+            avg = self.length_sums[field] / count or 1.0
+            lengths = np.frombuffer(self.lengths[field], dtype=np.uint32) if n else np.zeros(0)
+            norms[field] = 1 - B + B * lengths / avg
+        for term in set(tokenize(text)):
+            tf = np.zeros(n, dtype=np.float64)
+            for field, weight in FIELD_WEIGHTS.items():
+                entry = self.postings[field].get(term)
+                if entry is None:
+                    continue
+                nos = np.frombuffer(entry[0], dtype=np.int32)
+                tfs = np.frombuffer(entry[1], dtype=np.uint16)
+                tf[nos] += weight * tfs / norms[field][nos]
+            tf[~live] = 0
+            df = np.count_nonzero(tf)
+            if not df:
+                continue
+            idf = math.log(1 + (count - df + 0.5) / (df + 0.5))
+            total += idf * tf * (K1 + 1) / (tf + K1)
+        return total
+
+    def phrase_mask(self, phrase: str, fields) -> np.ndarray:
+        """Docs where `phrase` occurs as consecutive tokens in one of `fields`."""
+        terms = tokenize(phrase)
+        mask = np.zeros(len(self.docs), dtype=np.bool_)
+        if not terms:
+            return mask
+        for field in fields:
+            if field not in self.postings:
+                raise QueryError(f"content/{field} is not searchable")
+            entries = [self.postings[field].get(t) for t in terms]
+            if any(e is None for e in entries):
+                continue
+            candidates = set(entries[0][0])
+            for e in entries[1:]:
+                candidates.intersection_update(e[0])
+            for no in candidates:
+                if _contains(tokenize(self.docs[no].get(field)), terms):
+                    mask[no] = True
+        return mask
+
+    # ── Sorgu ────────────────────────────────────────────
+    def search(self, payload: dict) -> dict:
+        text = (payload.get("search") or "*").strip()
+        mask = self.live_mask()
+        scores = None
+        if text not in ("*", ""):
+            scores = self.scores(text)
+            mask = mask & (scores > 0)
+        if payload.get("filter"):
+            mask = mask & self._filter(payload["filter"])(self)
+
+        body = {}
+        if payload.get("count"):
+            body["@odata.count"] = int(np.count_nonzero(mask))
+        if payload.get("facets"):
+            body["@search.facets"] = {
+                f"content/{field}": values
+                for field, values in (self._facet(spec, mask) for spec in payload["facets"])
+            }
+        skip, top = int(payload.get("skip") or 0), int(payload.get("top", 50))
+        nos = self._order(np.flatnonzero(mask), payload.get("orderby"), scores, skip + top)[skip:]
+        select = _select_fields(payload.get("select"))
+        body["value"] = [self._hit(no, select, scores) for no in nos]
+        return body
+
+    def lookup(self, key: str, select: str = None):
+        no = self.positions.get(key)
+        return None if no is None else self._hit(no, _select_fields(select), None)
+
+    def _hit(self, no: int, select, scores) -> dict:
+        doc = self.docs[no]
+        hit = {"content": doc if select is None else {f: doc.get(f) for f in select}}
+        if scores is not None:
+            hit["@search.score"] = float(scores[no])
+        return hit
+
+    def _filter(self, expression: str):
+        compiled = self._filters.get(expression)
+        if compiled is None:
+            if len(self._filters) > 1000:
+                self._filters.clear()
+            compiled = self._filters[expression] = _FilterParser(expression).parse()
+        return compiled
+
+    def _order(self, nos: np.ndarray, orderby: str, scores, limit: int) -> list:
+        if not len(nos) or limit <= 0:
+            return []
+        keys = []
+        for clause in (orderby or "").split(","):
+            parts = clause.split()
+            if not parts:
+                continue
+            field, desc = parts[0], len(parts) > 1 and parts[1].lower() == "desc"
+            if field == "search.score()":
+                if scores is None:
+                    continue
+                keys.append((np.unique(scores[nos], return_inverse=True)[1], desc))
+                continue
+            if not field.startswith("content/"):
+                raise QueryError(f"Cannot sort by {field}")
+            keys.append((self.rank(field[len("content/"):])[nos], desc))
+        if not keys and scores is not None:
+            keys.append((np.unique(scores[nos], return_inverse=True)[1], True))
+        if not keys:
+            return nos[:limit].tolist()
+
+        # Rank'ler tek int64 anahtarda birleşir; desc alanlar ters çevrilir
+        composite = np.zeros(len(nos), dtype=np.int64)
+        for ranks, desc in keys:
+            size = int(ranks.max()) + 1
+            composite = composite * size + (size - 1 - ranks if desc else ranks)
+        if limit < len(nos):
+            top = np.argpartition(composite, limit - 1)[:limit]
+            top = top[np.lexsort((nos[top], composite[top]))]
+        else:
+            top = np.lexsort((nos, composite))
+        return nos[top].tolist()
+
+    def _facet(self, spec: str, mask: np.ndarray):
+        field, *options = [p.strip() for p in spec.split(",")]
+        opts = dict(o.split(":", 1) for o in options)
+        if not field.startswith("content/"):
+            raise QueryError(f"Cannot facet on {field}")
+        field = field[len("content/"):]
+        column = field
+        if "interval" in opts:
+            if opts["interval"] != "day" or field != "published":
+                raise QueryError(f"Unsupported facet interval: {spec}")
+            column = "published_day"
+        uniques, codes = self.codes(column)
+        counts = np.bincount(codes[mask], minlength=len(uniques))
+        present = np.flatnonzero(counts)
+        if "interval" in opts:
+            return field, [{"value": str(uniques[i]), "count": int(counts[i])} for i in present]
+        sort = opts.get("sort", "count")
+        if sort in ("count", "-count"):
+            # Sayıya göre, eşitlikte değere göre
+            present = present[np.lexsort((present, -counts[present] if sort == "count" else counts[present]))]
+        elif sort == "-value":
+            present = present[::-1]
+        present = present[: int(opts.get("count", DEFAULT_FACET_COUNT))]
+        return field, [{"value": str(uniques[i]), "count": int(counts[i])} for i in present]
+
+    # ── Snapshot ─────────────────────────────────────────
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state.update(_columns=None, _filters={})
+        return state
+
+
+def _contains(tokens: list, terms: list) -> bool:
+    n = len(terms)
+    return any(tokens[i:i + n] == terms for i in range(len(tokens) - n + 1))
+
+
+def _select_fields(select: str):
+    if not select:
+        return None
+    fields = []
+    for path in select.split(","):
+        path = path.strip()
+        if path.startswith("content/"):
+            fields.append(path[len("content/"):])
+    return fields
+
+
+# ──────────────────────────────────────────────────────────
+# OData $filter alt kümesi → numpy maske
+# ──────────────────────────────────────────────────────────
+_FILTER_TOKEN = re.compile(r"\s*(?:(?P<str>'(?:[^']|'')*')|(?P<op>[(),])|(?P<word>[\w./]+(?:\(\))?))")
+_COMPARE = {"eq", "ne", "lt", "le", "gt", "ge"}
+
+
+class _FilterParser:
+    """Recursive descent over the filters the backend builds; returns index → mask."""
+
+    def __init__(self, expression: str):
+        self.tokens = self._lex(expression)
+        self.pos = 0
+
+    @staticmethod
+    def _lex(expression: str) -> list:
+        tokens, pos = [], 0
+        expression = expression.rstrip()
+        while pos < len(expression):
+            m = _FILTER_TOKEN.match(expression, pos)
+            if m is None or m.end() == pos:
+                raise QueryError(f"Invalid filter near: {expression[pos:pos + 20]!r}")
+            if m.group("str") is not None:
+                tokens.append(("str", m.group("str")[1:-1].replace("''", "'")))
+            elif m.group("op") is not None:
+                tokens.append(("op", m.group("op")))
+            else:
+                tokens.append(("word", m.group("word")))
+            pos = m.end()
+        return tokens
+
+    def parse(self):
+        node = self._or()
+        if self.pos != len(self.tokens):
+            raise QueryError(f"Unexpected {self.tokens[self.pos][1]!r} in filter")
+        return node
+
+    def _peek(self):
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else (None, None)
+
+    def _next(self, kind=None, value=None):
+        tok = self._peek()
+        if tok[0] is None or (kind and tok[0] != kind) or (value and tok[1] != value):
+            raise QueryError(f"Expected {value or kind} in filter, got {tok[1]!r}")
+        self.pos += 1
+        return tok[1]
+
+    def _keyword(self, word: str) -> bool:
+        kind, value = self._peek()
+        if kind == "word" and value.lower() == word:
+            self.pos += 1
+            return True
+        return False
+
+    def _or(self):
+        nodes = [self._and()]
+        while self._keyword("or"):
+            nodes.append(self._and())
+        if len(nodes) == 1:
+            return nodes[0]
+        return lambda ix: np.logical_or.reduce([n(ix) for n in nodes])
+
+    def _and(self):
+        nodes = [self._not()]
+        while self._keyword("and"):
+            nodes.append(self._not())
+        if len(nodes) == 1:
+            return nodes[0]
+        return lambda ix: np.logical_and.reduce([n(ix) for n in nodes])
+
+    def _not(self):
+        if self._keyword("not"):
+            node = self._not()
+            return lambda ix: ~node(ix)
+        return self._primary()
+
+    def _primary(self):
+        kind, value = self._peek()
+        if kind == "op" and value == "(":
+            self._next()
+            node = self._or()
+            self._next("op", ")")
+            return node
+        word = self._next("word")
+        if word.lower() == "search.in":
+            return self._search_in()
+        if word.lower() == "search.ismatch":
+            return self._search_ismatch()
+        field = self._field(word)
+        op = self._next("word").lower()
+        if op not in _COMPARE:
+            raise QueryError(f"Unsupported operator {op!r} in filter")
+        literal = self._next("str")
+        return lambda ix: ix.compare(field, op, literal)
+
+    def _args(self) -> list:
+        self._next("op", "(")
+        args = [self._next()]
+        while self._peek() == ("op", ","):
+            self._next()
+            args.append(self._next())
+        self._next("op", ")")
+        return args
+
+    def _search_in(self):
+        field, values, *rest = self._args() + [None]
+        field = self._field(field)
+        delimiters = rest[0] if rest and rest[0] else " ,"
+        parts = re.split("|".join(re.escape(d) for d in delimiters), values)
+        wanted = [p for p in parts if p]
+        return lambda ix: ix.isin(field, wanted)
+
+    def _search_ismatch(self):
+        args = self._args()
+        query = args[0]
+        fields = [self._field(f.strip()) for f in args[1].split(",")] if len(args) > 1 else list(FIELD_WEIGHTS)
+        phrase = query.strip()
+        if phrase.startswith('"') and phrase.endswith('"') and len(phrase) > 1:
+            phrase = phrase[1:-1].replace('\\"', '"').replace("\\\\", "\\")
+            return lambda ix: ix.phrase_mask(phrase, fields)
+        # Tırnaksız: terimlerden herhangi biri
+        return lambda ix: np.logical_or.reduce(
+            [ix.phrase_mask(t, fields) for t in tokenize(phrase)] or [np.zeros(len(ix.docs), dtype=np.bool_)]
+        )
+
+    @staticmethod
+    def _field(path: str) -> str:
+        if not path or not path.startswith("content/"):
+            raise QueryError(f"Unknown field {path!r} in filter")
+        return path[len("content/"):]
@@ -1,11 +1,39 @@
 import os
-import requests
-from fastapi import FastAPI, Query
+import asyncio
+import binascii
+import importlib.util
+from contextlib import asynccontextmanager, suppress
+import httpx
+from fastapi import Body, Depends, FastAPI, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from dotenv import load_dotenv
-from typing import Optional
+from typing import List, Optional
 from datetime import datetime
 
+from backend.query_cache import QueryCache
+from backend.vectors import VectorSearch, download_store, fuse
+from backend.trending import TrendFeed, download_trends
+from backend.timeseries import RollupReader, blob_loader, check_dimension, date_range, dir_loader, series, totals
+from backend.search_backends import AzureSearchBackend, BlobSource, DirectorySource, LocalSearchBackend
+from backend.serializers import ARTICLE_SELECT, FastJSONResponse, dumps, to_article
+from backend.export import GZIP_MEDIA_TYPE, NDJSON_MEDIA_TYPE, export_stream
+from backend.stats import KEYPHRASE_FACET, dashboard_cards, stats_facets, stats_from_body
+from backend.filters import SENTIMENTS, NewsFilter, and_filters, news_filter, odata_string
+from backend.pagination import (
+    PAGE_ORDER,
+    PAGE_SELECT,
+    NEXT_CURSOR_HEADER,
+    TOTAL_COUNT_HEADER,
+    Cursor,
+    keyset_filter,
+    next_cursor,
+    page_response,
+)
+from cache_generation import read_generation_async
+from rollups import DIMENSIONS
+from doc_keys import key_to_url, to_key, url_to_key
+
 load_dotenv()
 
 SEARCH_ENDPOINT = os.getenv("SEARCH_ENDPOINT")
@@ -13,11 +41,164 @@ SEARCH_KEY      = os.getenv("SEARCH_KEY")
 
 INDEX_NAME  = "azureblob-index"
 API_VERSION = "2023-07-01-Preview"
+MAX_BATCH_IDS = 1000
+# Endpoint'lerin sayfa boyu sınırı; Azure Search tek istekte en fazla 1000 döndürür
+MAX_PAGE_SIZE = 1000
+# /export sayfa boyu; Azure Search tek istekte en fazla 1000 döndürür
+EXPORT_PAGE_SIZE = int(os.getenv("EXPORT_PAGE_SIZE", "1000"))
+
+# Azure Search bağlantı havuzu; tüm istekler aynı keep-alive bağlantıları kullanır
+SEARCH_POOL_SIZE       = int(os.getenv("SEARCH_POOL_SIZE", "100"))
+SEARCH_KEEPALIVE       = int(os.getenv("SEARCH_KEEPALIVE", "20"))
+SEARCH_TIMEOUT         = float(os.getenv("SEARCH_TIMEOUT", "10"))
+SEARCH_CONNECT_TIMEOUT = float(os.getenv("SEARCH_CONNECT_TIMEOUT", "3"))
+# HTTP/2 için h2 paketi gerekir (pip install "httpx[http2]"); yoksa HTTP/1.1
+SEARCH_HTTP2 = (
+    os.getenv("SEARCH_HTTP2", "1") != "0"
+    and importlib.util.find_spec("h2") is not None
+)
+
+
+# Sorgu sonuç cache'i (bkz. backend/query_cache.py)
+SEARCH_CACHE_TTL         = float(os.getenv("SEARCH_CACHE_TTL", "300"))
+SEARCH_CACHE_MAX_ENTRIES = int(os.getenv("SEARCH_CACHE_MAX_ENTRIES", "1000"))
+SEARCH_CACHE_MAX_MB      = float(os.getenv("SEARCH_CACHE_MAX_MB", "64"))
+REDIS_URL                = os.getenv("REDIS_URL")
+# Ingester'ın state container'daki generation sayacı; ayarlı değilse sadece TTL
+STORAGE_CONN_STR        = os.getenv("STORAGE_CONN_STR")
+STATE_CONTAINER         = os.getenv("STATE_CONTAINER") or f"{os.getenv('BLOB_CONTAINER', 'news')}-state"
+CACHE_GENERATION_POLL   = float(os.getenv("CACHE_GENERATION_POLL", "30"))
+
+# azure: Azure Search; local: süreç içi BM25 index (bkz. backend/search_backends.py)
+SEARCH_BACKEND        = os.getenv("SEARCH_BACKEND", "azure")
+# Doluysa dokümanlar bu klasörden, yoksa blob container'dan okunur
+LOCAL_SEARCH_DIR      = os.getenv("LOCAL_SEARCH_DIR")
+LOCAL_SEARCH_SNAPSHOT = os.getenv("LOCAL_SEARCH_SNAPSHOT")
+LOCAL_SEARCH_REFRESH  = float(os.getenv("LOCAL_SEARCH_REFRESH", "30"))
+
+# Embedding store'un yerel kopyası (bkz. backend/vectors.py)
+VECTOR_PATH    = os.getenv("VECTOR_PATH", ".cache/vectors")
+VECTOR_IVF_MIN = int(os.getenv("VECTOR_IVF_MIN", "50000"))
+VECTOR_NPROBE  = int(os.getenv("VECTOR_NPROBE", "32"))
+SEARCH_MODES   = ["keyword", "vector", "hybrid"]
+
+# Ingester'ın yazdığı trends.json'un yerel kopyası (bkz. backend/trending.py)
+TRENDS_SNAPSHOT_PATH = os.getenv("TRENDS_SNAPSHOT_PATH", ".cache/trends.json")
+# Günlük rollup'lar state container'dan; STORAGE_CONN_STR yoksa ingester'ın yerel kopyasından
+ROLLUP_DIR = os.getenv("ROLLUP_DIR", ".cache/rollups")
+
+
+def make_search_client() -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        base_url=SEARCH_ENDPOINT or "",
+        headers={"Content-Type": "application/json", "api-key": SEARCH_KEY or ""},
+        limits=httpx.Limits(
+            max_connections=SEARCH_POOL_SIZE,
+            max_keepalive_connections=SEARCH_KEEPALIVE,
+        ),
+        timeout=httpx.Timeout(SEARCH_TIMEOUT, connect=SEARCH_CONNECT_TIMEOUT),
+        http2=SEARCH_HTTP2,
+    )
+
+
+def make_search_backend():
+    if SEARCH_BACKEND == "local":
+        if LOCAL_SEARCH_DIR:
+            source = DirectorySource(LOCAL_SEARCH_DIR)
+        else:
+            source = BlobSource(STORAGE_CONN_STR, os.getenv("BLOB_CONTAINER", "news"))
+        return LocalSearchBackend.open(source, LOCAL_SEARCH_SNAPSHOT)
+    return AzureSearchBackend(make_search_client(), INDEX_NAME, API_VERSION)
+
+
+def make_query_cache() -> QueryCache:
+    return QueryCache.from_url(
+        REDIS_URL,
+        ttl=SEARCH_CACHE_TTL,
+        max_entries=SEARCH_CACHE_MAX_ENTRIES,
+        max_bytes=int(SEARCH_CACHE_MAX_MB * 1024 * 1024),
+    )
+
+
+async def watch_generation(cache: QueryCache, vectors: VectorSearch, trends: TrendFeed, rollups: RollupReader):
+    from azure.storage.blob.aio import ContainerClient
+
+    async with ContainerClient.from_connection_string(STORAGE_CONN_STR, STATE_CONTAINER) as container:
+        synced = False
+        while True:
+            try:
+                changed = cache.set_generation(await read_generation_async(container))
+                if changed:
+                    rollups.clear()
+                    print(f"Corpus generation {cache.generation}: search cache cleared")
+                # Embedding'ler de aynı run'da yazılır; ilk turda ve her değişimde çekilir
+                if changed or not synced:
+                    if await download_store(container, VECTOR_PATH):
+                        await asyncio.to_thread(vectors.reload)
+                    if await download_trends(container, TRENDS_SNAPSHOT_PATH):
+                        await asyncio.to_thread(trends.reload)
+                    synced = True
+            except Exception as e:  # bir sonraki turda tekrar dene
+                print(f"Generation check failed: {e}")
+            await asyncio.sleep(CACHE_GENERATION_POLL)
+
+
+async def watch_local_index(backend, cache: QueryCache):
+    while True:
+        await asyncio.sleep(LOCAL_SEARCH_REFRESH)
+        try:
+            if await backend.refresh():
+                # Redis'teki eski kayıtlar da eşleşmesin; sadece yereli temizlemek yetmez
+                cache.set_index_version(backend.version)
+        except Exception as e:  # bir sonraki turda tekrar dene
+            print(f"Local search index refresh failed: {e}")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    app.state.backend = make_search_backend()
+    app.state.cache = make_query_cache()
+    app.state.vectors = VectorSearch(VECTOR_PATH, VECTOR_IVF_MIN, VECTOR_NPROBE)
+    await asyncio.to_thread(app.state.vectors.reload)
+    app.state.trends = TrendFeed(TRENDS_SNAPSHOT_PATH)
+    await asyncio.to_thread(app.state.trends.reload)
+    rollup_container = None
+    if STORAGE_CONN_STR:
+        from azure.storage.blob.aio import ContainerClient
+
+        rollup_container = ContainerClient.from_connection_string(STORAGE_CONN_STR, STATE_CONTAINER)
+        app.state.rollups = RollupReader(blob_loader(rollup_container))
+    else:
+        # Yerel dosyalar ucuz ve her an değişebilir; cache'lenmez
+        app.state.rollups = RollupReader(dir_loader(ROLLUP_DIR), cache=False)
+    watchers = []
+    if STORAGE_CONN_STR:
+        watchers.append(asyncio.create_task(
+            watch_generation(app.state.cache, app.state.vectors, app.state.trends, app.state.rollups)
+        ))
+    if app.state.backend.name == "local":
+        await app.state.backend.refresh()
+        app.state.cache.set_index_version(app.state.backend.version)
+        if LOCAL_SEARCH_REFRESH > 0:
+            watchers.append(asyncio.create_task(watch_local_index(app.state.backend, app.state.cache)))
+    try:
+        yield
+    finally:
+        for watcher in watchers:
+            watcher.cancel()
+            with suppress(asyncio.CancelledError):
+                await watcher
+        await app.state.cache.close()
+        await app.state.backend.close()
+        if rollup_container is not None:
+            await rollup_container.close()
+
 
 app = FastAPI(
     title="NewsPulseAI Search API",
     description="Search and filter news articles indexed from Azure Blob Storage.",
     version="1.3.0",
+    lifespan=lifespan,
 )
 
 app.add_middleware(
@@ -25,175 +206,393 @@ app.add_middleware(
     allow_origins=["*"],
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, TOTAL_COUNT_HEADER],
 )
 
 # ──────────────────────────────────────────────────────────
 # 🔎 Generic Azure Search helper
 # ──────────────────────────────────────────────────────────
-def azure_search(
+async def azure_search(
     query: str = "*",
     top: int = 25,
     filters: Optional[str] = None,
     orderby: Optional[str] = None,
+    select: Optional[str] = ARTICLE_SELECT,
 ):
-    url = f"{SEARCH_ENDPOINT}/indexes/{INDEX_NAME}/docs/search?api-version={API_VERSION}"
-    headers = {
-        "Content-Type": "application/json",
-        "api-key": SEARCH_KEY,
-    }
+    body = await search_body(query, top, filters, orderby, select)
+    return body.get("value", [])
+
+
+async def search_body(
+    query: str = "*",
+    top: int = 25,
+    filters: Optional[str] = None,
+    orderby: Optional[str] = None,
+    select: Optional[str] = ARTICLE_SELECT,
+    count: bool = False,
+    facets: Optional[List[str]] = None,
+) -> dict:
+    """Whole Search response (value, @odata.count, @search.facets), through the result cache."""
     payload: dict = {"search": query, "top": top}
+    # Sadece gereken alanlar gelsin; index'in metadata_* alanları taşınmaz
+    if select:
+        payload["select"] = select
     if filters:
         payload["filter"] = filters
     if orderby:
         payload["orderby"] = orderby
+    if count:
+        payload["count"] = True
+    if facets:
+        payload["facets"] = facets
+    return await app.state.cache.get_or_fetch(payload, post_search)
+
+
+async def fetch_page(
+    query: str = "*",
+    top: int = 25,
+    filters: Optional[str] = None,
+    cursor: Optional[str] = None,
+):
+    """(docs, total, next cursor) of one keyset page; see backend/pagination.py."""
+    after = Cursor.decode(cursor) if cursor else None
+    if after is not None:
+        filters = and_filters(filters, keyset_filter(after))
+    # $count sadece ilk sayfada; sonraki sayfalara cursor taşır
+    body = await search_body(query, top, filters, PAGE_ORDER, PAGE_SELECT, count=after is None)
+    total = body.get("@odata.count") if after is None else after.total
+    docs = body.get("value", [])
+    return docs, total, next_cursor(docs, top, total)
+
+
+async def search_page(
+    query: str = "*",
+    top: int = 25,
+    filters: Optional[str] = None,
+    cursor: Optional[str] = None,
+):
+    """One page of a list endpoint, cursor and total in the response headers."""
+    docs, total, _ = await fetch_page(query, top, filters, cursor)
+    return page_response(docs, top, total)
+
+
+async def fetch_stats(query: str = "*", filters: Optional[str] = None) -> dict:
+    """Facet counts of the (filtered) index; avg_keyphrases is None if the index cannot facet on it."""
+    keyphrases = getattr(app.state, "keyphrase_facet", KEYPHRASE_FACET)
+    # top=0: doküman taşınmaz, sadece sayım ve facet'ler
+    try:
+        body = await search_body(query=query, top=0, filters=filters, select=None, count=True,
+                                 facets=stats_facets(keyphrases))
+    except (httpx.HTTPStatusError, HTTPException) as e:
+        status = e.response.status_code if isinstance(e, httpx.HTTPStatusError) else e.status_code
+        if not keyphrases or status != 400:
+            raise
+        # Index'te content/keyphrase_count yok; facet'siz tekrar dene
+        body = await search_body(query=query, top=0, filters=filters, select=None, count=True,
+                                 facets=stats_facets(False))
+        app.state.keyphrase_facet = False
+        print(f"Keyphrase facet rejected by the search index, disabled: {e}")
+    return stats_from_body(body)
+
+
+async def post_search(payload: dict):
+    """(raw body, parsed body) straight from the search backend, bypassing the cache."""
+    return await app.state.backend.search(payload)
+
 
-    resp = requests.post(url, headers=headers, json=payload)
-    resp.raise_for_status()
-    return resp.json().get("value", [])
+def lookup_payload(key: str) -> dict:
+    # Tekil ve toplu lookup aynı cache kaydını paylaşır
+    return {"lookup": key, "select": ARTICLE_SELECT}
+
+
+async def lookup_document(key: str):
+    """
+    Document by index key (GET /docs/{key}), through the result cache; None
+    if missing. Falls back to a content/id filter for indexes whose key is
+    not base64(URL) (see doc_keys.py).
+    """
+    return await app.state.cache.get_or_fetch(lookup_payload(key), fetch_document)
+
+
+async def fetch_document(payload: dict):
+    raw, doc = await app.state.backend.lookup(payload["lookup"], payload["select"])
+    if doc is None:
+        raw, doc = await find_by_url(payload)
+    return raw, doc
+
+
+async def find_by_url(payload: dict):
+    """(raw, doc) of the article whose content/id is the key's URL; (b"", None) if none."""
+    try:
+        url = key_to_url(payload["lookup"])
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        return b"", None
+    _, body = await post_search({
+        "search": "*",
+        "top": 1,
+        "filter": f"content/id eq {odata_string(url)}",
+        "select": payload["select"],
+    })
+    docs = body.get("value", [])
+    return (dumps(docs[0]), docs[0]) if docs else (b"", None)
+
+
+async def lookup_documents(keys: List[str]) -> list:
+    """Batch lookup: cached keys are served locally, the rest in one search.in() query."""
+    return await app.state.cache.get_or_fetch_many([lookup_payload(k) for k in keys], fetch_documents)
+
+
+async def fetch_documents(payloads: list) -> list:
+    urls = {}
+    for p in payloads:
+        try:
+            urls[p["lookup"]] = key_to_url(p["lookup"])
+        except (binascii.Error, UnicodeDecodeError, ValueError):
+            pass  # geçersiz key → bulunamadı
+    if not urls:
+        return [None] * len(payloads)
+    # search.in ayırıcısı değerlerin hiçbirinde geçmemeli
+    delimiter = next((d for d in ("|", "~", "^", "\t") if not any(d in u for u in urls.values())), None)
+    if delimiter is None:
+        return await asyncio.gather(*(fetch_document(p) for p in payloads))
+    values = delimiter.join(u.replace("'", "''") for u in urls.values())
+    # Cache'i atlar: sonuçlar aşağıda tek tek lookup kaydı olarak saklanır
+    _, body = await post_search({
+        "search": "*",
+        "top": len(urls),
+        "filter": f"search.in(content/id, '{values}', '{delimiter}')",
+        "select": f"{ARTICLE_SELECT}, content/id",
+    })
+    by_url = {d["content"]["id"]: d for d in body.get("value", [])}
+    out = []
+    for p in payloads:
+        doc = by_url.get(urls.get(p["lookup"]))
+        out.append(None if doc is None else (dumps(doc), doc))
+    return out
 
 # ──────────────────────────────────────────────────────────
 # 📄 Endpoints
 # ──────────────────────────────────────────────────────────
 @app.get("/news", summary="List all news (latest first)", tags=["News"])
-def get_news(top: int = 25):
-    docs = azure_search(top=top, orderby="content/published desc")
-    return [
-        {
-            "title":       d["content"]["title"],
-            "source":      d["content"]["source"],
-            "date":        d["content"]["published"],
-            "sentiment":   d["content"]["sentiment"],
-            "summary":     d["content"]["summary"],
-            "url":         d["content"]["url"],
-            "keyphrases":  d["content"]["keyphrases"],
-            "category":    d["content"].get("category", "general"),
-        }
-        for d in docs
-    ]
-
-
-@app.get("/search", summary="Search news by keyword", tags=["News"])
-def search_news(q: str = Query(..., description="Search query"), top: int = 10):
-    docs = azure_search(query=q, top=top, orderby="content/published desc")
-    return [
-        {
-            "title":       d["content"]["title"],
-            "source":      d["content"]["source"],
-            "date":        d["content"]["published"],
-            "sentiment":   d["content"]["sentiment"],
-            "summary":     d["content"]["summary"],
-            "url":         d["content"]["url"],
-            "keyphrases":  d["content"]["keyphrases"],
-            "category":    d["content"].get("category", "general"),
-        }
-        for d in docs
-    ]
+async def get_news(top: int = Query(25, ge=1, le=MAX_PAGE_SIZE), cursor: Optional[str] = None):
+    return await search_page(top=top, cursor=cursor)
+
+
+@app.get("/search", summary="Search news by keyword, by meaning (vector) or both", tags=["News"])
+async def search_news(
+    q: str = Query(..., description="Search query"),
+    top: int = Query(10, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    mode: str = Query("keyword", enum=SEARCH_MODES),
+):
+    if mode == "keyword":
+        return await search_page(query=q, top=top, cursor=cursor)
+    if cursor:
+        raise HTTPException(status_code=400, detail=f"mode={mode} returns a single ranked page; cursor is not supported")
+    vectors = require_vectors()
+    hits = await asyncio.to_thread(vectors.query, q, top)
+    if mode == "vector":
+        return await ranked_articles([k for k, _ in hits], dict(hits))
+    # hybrid: keyword ve vektör sıralamaları RRF ile birleşir
+    body = await search_body(q, top, select=PAGE_SELECT)
+    keyword_docs = {url_to_key(d["content"]["id"]): d for d in body.get("value", [])}
+    keys = fuse(list(keyword_docs), [k for k, _ in hits])[:top]
+    return await ranked_articles(keys, dict(hits), keyword_docs)
+
+
+def require_vectors() -> VectorSearch:
+    vectors = app.state.vectors
+    if not vectors.available:
+        raise HTTPException(status_code=503, detail="Vector index is not available")
+    return vectors
+
+
+async def ranked_articles(keys: list, scores: dict, known: dict = None) -> FastJSONResponse:
+    """Articles for `keys` in that order; `score` is the vector similarity where there is one."""
+    known = known or {}
+    missing = [k for k in keys if k not in known]
+    found = dict(zip(missing, await lookup_documents(missing))) if missing else {}
+    out = []
+    for key in keys:
+        doc = known.get(key) or found.get(key)
+        if doc is None:
+            continue  # vektörü olup index'ten silinmiş
+        article = to_article(doc)
+        if key in scores:
+            article["score"] = round(scores[key], 4)
+        out.append(article)
+    return FastJSONResponse(out)
 
 
 @app.get("/sentiment", summary="Filter news by sentiment", tags=["News"])
-def sentiment_news(
-    type: str = Query("positive", enum=["positive", "neutral", "negative"]),
-    top: int = 20,
+async def sentiment_news(
+    type: str = Query("positive", enum=SENTIMENTS),
+    top: int = Query(20, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
 ):
-    flt  = f"content/sentiment eq '{type}'"
-    docs = azure_search(top=top, filters=flt, orderby="content/published desc")
-    return [
-        {
-            "title":       d["content"]["title"],
-            "source":      d["content"]["source"],
-            "date":        d["content"]["published"],
-            "sentiment":   d["content"]["sentiment"],
-            "summary":     d["content"]["summary"],
-            "url":         d["content"]["url"],
-            "keyphrases":  d["content"]["keyphrases"],
-            "category":    d["content"].get("category", "general"),
-        }
-        for d in docs
-    ]
+    flt  = NewsFilter(sentiment=type).to_odata()
+    return await search_page(top=top, filters=flt, cursor=cursor)
 
 
 @app.get("/date", summary="Filter news by date range (ISO8601)", tags=["News"])
-def date_news(start: str, end: str, top: int = 20):
-    flt  = f"content/published ge '{start}' and content/published le '{end}'"
-    docs = azure_search(top=top, filters=flt, orderby="content/published desc")
-    return [
-        {
-            "title":       d["content"]["title"],
-            "source":      d["content"]["source"],
-            "date":        d["content"]["published"],
-            "sentiment":   d["content"]["sentiment"],
-            "summary":     d["content"]["summary"],
-            "url":         d["content"]["url"],
-            "keyphrases":  d["content"]["keyphrases"],
-            "category":    d["content"].get("category", "general"),
-        }
-        for d in docs
-    ]
+async def date_news(
+    start: str,
+    end: str,
+    top: int = Query(20, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+):
+    flt  = NewsFilter(start=start, end=end).to_odata()
+    return await search_page(top=top, filters=flt, cursor=cursor)
 
 
 @app.get("/keyphrase", summary="Filter news by keyphrase", tags=["News"])
-def keyphrase_news(kw: str, top: int = 20):
-    docs = azure_search(query=kw, top=top, orderby="content/published desc")
-    return [
-        {
-            "title":       d["content"]["title"],
-            "source":      d["content"]["source"],
-            "date":        d["content"]["published"],
-            "sentiment":   d["content"]["sentiment"],
-            "summary":     d["content"]["summary"],
-            "url":         d["content"]["url"],
-            "keyphrases":  d["content"]["keyphrases"],
-            "category":    d["content"].get("category", "general"),
-        }
-        for d in docs
-    ]
+async def keyphrase_news(
+    kw: str,
+    top: int = Query(20, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+):
+    return await search_page(query=kw, top=top, cursor=cursor)
 
 
 @app.get("/category", summary="Filter news by category", tags=["News"])
-def category_news(category: str = Query(...), top: int = 20):
-    flt  = f"content/category eq '{category}'"
-    docs = azure_search(top=top, filters=flt, orderby="content/published desc")
-    return [
-        {
-            "title":       d["content"]["title"],
-            "source":      d["content"]["source"],
-            "date":        d["content"]["published"],
-            "sentiment":   d["content"]["sentiment"],
-            "summary":     d["content"]["summary"],
-            "url":         d["content"]["url"],
-            "keyphrases":  d["content"]["keyphrases"],
-            "category":    d["content"].get("category", "general"),
-        }
-        for d in docs
-    ]
-
-
-@app.get("/news/{id}", summary="Get news by ID (URL)", tags=["News"])
-def get_news_by_id(id: str):
-    docs = azure_search(query=id, top=1)
-    if not docs:
-        return {"error": "Not found"}
-    d = docs[0]
-    return {
-        "title":      d["content"]["title"],
-        "source":     d["content"]["source"],
-        "date":       d["content"]["published"],
-        "sentiment":  d["content"]["sentiment"],
-        "summary":    d["content"]["summary"],
-        "url":        d["content"]["url"],
-        "keyphrases": d["content"]["keyphrases"],
-        "category":   d["content"].get("category", "general"),
-    }
-
-
-@app.get("/stats", summary="Basic sentiment stats", tags=["Stats"])
-def sentiment_stats():
-    docs = azure_search(top=100)
-    from collections import Counter
-    sentiments = [d["content"].get("sentiment", "-") for d in docs]
-    return dict(Counter(sentiments))
+async def category_news(
+    category: str = Query(...),
+    top: int = Query(20, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+):
+    flt  = NewsFilter(category=category).to_odata()
+    return await search_page(top=top, filters=flt, cursor=cursor)
+
+
+@app.get("/query", summary="Search with any combination of filters", tags=["News"])
+async def query_news(
+    f: NewsFilter = Depends(news_filter),
+    top: int = Query(20, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+):
+    return await search_page(query=f.q, top=top, filters=f.to_odata(), cursor=cursor)
+
+
+@app.get("/similar/{id:path}", summary="News most similar to an article (URL or document key)", tags=["News"])
+async def similar_news(id: str, top: int = Query(10, ge=1, le=MAX_PAGE_SIZE)):
+    vectors = require_vectors()
+    hits = await asyncio.to_thread(vectors.similar, to_key(id), top)
+    if hits is None:
+        return FastJSONResponse({"error": "Not found"}, status_code=404)
+    return await ranked_articles([k for k, _ in hits], dict(hits))
+
+
+@app.get("/export", summary="Stream every matching article as NDJSON", tags=["News"])
+async def export_news(
+    f: NewsFilter = Depends(news_filter),
+    cursor: Optional[str] = Query(None, description="Start after this cursor (X-Next-Cursor of a list endpoint)"),
+    after: Optional[str] = Query(None, description="Resume after this article (URL or key of the last line received)"),
+    gzip: bool = False,
+):
+    start = Cursor.decode(cursor) if cursor else None
+    if after:
+        doc = await lookup_document(to_key(after))
+        if doc is None:
+            return FastJSONResponse({"error": "Not found"}, status_code=404)
+        # content/id makalenin URL'idir (bkz. ingest_news.build_doc)
+        start = Cursor(doc["content"]["published"], doc["content"]["url"])
+    # Content-Encoding yok: istemciler açmasın, .gz dosyası gerçekten gzip kalsın
+    headers = {"Content-Disposition": f'attachment; filename="news.ndjson{".gz" if gzip else ""}"'}
+    stream = export_stream(post_search, f.q, f.to_odata(), start, EXPORT_PAGE_SIZE, gzip)
+    return StreamingResponse(stream, media_type=GZIP_MEDIA_TYPE if gzip else NDJSON_MEDIA_TYPE, headers=headers)
+
+
+@app.get("/news/{id:path}", summary="Get news by ID (URL or document key)", tags=["News"])
+async def get_news_by_id(id: str):
+    doc = await lookup_document(to_key(id))
+    if doc is None:
+        return FastJSONResponse({"error": "Not found"}, status_code=404)
+    return FastJSONResponse(to_article(doc))
+
+
+@app.post("/news:batchGet", summary="Get many news by ID in one request", tags=["News"])
+async def batch_get_news(ids: List[str] = Body(..., embed=True, description="URLs or document keys")):
+    if len(ids) > MAX_BATCH_IDS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_IDS} ids per request")
+    docs = await lookup_documents([to_key(i) for i in ids])
+    return FastJSONResponse({
+        "articles": [to_article(d) for d in docs if d is not None],
+        "missing": [i for i, d in zip(ids, docs) if d is None],
+    })
+
+
+@app.get("/stats", summary="Exact sentiment, category, source and per-day counts", tags=["Stats"])
+async def corpus_stats(f: NewsFilter = Depends(news_filter)):
+    return FastJSONResponse(await fetch_stats(f.q, f.to_odata()))
+
+
+@app.get("/dashboard", summary="Stat cards, chart series and one page of news in one response", tags=["Stats"])
+async def dashboard(
+    f: NewsFilter = Depends(news_filter),
+    top: int = Query(20, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+):
+    flt = f.to_odata()
+    # Sayfa ve facet sorgusu paralel; ikisi de sonuç cache'inden geçer
+    (docs, total, next_page), stats = await asyncio.gather(
+        fetch_page(f.q, top, flt, cursor),
+        fetch_stats(f.q, flt),
+    )
+    return FastJSONResponse({
+        "cards": dashboard_cards(stats, docs),
+        "charts": {name: stats[name] for name in ("sentiment", "category", "source", "published_per_day", "truncated")},
+        "articles": [to_article(d) for d in docs],
+        "total": total,
+        "next_cursor": next_page,
+    })
+
+
+@app.get("/trends", summary="Rising key phrases per category (burst score)", tags=["Stats"])
+async def trending_phrases(category: Optional[str] = None, top: int = Query(10, ge=1, le=50)):
+    trends = app.state.trends
+    if not trends.available:
+        raise HTTPException(status_code=503, detail="No trend data yet; it is written by the ingester")
+    return FastJSONResponse(trends.top(category, top))
+
+
+@app.get("/rollups/series", summary="Daily article counts over a date range, from the ingest rollups", tags=["Stats"])
+async def rollup_series(
+    start: str,
+    end: str,
+    by: Optional[str] = Query(None, enum=list(DIMENSIONS), description="One series per value"),
+    category: Optional[str] = None,
+    source: Optional[str] = None,
+    sentiment: Optional[str] = None,
+):
+    first, last = date_range(start, end)
+    check_dimension(by)
+    rows = await app.state.rollups.rows(first, last, category=category, source=source, sentiment=sentiment)
+    return FastJSONResponse({"start": first.isoformat(), "end": last.isoformat(), "by": by,
+                             **series(rows, first, last, by)})
+
+
+@app.get("/rollups/totals", summary="Article counts per category, source or sentiment over a date range", tags=["Stats"])
+async def rollup_totals(
+    start: str,
+    end: str,
+    by: str = Query(..., enum=list(DIMENSIONS)),
+    category: Optional[str] = None,
+    source: Optional[str] = None,
+    sentiment: Optional[str] = None,
+):
+    first, last = date_range(start, end)
+    check_dimension(by)
+    rows = await app.state.rollups.rows(first, last, category=category, source=source, sentiment=sentiment)
+    return FastJSONResponse({"start": first.isoformat(), "end": last.isoformat(), "by": by, **totals(rows, by)})
+
+
+@app.get("/stats/cache", summary="Search result cache counters", tags=["Stats"])
+async def cache_stats():
+    return app.state.cache.stats()
 
 # ──────────────────────────────────────────────────────────
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
+    # backend.* ve kök modüller (cache_generation) import edilebilsin: repo kökünden çalıştır
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    uvicorn.run("backend.main:app", host="0.0.0.0", port=8000, reload=True, app_dir=root)
@@ -0,0 +1,78 @@
+"""
+Keyset (cursor) pagination for the list endpoints.
+
+Pages are ordered by `content/published desc, content/id desc`. The cursor
+is the sort key of the last document on the page, so the next page is just
+one more filter clause:
+
+    published < P  or  (published = P and id < ID)
+
+Unlike `skip`, that costs the same on page 1 and page 10,000 and is not
+capped at Azure Search's 100k skip limit. The total (`$count`) is asked for
+on the first page only and carried along in the cursor.
+
+The response body stays a plain list of articles; the next cursor and the
+total travel in the X-Next-Cursor and X-Total-Count headers.
+"""
+import json
+import base64
+from typing import Optional
+
+from fastapi import HTTPException
+
+from backend.filters import odata_string
+from backend.serializers import ARTICLE_SELECT, articles_response
+
+PAGE_ORDER = "content/published desc, content/id desc"
+# Cursor için id de gerekir; to_article() bunu dışarı vermez
+PAGE_SELECT = f"{ARTICLE_SELECT}, content/id"
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+TOTAL_COUNT_HEADER = "X-Total-Count"
+
+
+class Cursor:
+    def __init__(self, published: str, id: str, total: Optional[int] = None):
+        self.published = published
+        self.id = id
+        self.total = total
+
+    def encode(self) -> str:
+        data = json.dumps([self.published, self.id, self.total], separators=(",", ":"))
+        return base64.urlsafe_b64encode(data.encode("utf-8")).decode("ascii").rstrip("=")
+
+    @classmethod
+    def decode(cls, token: str) -> "Cursor":
+        try:
+            padded = token + "=" * (-len(token) % 4)
+            published, id, total = json.loads(base64.urlsafe_b64decode(padded))
+            if not isinstance(published, str) or not isinstance(id, str):
+                raise ValueError("bad cursor fields")
+        except (ValueError, TypeError):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        return cls(published, id, total)
+
+
+def keyset_filter(cursor: Cursor) -> str:
+    published, id = odata_string(cursor.published), odata_string(cursor.id)
+    return (
+        f"(content/published lt {published}"
+        f" or (content/published eq {published} and content/id lt {id}))"
+    )
+
+
+def next_cursor(docs: list, top: int, total: Optional[int]) -> Optional[str]:
+    """Cursor of the page after `docs`, or None if this was the last one."""
+    if not docs or len(docs) < top:
+        return None
+    last = docs[-1]["content"]
+    return Cursor(last["published"], last["id"], total).encode()
+
+
+def page_response(docs: list, top: int, total: Optional[int]):
+    response = articles_response(docs)
+    if total is not None:
+        response.headers[TOTAL_COUNT_HEADER] = str(total)
+    cursor = next_cursor(docs, top, total)
+    if cursor:
+        response.headers[NEXT_CURSOR_HEADER] = cursor
+    return response
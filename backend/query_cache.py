@@ -0,0 +1,250 @@
+"""
+Result cache for Azure Search queries.
+
+The corpus only changes when the ingester runs, while the dashboard sends
+the same handful of queries over and over. Results are cached per
+normalized payload (search, filter, orderby, top, ...):
+
+* in process: TTL + LRU, bounded by entry count and by response bytes;
+* optionally in Redis (REDIS_URL), shared by every worker, with the same TTL.
+
+Keys include the corpus generation (see cache_generation.py). When the
+ingester bumps it, every older entry stops matching at once. The index only
+catches up after the Search indexer's next run, so for `settle` seconds
+after a bump entries are kept for `settle_ttl` only.
+
+With the in-process search backend every worker loads its own index. Its
+version (a digest of the loaded documents) is part of the key as well, so
+after a reload a worker stops reading entries another worker cached from an
+older index, in Redis too.
+
+Concurrent misses for the same key share one upstream request.
+"""
+import json
+import time
+import asyncio
+import hashlib
+from collections import OrderedDict
+
+try:
+    import redis.asyncio as aioredis
+except ImportError:  # opsiyonel paylaşımlı katman
+    aioredis = None
+
+
+class QueryCache:
+    def __init__(
+        self,
+        ttl: float = 300,
+        max_entries: int = 1000,
+        max_bytes: int = 64 * 1024 * 1024,
+        redis=None,
+        settle: float = 600,
+        settle_ttl: float = 30,
+    ):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.redis = redis
+        self.settle = settle
+        self.settle_ttl = settle_ttl
+        self.generation = 0
+        self.index_version = None
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.shared_hits = 0
+        self.coalesced = 0
+        self._entries = OrderedDict()  # key → (expires, size, value)
+        self._inflight = {}
+        self._changed_at = None
+
+    @classmethod
+    def from_url(cls, redis_url: str = None, **kwargs):
+        redis = None
+        if redis_url:
+            if aioredis is None:
+                print("REDIS_URL is set but the redis package is not installed; using the local cache only")
+            else:
+                redis = aioredis.from_url(redis_url)
+        return cls(redis=redis, **kwargs)
+
+    def key(self, payload: dict) -> str:
+        # Boş alanlar ve boşluk farkları aynı sorgu sayılır
+        normalized = {
+            k: " ".join(v.split()) if isinstance(v, str) else v
+            for k, v in payload.items() if v not in (None, "")
+        }
+        digest = hashlib.sha256(
+            json.dumps(normalized, sort_keys=True, separators=(",", ":")).encode("utf-8")
+        ).hexdigest()
+        return f"{self.prefix}{digest}"
+
+    @property
+    def prefix(self) -> str:
+        version = f".{self.index_version}" if self.index_version else ""
+        return f"search:{self.generation}{version}:"
+
+    def set_index_version(self, version: str) -> bool:
+        """Version of the local search index; a change retires every older entry."""
+        if version == self.index_version:
+            return False
+        self.index_version = version
+        # Indexer gecikmesi yok; settle süresi gerekmez
+        self.clear()
+        return True
+
+    def set_generation(self, generation: int) -> bool:
+        if generation == self.generation:
+            return False
+        self.generation = generation
+        self._changed_at = time.monotonic()
+        self.clear()
+        return True
+
+    def clear(self):
+        self._entries.clear()
+        self.bytes = 0
+
+    def _entry_ttl(self) -> float:
+        if self._changed_at is not None and time.monotonic() - self._changed_at < self.settle:
+            return min(self.ttl, self.settle_ttl)
+        return self.ttl
+
+    def _get_local(self, key: str):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires, size, value = entry
+        if expires < time.monotonic():
+            del self._entries[key]
+            self.bytes -= size
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def _put_local(self, key: str, value, size: int, ttl: float):
+        if size > self.max_bytes:
+            return
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self.bytes -= old[1]
+        self._entries[key] = (time.monotonic() + ttl, size, value)
+        self.bytes += size
+        while len(self._entries) > self.max_entries or self.bytes > self.max_bytes:
+            _, (_, evicted, _) = self._entries.popitem(last=False)
+            self.bytes -= evicted
+
+    async def get_or_fetch(self, payload: dict, fetch):
+        """
+        Cached value for `payload`; on a miss `await fetch(payload)` must
+        return (raw JSON bytes, parsed value). Callers must not mutate the value.
+        """
+        key = self.key(payload)
+        value = self._get_local(key)
+        if value is not None:
+            self.hits += 1
+            return value
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._load(key, payload, fetch))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        else:
+            self.coalesced += 1
+        # Bir istemci bağlantıyı keserse ortak istek iptal olmasın
+        return await asyncio.shield(task)
+
+    async def _load(self, key: str, payload: dict, fetch):
+        ttl = self._entry_ttl()
+        raw = await self._redis_get(key)
+        if raw is not None:
+            self.shared_hits += 1
+            value = json.loads(raw)
+        else:
+            self.misses += 1
+            raw, value = await fetch(payload)
+            if value is None:  # bulunamadı; cache'lenmez
+                return None
+            await self._redis_set(key, raw, ttl)
+        # Fetch sürerken generation değiştiyse sonuç eski olabilir; saklama
+        if key.startswith(self.prefix):
+            self._put_local(key, value, len(raw), ttl)
+        return value
+
+    async def get_or_fetch_many(self, payloads: list, fetch) -> list:
+        """
+        Batch form of get_or_fetch(): one value (or None) per payload.
+        `await fetch(missing_payloads)` gets only the payloads found in
+        neither tier and must return one (raw, value) pair or None for each.
+        """
+        ttl = self._entry_ttl()
+        keys = [self.key(p) for p in payloads]
+        values = [self._get_local(k) for k in keys]
+        missing = [i for i, v in enumerate(values) if v is None]
+        self.hits += len(payloads) - len(missing)
+
+        for i, raw in zip(missing, await self._redis_get_many([keys[i] for i in missing])):
+            if raw is not None:
+                self.shared_hits += 1
+                values[i] = json.loads(raw)
+                self._put_local(keys[i], values[i], len(raw), ttl)
+        missing = [i for i in missing if values[i] is None]
+        if not missing:
+            return values
+
+        self.misses += len(missing)
+        for i, found in zip(missing, await fetch([payloads[i] for i in missing])):
+            if found is None:
+                continue
+            raw, values[i] = found
+            await self._redis_set(keys[i], raw, ttl)
+            self._put_local(keys[i], values[i], len(raw), ttl)
+        return values
+
+    async def _redis_get(self, key: str):
+        if self.redis is None:
+            return None
+        try:
+            return await self.redis.get(key)
+        except Exception as e:  # cache best-effort; Redis düşerse Search'e git
+            print(f"Redis get failed: {e}")
+            return None
+
+    async def _redis_get_many(self, keys: list) -> list:
+        if self.redis is None or not keys:
+            return [None] * len(keys)
+        try:
+            return await self.redis.mget(keys)
+        except Exception as e:
+            print(f"Redis mget failed: {e}")
+            return [None] * len(keys)
+
+    async def _redis_set(self, key: str, raw: bytes, ttl: float):
+        if self.redis is None:
+            return
+        try:
+            await self.redis.set(key, raw, ex=max(1, int(ttl)))
+        except Exception as e:
+            print(f"Redis set failed: {e}")
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses + self.shared_hits + self.coalesced
+        return {
+            "generation": self.generation,
+            "index_version": self.index_version,
+            "entries": len(self._entries),
+            "bytes": self.bytes,
+            "hits": self.hits,
+            "shared_hits": self.shared_hits,
+            "coalesced": self.coalesced,
+            "misses": self.misses,
+            "hit_rate": round((lookups - self.misses) / lookups, 3) if lookups else 0.0,
+            "shared": self.redis is not None,
+        }
+
+    async def close(self):
+        if self.redis is not None:
+            # redis-py < 5 sadece close() sunar
+            close = getattr(self.redis, "aclose", None) or self.redis.close
+            await close()
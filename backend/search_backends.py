@@ -0,0 +1,209 @@
+"""
+Search backends behind `post_search()` / `fetch_document()`.
+
+* AzureSearchBackend — the pooled httpx client talking to Azure Search.
+* LocalSearchBackend — an in-process LocalIndex (backend/local_index.py)
+  loaded from the ingester's documents, either a local directory of
+  `{key}.json` files or the blob container itself. No round-trip at all;
+  meant for development, tests and small deployments.
+
+Both take the same request payloads and return (raw JSON bytes, parsed
+body), so the query cache and every endpoint work the same on either one.
+
+The local backend keeps a pickled snapshot of its index (LOCAL_SEARCH_SNAPSHOT)
+so a restart only has to fetch the documents that changed since the
+snapshot was written. The snapshot is a private cache file of this process;
+never point it at a file from somewhere else.
+"""
+import os
+import json
+import pickle
+import hashlib
+import asyncio
+import time
+from urllib.parse import quote
+
+from fastapi import HTTPException
+
+from backend.local_index import LocalIndex, QueryError
+from backend.serializers import dumps
+
+SNAPSHOT_VERSION = 1
+# Bu oranı geçen ölü posting'ler compact() ile temizlenir
+COMPACT_RATIO = 0.25
+DOWNLOAD_CONCURRENCY = 32
+
+
+class AzureSearchBackend:
+    name = "azure"
+
+    def __init__(self, client, index_name: str, api_version: str):
+        self.client = client
+        self.index_name = index_name
+        self.api_version = api_version
+
+    async def search(self, payload: dict):
+        url = f"/indexes/{self.index_name}/docs/search?api-version={self.api_version}"
+        resp = await self.client.post(url, json=payload)
+        resp.raise_for_status()
+        return resp.content, resp.json()
+
+    async def lookup(self, key: str, select: str):
+        url = f"/indexes/{self.index_name}/docs/{quote(key, safe='')}"
+        resp = await self.client.get(url, params={"api-version": self.api_version, "$select": select})
+        if resp.status_code == 404:
+            return b"", None
+        resp.raise_for_status()
+        return resp.content, resp.json()
+
+    async def refresh(self) -> bool:
+        # Index'i Azure'daki indexer günceller
+        return False
+
+    async def close(self):
+        await self.client.aclose()
+
+
+class DirectorySource:
+    """`{key}.json` article files in a local directory (e.g. a blob container export)."""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    async def scan(self) -> dict:
+        def scan():
+            with os.scandir(self.path) as entries:
+                return {e.name: e.stat().st_mtime_ns for e in entries if e.name.endswith(".json") and e.is_file()}
+        return await asyncio.to_thread(scan)
+
+    async def load(self, names: list):
+        def read(name):
+            with open(os.path.join(self.path, name), "rb") as f:
+                return f.read()
+        for name in names:
+            yield name, await asyncio.to_thread(read, name)
+
+    async def close(self):
+        pass
+
+
+class BlobSource:
+    """The ingester's blob container, read with the async Blob Storage client."""
+
+    def __init__(self, conn_str: str, container: str):
+        from azure.storage.blob.aio import ContainerClient
+
+        self.container = ContainerClient.from_connection_string(conn_str, container)
+
+    async def scan(self) -> dict:
+        return {b.name: b.etag async for b in self.container.list_blobs() if b.name.endswith(".json")}
+
+    async def load(self, names: list):
+        sem = asyncio.Semaphore(DOWNLOAD_CONCURRENCY)
+
+        async def download(name):
+            async with sem:
+                stream = await self.container.download_blob(name)
+                return name, await stream.readall()
+
+        tasks = [asyncio.ensure_future(download(n)) for n in names]
+        try:
+            for task in asyncio.as_completed(tasks):
+                yield await task
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def close(self):
+        await self.container.close()
+
+
+class LocalSearchBackend:
+    name = "local"
+
+    def __init__(self, source, snapshot_path: str = None):
+        self.source = source
+        self.snapshot_path = snapshot_path
+        self.index = LocalIndex()
+        self.stamps = {}   # dosya/blob adı → mtime/etag; değişenler yeniden yüklenir
+        self.refreshed_at = None
+
+    @classmethod
+    def open(cls, source, snapshot_path: str = None):
+        backend = cls(source, snapshot_path)
+        if snapshot_path and os.path.exists(snapshot_path):
+            try:
+                with open(snapshot_path, "rb") as f:
+                    version, index, stamps = pickle.load(f)
+                if version == SNAPSHOT_VERSION:
+                    backend.index, backend.stamps = index, stamps
+                    print(f"Local search index: {len(index)} docs from snapshot {snapshot_path}")
+            except Exception as e:  # bozuk snapshot → baştan yükle
+                print(f"Ignoring search index snapshot {snapshot_path}: {e}")
+        return backend
+
+    async def search(self, payload: dict):
+        try:
+            body = self.index.search(payload)
+        except QueryError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        return dumps(body), body
+
+    async def lookup(self, key: str, select: str):
+        doc = self.index.lookup(key, select)
+        return (b"", None) if doc is None else (dumps(doc), doc)
+
+    @property
+    def version(self) -> str:
+        """
+        Digest of the loaded files/blobs and their stamps. Every worker that
+        loaded the same corpus gets the same value, so it can namespace
+        entries in the shared query cache.
+        """
+        digest = hashlib.sha1()
+        for name, stamp in sorted(self.stamps.items()):
+            digest.update(f"{name}\0{stamp}\n".encode("utf-8"))
+        return digest.hexdigest()[:16]
+
+    async def refresh(self) -> bool:
+        """Picks up new, changed and deleted documents; True if the index changed."""
+        started = time.perf_counter()
+        current = await self.source.scan()
+        changed = [name for name, stamp in current.items() if self.stamps.get(name) != stamp]
+        removed = [name for name in self.stamps if name not in current]
+
+        for name in removed:
+            self.index.remove(name[: -len(".json")])
+            del self.stamps[name]
+        loaded = 0
+        async for name, data in self.source.load(changed):
+            try:
+                doc = json.loads(data)
+            except ValueError as e:
+                print(f"Skipping {name}: {e}")
+                continue
+            self.index.add(name[: -len(".json")], doc)
+            self.stamps[name] = current[name]
+            loaded += 1
+        self.refreshed_at = time.time()
+        if not loaded and not removed:
+            return False
+
+        if self.index.garbage > COMPACT_RATIO * max(1, len(self.index)):
+            await asyncio.to_thread(self.index.compact)
+        if self.snapshot_path:
+            await asyncio.to_thread(self.save_snapshot)
+        print(
+            f"Local search index: +{loaded} -{len(removed)} docs, {len(self.index)} total "
+            f"in {time.perf_counter() - started:.2f}s"
+        )
+        return True
+
+    def save_snapshot(self):
+        tmp = f"{self.snapshot_path}.tmp"
+        with open(tmp, "wb") as f:
+            pickle.dump((SNAPSHOT_VERSION, self.index, self.stamps), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, self.snapshot_path)
+
+    async def close(self):
+        await self.source.close()
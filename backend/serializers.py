@@ -0,0 +1,61 @@
+"""
+Response shaping shared by every backend endpoint.
+
+Azure Search is asked only for the fields in ARTICLE_SELECT, and every
+endpoint turns a search hit into the public article shape with
+`to_article`. Responses are encoded with orjson (falling back to the stdlib
+encoder when it is not installed) and bypass FastAPI's jsonable_encoder,
+which walks every value of the result again before encoding it.
+"""
+import json
+
+from fastapi.responses import Response
+
+try:
+    import orjson
+except ImportError:  # opsiyonel; yoksa stdlib json
+    orjson = None
+
+# Search indexinde article alanlarının yolu → API'deki adı
+ARTICLE_FIELDS = {
+    "content/title": "title",
+    "content/source": "source",
+    "content/published": "date",
+    "content/sentiment": "sentiment",
+    "content/summary": "summary",
+    "content/url": "url",
+    "content/keyphrases": "keyphrases",
+    "content/category": "category",
+}
+ARTICLE_SELECT = ", ".join(ARTICLE_FIELDS)
+
+
+def to_article(d: dict) -> dict:
+    c = d["content"]
+    return {
+        "title":      c["title"],
+        "source":     c["source"],
+        "date":       c["published"],
+        "sentiment":  c["sentiment"],
+        "summary":    c["summary"],
+        "url":        c["url"],
+        "keyphrases": c["keyphrases"],
+        "category":   c.get("category", "general"),
+    }
+
+
+def dumps(content) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(content)
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class FastJSONResponse(Response):
+    media_type = "application/json"
+
+    def render(self, content) -> bytes:
+        return dumps(content)
+
+
+def articles_response(docs: list) -> FastJSONResponse:
+    return FastJSONResponse([to_article(d) for d in docs])
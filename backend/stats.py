@@ -0,0 +1,103 @@
+"""
+Corpus statistics from Azure Search facets.
+
+One `top=0` search with `count` and facets returns exact counts for the
+whole (filtered) index without a single document in the payload:
+sentiment, category and source counts plus a per-day publish histogram.
+
+`content/published` is a string field in the current index, so the
+histogram is built from the facet values, cut to the day. Set
+SEARCH_PUBLISHED_FACET=interval once the field is an Edm.DateTimeOffset and
+Search buckets by day itself.
+
+Facets return at most `count` buckets, so every count facet and the
+histogram is reported with a flag in `truncated`. Sources get their own,
+larger bucket count (STATS_SOURCE_FACET_COUNT). A truncated values
+histogram loses its oldest timestamps; the oldest day it still reaches may
+be partial and is dropped, so every day in `published_per_day` is exact.
+
+The average number of key phrases comes from a facet on the numeric
+`content/keyphrase_count` field the ingester writes: Σ value·count / Σ count
+over its buckets. It is off by default: set STATS_KEYPHRASE_FACET=1 once
+the index has that field (Edm.Int32, facetable). Until then
+`avg_keyphrases` is None in /stats, and the dashboard card averages over
+the page of articles it was sent with, as it did before /dashboard.
+"""
+import os
+
+FACET_COUNT = int(os.getenv("STATS_FACET_COUNT", "100"))
+SOURCE_FACET_COUNT = int(os.getenv("STATS_SOURCE_FACET_COUNT", "1000"))
+PUBLISHED_VALUES = int(os.getenv("STATS_PUBLISHED_VALUES", "10000"))
+PUBLISHED_FACET = os.getenv("SEARCH_PUBLISHED_FACET", "values")
+KEYPHRASE_FACET = os.getenv("STATS_KEYPHRASE_FACET", "0") != "0"
+KEYPHRASE_FIELD = "content/keyphrase_count"
+
+COUNT_FACETS = {
+    "sentiment": "content/sentiment",
+    "category": "content/category",
+    "source": "content/source",
+}
+FACET_COUNTS = {"source": SOURCE_FACET_COUNT}
+
+
+def stats_facets(keyphrases: bool = KEYPHRASE_FACET) -> list:
+    facets = [f"{field},count:{FACET_COUNTS.get(name, FACET_COUNT)}" for name, field in COUNT_FACETS.items()]
+    if PUBLISHED_FACET == "interval":
+        facets.append("content/published,interval:day")
+    else:
+        facets.append(f"content/published,count:{PUBLISHED_VALUES},sort:-value")
+    if keyphrases:
+        facets.append(f"{KEYPHRASE_FIELD},count:{FACET_COUNT}")
+    return facets
+
+
+def stats_from_body(body: dict) -> dict:
+    facets = body.get("@search.facets", {})
+    out = {"total": body.get("@odata.count", 0)}
+    truncated = {}
+    for name, field in COUNT_FACETS.items():
+        buckets = facets.get(field, [])
+        out[name] = {str(f["value"]): f["count"] for f in buckets}
+        truncated[name] = len(buckets) >= FACET_COUNTS.get(name, FACET_COUNT)
+    published = facets.get("content/published", [])
+    per_day = {}
+    for f in published:
+        day = str(f["value"])[:10]
+        per_day[day] = per_day.get(day, 0) + f["count"]
+    truncated["published_per_day"] = PUBLISHED_FACET != "interval" and len(published) >= PUBLISHED_VALUES
+    if truncated["published_per_day"] and per_day:
+        # sort:-value en eski zamanları keser; kesilen günün sayısı eksik
+        del per_day[min(per_day)]
+    out["published_per_day"] = dict(sorted(per_day.items()))
+    out["truncated"] = truncated
+    out["avg_keyphrases"] = None
+    buckets = facets.get(KEYPHRASE_FIELD)
+    if buckets:
+        counted = sum(f["count"] for f in buckets)
+        # Alanı olmayan eski belgeler bucket'a girmez; ortalama alanı olanlar üzerinden
+        out["avg_keyphrases"] = sum(float(f["value"]) * f["count"] for f in buckets) / counted
+    return out
+
+
+def page_avg_keyphrases(docs: list):
+    """Mean number of key phrases over a page of search documents; None if empty."""
+    if not docs:
+        return None
+    return sum(len(d["content"].get("keyphrases") or []) for d in docs) / len(docs)
+
+
+def dashboard_cards(stats: dict, docs: list = ()) -> dict:
+    """The stat cards shown above the dashboard's article list."""
+    avg, scope = stats["avg_keyphrases"], "index"
+    if avg is None:
+        # Facet yoksa sayfadaki makalelerden; kart boş kalmasın
+        avg, scope = page_avg_keyphrases(docs), "page"
+    return {
+        "total": stats["total"],
+        "positive": stats["sentiment"].get("positive", 0),
+        "sources": len(stats["source"]),
+        # STATS_SOURCE_FACET_COUNT'a ulaşıldıysa gerçek sayı daha fazla
+        "sources_truncated": stats["truncated"]["source"],
+        "avg_keyphrases": avg,
+        "avg_keyphrases_scope": scope,
+    }
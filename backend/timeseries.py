@@ -0,0 +1,143 @@
+"""
+/rollups: article counts over a date range, from the ingester's daily rollups.
+
+The ingester exports one blob per month, rollups/YYYY-MM.json (see
+rollups.py). A range query reads only the months it spans, one or two for a
+month-long range, and sums the matching (day, category, source, sentiment)
+cells. It never touches the search index, so its cost depends on the
+length of the range, not on the size of the corpus. Month blobs are kept in
+memory until the corpus generation changes.
+"""
+import os
+import json
+import asyncio
+from datetime import date, timedelta
+from typing import Optional
+
+from fastapi import HTTPException
+
+from rollups import DIMENSIONS, month_blob_name
+
+MAX_RANGE_DAYS = 366
+
+
+def date_range(start: str, end: str) -> tuple:
+    """(start, end) as dates, inclusive; 400 if invalid or too long."""
+    try:
+        first, last = date.fromisoformat(start[:10]), date.fromisoformat(end[:10])
+    except ValueError:
+        raise HTTPException(status_code=400, detail="start and end must be ISO 8601 dates (YYYY-MM-DD)")
+    if last < first:
+        raise HTTPException(status_code=400, detail="end must not be before start")
+    if (last - first).days + 1 > MAX_RANGE_DAYS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_RANGE_DAYS} days per request")
+    return first, last
+
+
+def check_dimension(by: Optional[str]) -> Optional[str]:
+    if by is not None and by not in DIMENSIONS:
+        raise HTTPException(status_code=400, detail=f"by must be one of {', '.join(DIMENSIONS)}")
+    return by
+
+
+def days_between(first: date, last: date) -> list:
+    return [(first + timedelta(days=i)).isoformat() for i in range((last - first).days + 1)]
+
+
+class RollupReader:
+    def __init__(self, load, cache: bool = True):
+        self.load = load      # async (month) → rollup dict ya da None
+        self.cache = cache
+        self.reads = 0
+        self._months = {}
+
+    def clear(self):
+        self._months = {}
+
+    async def month(self, month: str) -> dict:
+        rollup = self._months.get(month)
+        if rollup is None:
+            self.reads += 1
+            rollup = await self.load(month) or {"month": month, "days": {}}
+            if self.cache:
+                self._months[month] = rollup
+        return rollup
+
+    async def rows(self, first: date, last: date, **match) -> list:
+        """(day, category, source, sentiment, count) rows in range whose cells equal `match`."""
+        months = sorted({d[:7] for d in days_between(first, last)})
+        rollups = await asyncio.gather(*(self.month(m) for m in months))
+        lo, hi = first.isoformat(), last.isoformat()
+        out = []
+        for rollup in rollups:
+            values = [rollup.get("values", {}).get(dim, []) for dim in DIMENSIONS]
+            wanted = []
+            for i, dim in enumerate(DIMENSIONS):
+                if match.get(dim) is not None:
+                    if match[dim] not in values[i]:
+                        break  # bu ayda hiç yok
+                    wanted.append((i, values[i].index(match[dim])))
+            else:
+                for day, cells in rollup["days"].items():
+                    if lo <= day <= hi:
+                        out.extend(
+                            (day, values[0][c[0]], values[1][c[1]], values[2][c[2]], c[3])
+                            for c in cells if all(c[i] == code for i, code in wanted)
+                        )
+        return out
+
+
+def series(rows: list, first: date, last: date, by: Optional[str] = None) -> dict:
+    """Per-day counts, one series per value of `by` (or a single "all")."""
+    days = days_between(first, last)
+    index = {d: i for i, d in enumerate(days)}
+    col = DIMENSIONS.index(by) + 1 if by else None
+    out = {}
+    for row in rows:
+        key = row[col] if col else "all"
+        values = out.get(key)
+        if values is None:
+            values = out[key] = [0] * len(days)
+        values[index[row[0]]] += row[4]
+    return {"days": days, "series": dict(sorted(out.items())), "total": sum(r[4] for r in rows)}
+
+
+def totals(rows: list, by: str) -> dict:
+    """Counts over the whole range per value of `by`, largest first."""
+    col = DIMENSIONS.index(by) + 1
+    counts = {}
+    for row in rows:
+        counts[row[col]] = counts.get(row[col], 0) + row[4]
+    return {
+        "counts": dict(sorted(counts.items(), key=lambda kv: (-kv[1], kv[0]))),
+        "total": sum(counts.values()),
+    }
+
+
+def blob_loader(container):
+    """Reads month blobs from the state container (azure.storage.blob.aio)."""
+    from azure.core.exceptions import ResourceNotFoundError
+
+    async def load(month: str):
+        try:
+            download = await container.download_blob(month_blob_name(month))
+            return json.loads(await download.readall())
+        except ResourceNotFoundError:
+            return None
+
+    return load
+
+
+def dir_loader(path: str):
+    """Reads the month files the ingester keeps in ROLLUP_DIR."""
+    def read(month: str):
+        try:
+            with open(os.path.join(path, f"{month}.json"), encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    async def load(month: str):
+        return await asyncio.to_thread(read, month)
+
+    return load
@@ -0,0 +1,67 @@
+"""
+/trends: rising key phrases per category.
+
+The ingester keeps incremental keyphrase counts (trends.py) and, at the end
+of every run, writes the ranked top phrases per category to trends.json in
+the state container. The backend keeps a local copy at TRENDS_SNAPSHOT_PATH,
+downloads it again when the corpus generation changes and serves requests
+from memory; nothing is counted or ranked per request.
+"""
+import os
+import json
+import asyncio
+
+from trends import TRENDS_SNAPSHOT_BLOB_NAME
+
+
+class TrendFeed:
+    def __init__(self, path: str):
+        self.path = path
+        self.snapshot = None
+
+    @property
+    def available(self) -> bool:
+        return self.snapshot is not None
+
+    def reload(self) -> bool:
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                snapshot = json.load(f)
+        except FileNotFoundError:
+            return False
+        self.snapshot = snapshot
+        return True
+
+    def top(self, category: str = None, n: int = 10) -> dict:
+        snapshot = self.snapshot
+        categories = snapshot["categories"]
+        if category is not None:
+            categories = {category: categories.get(category, [])}
+        return {
+            "generated": snapshot["generated"],
+            "hour_start": snapshot["hour_start"],
+            "day_start": snapshot["day_start"],
+            "categories": {c: phrases[:n] for c, phrases in categories.items()},
+        }
+
+
+async def download_trends(container, path: str) -> bool:
+    """Copies trends.json from the state container (azure.storage.blob.aio) to `path`."""
+    from azure.core.exceptions import ResourceNotFoundError
+
+    try:
+        download = await container.download_blob(TRENDS_SNAPSHOT_BLOB_NAME)
+        data = await download.readall()
+    except ResourceNotFoundError:
+        return False
+    if os.path.dirname(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = path + ".download"
+    await asyncio.to_thread(_write, tmp, data)
+    os.replace(tmp, path)
+    return True
+
+
+def _write(path: str, data: bytes):
+    with open(path, "wb") as f:
+        f.write(data)
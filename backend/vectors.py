@@ -0,0 +1,108 @@
+"""
+Vector search for /similar/{id} and /search?mode=vector|hybrid.
+
+Reads the embedding store the ingester parks in the state container under
+vectors/ (see vector_store.py). The backend keeps a local copy at
+VECTOR_PATH, memory-mapped, and refreshes it when the corpus generation
+changes. Queries are embedded with the provider the store was built with.
+
+Below VECTOR_IVF_MIN rows every query is exact (brute force); above it an
+IVF index is built once, saved next to the matrix and probed with
+VECTOR_NPROBE lists, and rebuilt when the store has grown by a quarter.
+"""
+import os
+import asyncio
+
+import numpy as np
+
+from embeddings import make_embedder
+from vector_store import IVFIndex, VectorStore, KEYS_NAME, META_NAME, VECTORS_NAME
+
+VECTOR_BLOB_PREFIX = "vectors/"
+# Hibrit sıralamada reciprocal rank fusion sabiti
+RRF_K = 60
+
+
+class VectorSearch:
+    def __init__(self, path: str, ivf_min: int = 50_000, nprobe: int = 32):
+        self.path = path
+        self.ivf_min = ivf_min
+        self.nprobe = nprobe
+        self.store = None
+        self.ivf = None
+        self.embedder = None
+
+    @property
+    def available(self) -> bool:
+        return self.store is not None and self.store.count > 0
+
+    def reload(self) -> bool:
+        """Re-opens the store if the ingester appended to it; True if it changed."""
+        store = VectorStore.open(self.path)
+        if store is None or (self.store is not None and (store.count, store.spec, store.epoch)
+                             == (self.store.count, self.store.spec, self.store.epoch)):
+            return False
+        embedder = self.embedder
+        if embedder is None or embedder.spec != store.spec:
+            embedder = make_embedder(store.spec)
+        ivf = None
+        if store.count >= self.ivf_min:
+            ivf = IVFIndex.load(self.path)
+            if ivf is None or ivf.epoch != store.epoch or ivf.count > store.count or ivf.count < 0.75 * store.count:
+                ivf = IVFIndex.build(store)
+                ivf.save(self.path)
+        # Sorgular başka thread'lerde sürerken hepsi birlikte değişsin
+        self.store, self.ivf, self.embedder = store, ivf, embedder
+        return True
+
+    def search(self, vector: np.ndarray, k: int, exclude: str = None) -> list:
+        """[(key, score)] of the k nearest rows, best first."""
+        store, ivf = self.store, self.ivf
+        extra = 1 if exclude else 0
+        if ivf is not None:
+            rows, scores = ivf.search(store, vector, k + extra, self.nprobe)
+        else:
+            rows, scores = store.search(vector, k + extra)
+        keys = store.keys
+        hits = [(keys[r], float(s)) for r, s in zip(rows[0], scores[0]) if keys[r] != exclude]
+        return hits[:k]
+
+    def query(self, text: str, k: int) -> list:
+        return self.search(self.embedder.embed([text])[0], k)
+
+    def similar(self, key: str, k: int):
+        """Neighbours of a stored document, or None if it has no vector."""
+        vector = self.store.vector(key)
+        return None if vector is None else self.search(vector, k, exclude=key)
+
+
+def fuse(*rankings: list) -> list:
+    """Reciprocal rank fusion of several best-first key lists."""
+    scores = {}
+    for ranking in rankings:
+        for rank, key in enumerate(ranking):
+            scores[key] = scores.get(key, 0.0) + 1.0 / (RRF_K + rank + 1)
+    return sorted(scores, key=scores.get, reverse=True)
+
+
+async def download_store(container, path: str) -> bool:
+    """Copies vectors/ from the state container (azure.storage.blob.aio) into `path`."""
+    from azure.core.exceptions import ResourceNotFoundError
+
+    os.makedirs(path, exist_ok=True)
+    # meta.json en son yerine konur; okuyucu eksik satır görmesin
+    for name in (VECTORS_NAME, KEYS_NAME, META_NAME):
+        try:
+            download = await container.download_blob(VECTOR_BLOB_PREFIX + name)
+            data = await download.readall()
+        except ResourceNotFoundError:
+            return False
+        tmp = os.path.join(path, name + ".download")
+        await asyncio.to_thread(_write, tmp, data)
+        os.replace(tmp, os.path.join(path, name))
+    return True
+
+
+def _write(path: str, data: bytes):
+    with open(path, "wb") as f:
+        f.write(data)
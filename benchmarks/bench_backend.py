@@ -0,0 +1,165 @@
+"""
+Backend throughput benchmark against a local fake Azure Search server.
+
+Serves the real backend (backend/main.py: async endpoints, one pooled
+httpx client) with and without its query cache, and a copy of the previous
+implementation (sync endpoints on the threadpool, one `requests.post` per
+call, no session) in front of the same fake search server, then fires
+concurrent GET /news requests at each and reports requests/sec and latency
+percentiles.
+
+The fake server speaks plain HTTP on localhost, so the numbers only include
+the TCP handshake the old code paid per call; against the real service the
+TLS handshake comes on top.
+
+    python benchmarks/bench_backend.py
+    python benchmarks/bench_backend.py --requests 5000 --concurrency 100 --latency 0.02
+"""
+import os
+import sys
+import time
+import socket
+import asyncio
+import argparse
+import multiprocessing
+
+import httpx
+import requests
+import uvicorn
+from fastapi import FastAPI, Request
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _run_server(factory, args, port):
+    if factory == "backend":
+        from backend.main import app
+    else:
+        app = globals()[factory](*args)
+    uvicorn.run(app, host="127.0.0.1", port=port, log_level="warning")
+
+
+def serve(factory: str, *args) -> tuple:
+    """Starts `factory(*args)` in its own process so it does not share a GIL with the load."""
+    port = free_port()
+    proc = multiprocessing.Process(target=_run_server, args=(factory, args, port), daemon=True)
+    proc.start()
+    while True:
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=0.1):
+                return proc, f"http://127.0.0.1:{port}"
+        except OSError:
+            time.sleep(0.05)
+
+
+def fake_search_app(latency: float) -> FastAPI:
+    app = FastAPI()
+    docs = [
+        {"content": {
+            "title": f"Headline {i}", "source": "Fake Wire", "published": f"2025-01-{1 + i % 28:02d}T00:00:00Z",
+            "sentiment": "neutral", "summary": "Lorem ipsum dolor sit amet. " * 4,
+            "url": f"https://example.com/{i}", "keyphrases": ["lorem", "ipsum"], "category": "technology",
+        }}
+        for i in range(1000)
+    ]
+
+    @app.post("/indexes/{index}/docs/search")
+    async def search(index: str, request: Request):
+        body = await request.json()
+        await asyncio.sleep(latency)
+        return {"value": docs[: body.get("top", 50)]}
+
+    return app
+
+
+def legacy_app(endpoint: str) -> FastAPI:
+    """The backend before pooling: sync handler, new connection per call."""
+    app = FastAPI()
+
+    @app.get("/news")
+    def get_news(top: int = 25):
+        url = f"{endpoint}/indexes/azureblob-index/docs/search?api-version=2023-07-01-Preview"
+        resp = requests.post(url, headers={"Content-Type": "application/json", "api-key": ""},
+                             json={"search": "*", "top": top, "orderby": "content/published desc"})
+        resp.raise_for_status()
+        return [
+            {
+                "title": d["content"]["title"],
+                "source": d["content"]["source"],
+                "date": d["content"]["published"],
+                "sentiment": d["content"]["sentiment"],
+                "summary": d["content"]["summary"],
+                "url": d["content"]["url"],
+                "keyphrases": d["content"]["keyphrases"],
+                "category": d["content"].get("category", "general"),
+            }
+            for d in resp.json().get("value", [])
+        ]
+
+    return app
+
+
+async def load(base_url: str, total: int, concurrency: int, top: int) -> dict:
+    latencies = []
+    queue = asyncio.Queue()
+    for _ in range(total):
+        queue.put_nowait(None)
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        async def worker():
+            while not queue.empty():
+                queue.get_nowait()
+                started = time.perf_counter()
+                resp = await client.get("/news", params={"top": top})
+                resp.raise_for_status()
+                latencies.append(time.perf_counter() - started)
+
+        # Isınma: bağlantılar açılsın
+        await asyncio.gather(*(client.get("/news", params={"top": top}) for _ in range(concurrency)))
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    pick = lambda q: latencies[min(len(latencies) - 1, int(q * len(latencies)))] * 1000  # noqa: E731
+    return {"rps": total / elapsed, "p50": pick(0.50), "p99": pick(0.99)}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--latency", type=float, default=0.01, help="fake search latency in seconds")
+    parser.add_argument("--top", type=int, default=25)
+    args = parser.parse_args()
+
+    search, endpoint = serve("fake_search_app", args.latency)
+    # Backend süreci SEARCH_ENDPOINT'i import anında okur
+    os.environ["SEARCH_ENDPOINT"] = endpoint
+    os.environ.setdefault("SEARCH_KEY", "bench")
+
+    print(f"{'backend':<8} {'req/s':>8} {'p50 ms':>8} {'p99 ms':>8}")
+    for name, factory, factory_args, cache_ttl in (
+        ("legacy", "legacy_app", (endpoint,), "0"),
+        ("pooled", "backend", (), "0"),
+        ("cached", "backend", (), "300"),
+    ):
+        # TTL 0: sorgu cache'i kapalı, sadece bağlantı havuzu ölçülür
+        os.environ["SEARCH_CACHE_TTL"] = cache_ttl
+        proc, base_url = serve(factory, *factory_args)
+        try:
+            r = asyncio.run(load(base_url, args.requests, args.concurrency, args.top))
+        finally:
+            proc.terminate()
+        print(f"{name:<8} {r['rps']:>8.1f} {r['p50']:>8.1f} {r['p99']:>8.1f}")
+    search.terminate()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+Cost of rendering the dashboard's article list for 10, 100 and 1,000 cards.
+
+before – one f-string per card plus one per key phrase block, each sent
+         with its own st.markdown call (two delta messages per article),
+         values interpolated unescaped;
+cold   – dashboard/cards.py on articles it has not seen: escaped fragments
+         joined into one block, one st.markdown call;
+warm   – the same page on the next rerun, fragments served from the memo.
+
+Streamlit itself is not timed; `messages` is the number of st.markdown
+deltas the browser has to apply for the list.
+
+    python benchmarks/bench_dashboard_cards.py
+    python benchmarks/bench_dashboard_cards.py --sizes 10 100 1000 --repeat 20
+"""
+import os
+import sys
+import time
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "dashboard"))
+
+import cards  # noqa: E402
+
+
+def make_articles(n: int, offset: int = 0) -> list:
+    return [
+        {
+            "title": f"Story {i} about <markets> & \"rates\"",
+            "source": "BBC News",
+            "date": "2025-01-28T11:00:00Z",
+            "sentiment": ("positive", "neutral", "negative")[i % 3],
+            "summary": "Central banks held rates steady. " * 6,
+            "url": f"https://example.com/news/{i}?ref=rss&utm=1",
+            "keyphrases": ["central banks", "interest rates", "inflation", f"topic {i % 50}", "O'Reilly"],
+            "category": "business",
+        }
+        for i in range(offset, offset + n)
+    ]
+
+
+def before(articles: list) -> list:
+    """The previous loop body, one string per st.markdown call."""
+    out = []
+    for art in articles:
+        sentiment_class = f"sentiment-{art['sentiment']}" if art.get('sentiment') else "sentiment-neutral"
+        out.append(f"""
+        <div class="article-card">
+            <div class="article-title">{art['title']}</div>
+            <div class="article-meta">
+                <span>📰 <strong>{art['source']}</strong></span>
+                <span>📅 {art['date'][:10]}</span>
+                <span>📂 {art.get('category', 'general').title()}</span>
+            </div>
+            <div class="sentiment-badge {sentiment_class}">
+                {art['sentiment'].title() if art.get('sentiment') else 'Neutral'}
+            </div>
+            <p style="margin-top: 1rem; line-height: 1.6; color: #495057;">{art["summary"]}</p>
+            <a href="{art['url']}" target="_blank" class="read-more-btn">📖 Read Full Article</a>
+        </div>
+        """)
+        if art.get("keyphrases"):
+            keyphrase_tags = "".join([f'<span class="keyphrase-tag">{kp}</span>' for kp in art["keyphrases"]])
+            out.append(f"""
+            <div class="keyphrases">
+                <div style="font-size: 0.9rem; font-weight: 600; color: #495057; margin-bottom: 0.5rem;">🏷️ Key Phrases:</div>
+                {keyphrase_tags}
+            </div>
+            """)
+    return out
+
+
+def after(articles: list) -> list:
+    return [cards.cards_html(articles)]
+
+
+def timed(fn, articles_for_run, repeat: int, clear: bool):
+    best, out = float("inf"), None
+    for r in range(repeat):
+        if clear:
+            cards._card.cache_clear()
+        articles = articles_for_run(r)
+        started = time.perf_counter()
+        out = fn(articles)
+        best = min(best, time.perf_counter() - started)
+    return best, out
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    print(f"{'cards':>6} {'variant':<8} {'ms':>8} {'messages':>9} {'bytes':>10}")
+    for n in args.sizes:
+        page = make_articles(n)
+        rows = [
+            ("before", *timed(before, lambda r: page, args.repeat, clear=False)),
+            ("cold", *timed(after, lambda r: make_articles(n, (r + 1) * n), args.repeat, clear=True)),
+        ]
+        after(page)
+        rows.append(("warm", *timed(after, lambda r: page, args.repeat, clear=False)))
+        for name, seconds, out in rows:
+            size = sum(len(s.encode()) for s in out)
+            print(f"{n:>6} {name:<8} {seconds * 1000:>8.3f} {len(out):>9} {size:>10,}")
+
+
+if __name__ == "__main__":
+    main()
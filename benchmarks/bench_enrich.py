@@ -0,0 +1,51 @@
+"""
+Benchmark: tek tek enrich() vs enrich_batch().
+
+Gerçek Language servisi yerine sabit gecikmeli sahte bir TextAnalyticsClient
+kullanır; her çağrıyı sayar ve duvar saati süresini ölçer.
+
+    python benchmarks/bench_enrich.py --articles 45 --latency 0.05 --poll 0.2
+"""
+import os
+import sys
+import time
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import ingest_news  # noqa: E402
+from ingest_fakes import FakeTextAnalyticsClient, make_article  # noqa: E402
+
+
+def run(label, fn, articles, client):
+    ingest_news.lang_client = client
+    started = time.perf_counter()
+    docs = fn(articles)
+    elapsed = time.perf_counter() - started
+    print(
+        f"{label:<8} articles={len(docs):<5} calls={client.calls:<5} "
+        f"calls/article={client.calls / len(docs):.2f}  wall={elapsed:.2f}s"
+    )
+    return docs
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--articles", type=int, default=45)
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds per request")
+    parser.add_argument("--poll", type=float, default=0.2, help="seconds until an LRO job completes")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of documents that fail")
+    args = parser.parse_args()
+
+    articles = [make_article(i) for i in range(args.articles)]
+    run("serial", lambda arts: [ingest_news.enrich(a) for a in arts], articles,
+        FakeTextAnalyticsClient(latency=args.latency, poll=args.poll))
+    docs = run("batch", ingest_news.enrich_batch, articles,
+               FakeTextAnalyticsClient(latency=args.latency, poll=args.poll, error_rate=args.error_rate))
+    failed = sum(1 for d in docs if d["sentiment"] is None)
+    if failed:
+        print(f"batch: {failed} documents failed individually, rest of batch kept")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Peak server memory of a full-corpus pull: buffered vs. /export streaming.
+
+Loads a synthetic corpus (bench_search_backends.synthetic_corpus) into the
+local search backend and pulls every document twice, measuring the Python
+heap high-water mark (tracemalloc) of the serving side only:
+
+* buffered — what `top=N` callers get today: one search with top=N, a list
+  of articles and one JSON body built in memory;
+* streaming — backend/export.py's generator, page by page, each chunk
+  dropped as soon as it is "sent".
+
+The index itself is built before tracing starts and is not counted.
+
+    python benchmarks/bench_export.py
+    python benchmarks/bench_export.py --docs 20000 --page-size 500 --gzip
+"""
+import os
+import sys
+import time
+import asyncio
+import argparse
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from bench_search_backends import synthetic_corpus  # noqa: E402
+from backend.export import export_stream  # noqa: E402
+from backend.local_index import LocalIndex  # noqa: E402
+from backend.pagination import PAGE_ORDER, PAGE_SELECT  # noqa: E402
+from backend.search_backends import LocalSearchBackend  # noqa: E402
+from backend.serializers import dumps, to_article  # noqa: E402
+from doc_keys import url_to_key  # noqa: E402
+
+
+async def buffered(backend, n: int) -> int:
+    _, body = await backend.search({"search": "*", "top": n, "orderby": PAGE_ORDER, "select": PAGE_SELECT})
+    return len(dumps([to_article(d) for d in body["value"]]))
+
+
+async def streamed(backend, page_size: int, compress: bool) -> int:
+    sent = 0
+    async for chunk in export_stream(backend.search, page_size=page_size, compress=compress):
+        sent += len(chunk)
+    return sent
+
+
+def measure(coro) -> tuple:
+    tracemalloc.start()
+    started = time.perf_counter()
+    sent = asyncio.run(coro)
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return sent, elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--docs", type=int, default=100_000)
+    parser.add_argument("--page-size", type=int, default=1000)
+    parser.add_argument("--gzip", action="store_true")
+    args = parser.parse_args()
+
+    backend = LocalSearchBackend(source=None)
+    backend.index = LocalIndex()
+    for d in synthetic_corpus(args.docs):
+        backend.index.add(url_to_key(d["url"]), d)
+    asyncio.run(backend.search({"search": "*", "top": 1, "orderby": PAGE_ORDER}))  # sütunları ısıt
+
+    print(f"{'mode':<10} {'MB sent':>8} {'seconds':>8} {'peak MB':>8}")
+    for name, coro in (
+        ("buffered", buffered(backend, args.docs)),
+        ("streaming", streamed(backend, args.page_size, args.gzip)),
+    ):
+        sent, elapsed, peak = measure(coro)
+        print(f"{name:<10} {sent / 1e6:>8.1f} {elapsed:>8.2f} {peak / 1e6:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
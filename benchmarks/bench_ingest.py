@@ -0,0 +1,108 @@
+"""
+Ingest throughput benchmark against the offline fakes (ingest_fakes.py).
+
+Runs the full ingest (incremental state, enrichment cache, shards) in both
+--serial and pipeline mode at 50, 500 and 5,000 articles and reports
+articles/sec, service calls per article and peak Python memory.
+
+    python benchmarks/bench_ingest.py
+    python benchmarks/bench_ingest.py --sizes 500 --modes pipeline --latency 0.05
+"""
+import io
+import os
+import sys
+import math
+import time
+import shutil
+import argparse
+import tempfile
+import tracemalloc
+import contextlib
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+# Ölçülen şey pipeline; rate limit/bütçe politikaları bench_rate_limits.py'de
+for name in ("NEWSAPI_RPS", "LANGUAGE_RPS", "BLOB_RPS"):
+    os.environ.setdefault(name, "0")
+os.environ.setdefault("NEWSAPI_DAILY_LIMIT", "1000000")
+
+import ingest_news  # noqa: E402
+from ingest_fakes import FakeClients  # noqa: E402
+from news_fetch import DEFAULT_PAGE_SIZE, DEFAULT_MAX_PAGES  # noqa: E402
+
+# Kategori başına tüm sayfalar dolu gelir
+PER_CATEGORY = DEFAULT_PAGE_SIZE * DEFAULT_MAX_PAGES
+
+
+def bench(size, mode, args):
+    root = tempfile.mkdtemp(prefix="newspulse-bench-")
+    n_categories = math.ceil(size / PER_CATEGORY)
+    try:
+        clients = FakeClients(
+            root=root,
+            articles_per_category=math.ceil(size / n_categories),
+            latency=args.latency,
+            poll=args.poll,
+            error_rate=args.error_rate,
+            max_rps=args.max_rps,
+        )
+        ingest_news.use_clients(clients)
+        ingest_news.ENRICH_CACHE_PATH = os.path.join(root, "enrich_cache.sqlite")
+        ingest_news.FINGERPRINT_PATH = os.path.join(root, "fingerprints.sqlite")
+        ingest_news.VECTOR_PATH = os.path.join(root, "vectors")
+        ingest_news.TRENDS_PATH = os.path.join(root, "trends.sqlite")
+        ingest_news.TRENDS_SNAPSHOT_PATH = os.path.join(root, "trends.json")
+        ingest_news.ROLLUP_PATH = os.path.join(root, "rollups.sqlite")
+        ingest_news.ROLLUP_DIR = os.path.join(root, "rollups")
+        categories = [f"cat{i:04d}" for i in range(n_categories)]
+        argv = ["--clients", "fake", "--categories", *categories]
+        if mode == "serial":
+            argv.append("--serial")
+        run_args = ingest_news.parse_args(argv)
+
+        tracemalloc.start()
+        started = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            ingest_news.run(run_args)
+        elapsed = time.perf_counter() - started
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        stored = sum(1 for _ in clients.container.list_blobs())
+        calls = clients.calls()
+        return {
+            "size": size,
+            "mode": mode,
+            "stored": stored,
+            "seconds": elapsed,
+            "rate": stored / elapsed,
+            "calls_per_article": sum(calls.values()) / max(stored, 1),
+            "calls": calls,
+            "peak_mb": peak / 1e6,
+        }
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[50, 500, 5000])
+    parser.add_argument("--modes", nargs="+", choices=["serial", "pipeline"], default=["serial", "pipeline"])
+    parser.add_argument("--latency", type=float, default=0.01, help="seconds per request")
+    parser.add_argument("--poll", type=float, default=0.2, help="seconds until an analyze job completes")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--max-rps", type=float, default=None)
+    args = parser.parse_args()
+
+    print(f"{'articles':>8} {'mode':<9} {'stored':>6} {'wall s':>8} {'art/s':>8} {'calls/art':>9} {'peak MB':>8}  calls")
+    for size in args.sizes:
+        for mode in args.modes:
+            r = bench(size, mode, args)
+            print(
+                f"{r['size']:>8} {r['mode']:<9} {r['stored']:>6} {r['seconds']:>8.2f} {r['rate']:>8.1f} "
+                f"{r['calls_per_article']:>9.2f} {r['peak_mb']:>8.1f}  {r['calls']}"
+            )
+
+
+if __name__ == "__main__":
+    main()
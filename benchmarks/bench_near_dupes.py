@@ -0,0 +1,72 @@
+"""
+Near-duplicate index benchmark on a synthetic corpus (default 100k articles).
+
+The index is grown step by step; at each size a batch of near-duplicate
+queries (a few words edited) and fresh stories is looked up. Lookup latency
+should stay roughly flat as the corpus grows (LSH, not a linear scan).
+
+    python benchmarks/bench_near_dupes.py --sizes 1000 10000 100000
+"""
+import os
+import sys
+import time
+import random
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from near_dupes import NearDuplicateIndex  # noqa: E402
+
+VOCABULARY = [f"w{i}" for i in range(5000)]
+
+
+def make_article(rng, i):
+    words = [rng.choice(VOCABULARY) for _ in range(45)]
+    return {"url": f"https://example.com/{i}", "title": " ".join(words[:8]), "content": " ".join(words[8:])}
+
+
+def edit(rng, article, changes):
+    words = (article["title"] + " " + article["content"]).split()
+    for _ in range(changes):
+        words[rng.randrange(len(words))] = rng.choice(VOCABULARY)
+    return {"url": article["url"] + "?copy", "title": " ".join(words[:8]), "content": " ".join(words[8:])}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--changes", type=int, default=2, help="words edited in a near-duplicate")
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    path = os.path.join(tempfile.mkdtemp(prefix="newspulse-neardup-"), "fingerprints.sqlite")
+    index = NearDuplicateIndex(path, max_entries=max(args.sizes))
+    corpus = []
+
+    print(f"{'corpus':>8} {'build s':>8} {'lookup ms':>10} {'recall':>7} {'false +':>8}")
+    for size in args.sizes:
+        started = time.perf_counter()
+        while len(corpus) < size:
+            art = make_article(rng, len(corpus))
+            corpus.append(art)
+            doc = {**art, "summary": "", "sentiment": "neutral", "keyphrases": []}
+            index.add(doc, index.signature(art))
+        index.conn.commit()
+        build = time.perf_counter() - started
+
+        dups = [edit(rng, rng.choice(corpus), args.changes) for _ in range(args.queries)]
+        fresh = [make_article(rng, f"fresh-{size}-{i}") for i in range(args.queries)]
+        started = time.perf_counter()
+        found_dups = sum(1 for a in dups if (index.find(a) or (None,))[0] == "doc")
+        found_fresh = sum(1 for a in fresh if (index.find(a) or (None,))[0] == "doc")
+        lookup_ms = (time.perf_counter() - started) * 1000 / (2 * args.queries)
+
+        print(f"{size:>8} {build:>8.1f} {lookup_ms:>10.3f} {found_dups / args.queries:>7.1%} "
+              f"{found_fresh / args.queries:>8.1%}")
+    index.close()
+
+
+if __name__ == "__main__":
+    main()
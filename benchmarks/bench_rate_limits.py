@@ -0,0 +1,129 @@
+"""
+Rate limiting benchmark against fakes that answer 429 above `--max-rps`.
+
+Runs the same ingest three ways and reports what reached storage, wall time,
+how many requests the fakes throttled and how many the limiter retried:
+
+* retry    – no token buckets, only backoff on 429 (Retry-After honoured);
+* bucket   – token buckets paced just under the fakes' limit, plus backoff;
+* budget   – two back-to-back runs sharing a tiny NewsAPI daily budget; the
+             second run must stop at the ledger instead of calling NewsAPI.
+
+    python benchmarks/bench_rate_limits.py
+    python benchmarks/bench_rate_limits.py --articles 1000 --max-rps 40
+"""
+import io
+import os
+import sys
+import math
+import time
+import shutil
+import argparse
+import tempfile
+import contextlib
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import ingest_news  # noqa: E402
+from ingest_fakes import FakeClients  # noqa: E402
+from news_fetch import DEFAULT_PAGE_SIZE, DEFAULT_MAX_PAGES  # noqa: E402
+from rate_limits import ServicePolicy  # noqa: E402
+
+PER_CATEGORY = DEFAULT_PAGE_SIZE * DEFAULT_MAX_PAGES
+
+
+def paced(max_rps: float, daily_limit: int = None) -> ServicePolicy:
+    # Fake'in 1 sn'lik penceresine burst + rate sığmalı
+    return ServicePolicy(rate=max_rps * 0.95, burst=1, daily_limit=daily_limit)
+
+
+def policies(scenario: str, max_rps: float, daily_limit: int) -> dict:
+    if scenario == "retry":
+        return {name: ServicePolicy(daily_limit=daily_limit if name == "newsapi" else None)
+                for name in ("newsapi", "language", "blob")}
+    return {
+        "newsapi": paced(max_rps, daily_limit),
+        "language": paced(max_rps),
+        "blob": paced(max_rps),
+    }
+
+
+def ingest(clients, categories, mode, scenario, args, daily_limit):
+    argv = ["--clients", "fake", "--categories", *categories]
+    if mode == "serial":
+        argv.append("--serial")
+    run_args = ingest_news.parse_args(argv)
+    limits = policies(scenario, args.max_rps, daily_limit)
+    started = time.perf_counter()
+    out = io.StringIO()
+    with contextlib.redirect_stdout(out):
+        ingest_news.run(run_args, limits)
+    summary = [line for line in out.getvalue().splitlines() if line.startswith("rate limits:")]
+    return time.perf_counter() - started, summary[-1] if summary else ""
+
+
+def bench(mode, scenario, args):
+    root = tempfile.mkdtemp(prefix="newspulse-ratelimit-")
+    n_categories = math.ceil(args.articles / PER_CATEGORY)
+    try:
+        clients = FakeClients(
+            root=root,
+            articles_per_category=math.ceil(args.articles / n_categories),
+            latency=args.latency,
+            poll=args.poll,
+            max_rps=args.max_rps,
+        )
+        ingest_news.use_clients(clients)
+        ingest_news.ENRICH_CACHE_PATH = os.path.join(root, "enrich_cache.sqlite")
+        ingest_news.FINGERPRINT_PATH = os.path.join(root, "fingerprints.sqlite")
+        categories = [f"cat{i:04d}" for i in range(n_categories)]
+
+        runs = 2 if scenario == "budget" else 1
+        # budget: ilk run bütçenin neredeyse tamamını harcasın
+        daily_limit = n_categories * DEFAULT_MAX_PAGES + 1 if scenario == "budget" else 1_000_000
+        elapsed, summary, newsapi_calls = 0.0, "", []
+        for _ in range(runs):
+            before = clients.newsapi.calls
+            seconds, summary = ingest(clients, categories, mode, scenario, args, daily_limit)
+            elapsed += seconds
+            newsapi_calls.append(clients.newsapi.calls - before)
+
+        fakes = clients.services()
+        throttled = sum(f.throttled for group in fakes.values()
+                        for f in (group if isinstance(group, list) else [group]))
+        return {
+            "mode": mode,
+            "scenario": scenario,
+            "stored": sum(1 for _ in clients.container.list_blobs()),
+            "seconds": elapsed,
+            "throttled": throttled,
+            "newsapi_calls": newsapi_calls,
+            "summary": summary,
+        }
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--articles", type=int, default=300)
+    parser.add_argument("--max-rps", type=float, default=25, help="requests/s before the fakes answer 429")
+    parser.add_argument("--latency", type=float, default=0.01)
+    parser.add_argument("--poll", type=float, default=0.1)
+    parser.add_argument("--modes", nargs="+", choices=["serial", "pipeline"], default=["serial", "pipeline"])
+    parser.add_argument("--scenarios", nargs="+", choices=["retry", "bucket", "budget"],
+                        default=["retry", "bucket", "budget"])
+    args = parser.parse_args()
+
+    print(f"{'mode':<9} {'scenario':<8} {'stored':>6} {'wall s':>7} {'429s':>5} {'newsapi/run':>12}  limiter")
+    for mode in args.modes:
+        for scenario in args.scenarios:
+            r = bench(mode, scenario, args)
+            print(
+                f"{r['mode']:<9} {r['scenario']:<8} {r['stored']:>6} {r['seconds']:>7.2f} {r['throttled']:>5} "
+                f"{str(r['newsapi_calls']):>12}  {r['summary']}"
+            )
+
+
+if __name__ == "__main__":
+    main()
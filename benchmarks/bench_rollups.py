@@ -0,0 +1,115 @@
+"""
+Month-long sentiment-by-day series: counting documents vs reading rollups.
+
+before  – what an analytical question cost so far: every document of the
+          range is pulled (here: already in memory, so network time is not
+          even counted) and tallied in Python;
+after   – the ingester's daily rollups (rollups.py): the month blob(s) the
+          range spans are read from disk and the matching cells summed
+          (backend/timeseries.py).
+
+Corpora of growing size are spread over 90 days. The rollup query should
+stay flat while the scan grows with the corpus. Ingesting the corpus a
+second time must leave every count unchanged.
+
+    python benchmarks/bench_rollups.py
+    python benchmarks/bench_rollups.py --sizes 10000 100000 --repeat 5
+"""
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import argparse
+import shutil
+import tempfile
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from rollups import RollupStore  # noqa: E402
+from backend.timeseries import RollupReader, dir_loader, series  # noqa: E402
+
+FIRST_DAY = date(2025, 1, 1)
+SPAN_DAYS = 90
+SOURCES = [f"Source {i}" for i in range(40)]
+
+
+def corpus(n: int, seed: int = 0) -> list:
+    rng = random.Random(seed)
+    return [
+        {
+            "url": f"https://example.com/{i}",
+            "published": (FIRST_DAY + timedelta(days=rng.randrange(SPAN_DAYS))).isoformat() + f"T{rng.randrange(24):02d}:00:00Z",
+            "category": rng.choice(["technology", "science", "business"]),
+            "source": rng.choice(SOURCES),
+            "sentiment": rng.choice(["positive", "neutral", "negative", None]),
+        }
+        for i in range(n)
+    ]
+
+
+def scan_series(docs: list, first: date, last: date) -> dict:
+    lo, hi = first.isoformat(), last.isoformat()
+    days = [(first + timedelta(days=i)).isoformat() for i in range((last - first).days + 1)]
+    index = {d: i for i, d in enumerate(days)}
+    out = {}
+    for doc in docs:
+        day = doc["published"][:10]
+        if lo <= day <= hi:
+            key = doc["sentiment"] or "unknown"
+            out.setdefault(key, [0] * len(days))[index[day]] += 1
+    return dict(sorted(out.items()))
+
+
+def best_of(repeat: int, fn):
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 300_000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    first, last = date(2025, 2, 1), date(2025, 2, 28)
+    print(f"{'docs':>8} {'before ms':>10} {'after ms':>9} {'reads':>6} {'ingest ms/doc':>14} {'month KB':>9}")
+    for n in args.sizes:
+        root = tempfile.mkdtemp(prefix="newspulse-rollups-")
+        try:
+            docs = corpus(n)
+            store = RollupStore(os.path.join(root, "rollups.sqlite"))
+            started = time.perf_counter()
+            for doc in docs:
+                store.add(doc)
+            ingest = time.perf_counter() - started
+            assert not any(store.add(doc) for doc in docs), "re-ingest changed the counts"
+            for month in sorted(store.touched):
+                with open(os.path.join(root, f"{month}.json"), "w", encoding="utf-8") as f:
+                    json.dump(store.month(month), f)
+            store.close()
+
+            t_before, expected = best_of(args.repeat, lambda: scan_series(docs, first, last))
+
+            def rollup_query():
+                reader = RollupReader(dir_loader(root), cache=False)
+                rows = asyncio.run(reader.rows(first, last))
+                return reader.reads, series(rows, first, last, "sentiment")
+
+            t_after, (reads, got) = best_of(args.repeat, rollup_query)
+            assert got["series"] == expected, "rollup series differ from the scan"
+            size = os.path.getsize(os.path.join(root, "2025-02.json")) / 1024
+            print(f"{n:>8} {t_before * 1000:>10.1f} {t_after * 1000:>9.1f} {reads:>6} "
+                  f"{ingest * 1000 / n:>14.3f} {size:>9.1f}")
+        finally:
+            shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+"""
+Search backend latency: the in-process BM25 index vs. a remote search service.
+
+Builds a synthetic corpus (100k articles by default) in the ingester's
+document shape, loads it into a LocalIndex and times the request payloads
+the backend actually sends (list page, keyset page, keyword search,
+combined filters, /stats facets, a 100-id batch lookup) through
+LocalSearchBackend. The same payloads then go to the remote backend:
+
+* by default a fake Azure Search server on localhost answering after
+  `--latency` seconds, i.e. the round trip the local backend skips;
+* with --remote, the real service from SEARCH_ENDPOINT / SEARCH_KEY (its
+  index holds a different corpus, so only the latencies compare).
+
+Also reports index build time, snapshot size and snapshot load time.
+
+    python benchmarks/bench_search_backends.py
+    python benchmarks/bench_search_backends.py --docs 20000 --repeat 50 --remote
+"""
+import os
+import sys
+import time
+import pickle
+import random
+import itertools
+import asyncio
+import argparse
+import tempfile
+
+import httpx
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from bench_backend import serve  # noqa: E402
+from backend.local_index import LocalIndex  # noqa: E402
+from backend.pagination import PAGE_ORDER, PAGE_SELECT  # noqa: E402
+from backend.search_backends import AzureSearchBackend, LocalSearchBackend  # noqa: E402
+from backend.serializers import ARTICLE_SELECT  # noqa: E402
+from backend.stats import stats_facets  # noqa: E402
+from doc_keys import url_to_key  # noqa: E402
+
+CATEGORIES = ["technology", "science", "business"]
+SENTIMENTS = ["positive", "neutral", "negative"]
+
+
+def synthetic_corpus(n: int, seed: int = 7) -> list:
+    rng = random.Random(seed)
+    vocab = [f"w{i}" for i in range(20000)]
+    # Zipf benzeri: az sayıda kelime çok sık geçer
+    cum_weights = list(itertools.accumulate(1 / (i + 1) for i in range(len(vocab))))
+    sources = [f"Source {i}" for i in range(60)]
+    words = lambda k: rng.choices(vocab, cum_weights=cum_weights, k=k)  # noqa: E731
+    docs = []
+    for i in range(n):
+        url = f"https://news.example.com/{i}"
+        day = 1 + rng.randrange(365)
+        docs.append({
+            "id": url,
+            "title": " ".join(words(9)),
+            "published": f"2025-{1 + (day - 1) // 31 % 12:02d}-{1 + (day - 1) % 28:02d}T{rng.randrange(24):02d}:{rng.randrange(60):02d}:00Z",
+            "summary": " ".join(words(60)),
+            "sentiment": rng.choice(SENTIMENTS),
+            "keyphrases": [" ".join(words(2)) for _ in range(5)],
+            "source": rng.choice(sources),
+            "url": url,
+            "category": rng.choice(CATEGORIES),
+            "engine": "local",
+        })
+    return docs
+
+
+def query_mix(docs: list) -> dict:
+    rng = random.Random(1)
+    page_2 = docs[len(docs) // 2]
+    ids = "|".join(d["url"] for d in rng.sample(docs, 100))
+    page = {"top": 25, "select": PAGE_SELECT, "orderby": PAGE_ORDER}
+    return {
+        "list page": {"search": "*", "count": True, **page},
+        "keyset page": {
+            "search": "*",
+            "filter": f"(content/published lt '{page_2['published']}' or "
+                      f"(content/published eq '{page_2['published']}' and content/id lt '{page_2['id']}'))",
+            **page,
+        },
+        "keyword": {"search": "w3 w120", "count": True, **page},
+        "filters": {
+            "search": "w42",
+            "filter": "(content/sentiment eq 'positive') and (content/category eq 'science') and "
+                      "(content/published ge '2025-03-01') and (content/published le '2025-06-30')",
+            "count": True,
+            **page,
+        },
+        "stats": {"search": "*", "top": 0, "count": True, "facets": stats_facets()},
+        "batch 100": {
+            "search": "*", "top": 100,
+            "filter": f"search.in(content/id, '{ids}', '|')",
+            "select": f"{ARTICLE_SELECT}, content/id",
+        },
+    }
+
+
+async def time_backend(backend, queries: dict, repeat: int) -> dict:
+    out = {}
+    for name, payload in queries.items():
+        await backend.search(payload)  # ısınma (sütunlar, rank'ler)
+        samples = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            await backend.search(payload)
+            samples.append(time.perf_counter() - started)
+        samples.sort()
+        out[name] = (samples[len(samples) // 2] * 1000, samples[min(len(samples) - 1, int(0.99 * len(samples)))] * 1000)
+    return out
+
+
+def remote_backend(args):
+    if args.remote:
+        endpoint, key = os.environ["SEARCH_ENDPOINT"], os.getenv("SEARCH_KEY", "")
+        proc = None
+    else:
+        proc, endpoint = serve("fake_search_app", args.latency)
+        key = "bench"
+    client = httpx.AsyncClient(base_url=endpoint, headers={"api-key": key}, timeout=30)
+    return proc, AzureSearchBackend(client, "azureblob-index", "2023-07-01-Preview")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--docs", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=30)
+    parser.add_argument("--latency", type=float, default=0.02, help="fake remote search latency in seconds")
+    parser.add_argument("--remote", action="store_true", help="time the real Azure Search service instead")
+    args = parser.parse_args()
+
+    docs = synthetic_corpus(args.docs)
+    started = time.perf_counter()
+    index = LocalIndex()
+    for d in docs:
+        index.add(url_to_key(d["url"]), d)
+    print(f"built index of {len(index)} docs in {time.perf_counter() - started:.1f}s")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        backend = LocalSearchBackend(source=None, snapshot_path=os.path.join(tmp, "index.pickle"))
+        backend.index = index
+        started = time.perf_counter()
+        backend.save_snapshot()
+        saved = time.perf_counter() - started
+        size = os.path.getsize(backend.snapshot_path)
+        started = time.perf_counter()
+        with open(backend.snapshot_path, "rb") as f:
+            pickle.load(f)
+        print(f"snapshot {size / 1e6:.1f} MB, saved in {saved:.1f}s, loaded in {time.perf_counter() - started:.1f}s")
+
+    queries = query_mix(docs)
+    local = asyncio.run(time_backend(backend, queries, args.repeat))
+
+    proc, remote = remote_backend(args)
+
+    async def run_remote():
+        try:
+            return await time_backend(remote, queries, args.repeat)
+        finally:
+            await remote.close()
+
+    try:
+        remote_times = asyncio.run(run_remote())
+    finally:
+        if proc is not None:
+            proc.terminate()
+
+    label = "azure" if args.remote else f"fake remote ({args.latency * 1000:.0f} ms)"
+    print(f"\n{'query':<12} {'local p50':>10} {'local p99':>10}   {label} p50 / p99")
+    for name in queries:
+        (lp50, lp99), (rp50, rp99) = local[name], remote_times[name]
+        print(f"{name:<12} {lp50:>9.2f}ms {lp99:>9.2f}ms   {rp50:.2f}ms / {rp99:.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
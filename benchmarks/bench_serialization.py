@@ -0,0 +1,123 @@
+"""
+Payload size and serialization cost per 1,000 documents, before and after
+field projection (`select`) and the shared orjson serializer.
+
+before – full index documents cross the wire (blob metadata_* fields and
+         every content field), each endpoint rebuilds the article dict and
+         FastAPI runs jsonable_encoder + json.dumps on the result;
+after  – only ARTICLE_SELECT crosses the wire, to_article() builds the
+         dict and FastJSONResponse encodes it directly.
+
+Both sides include parsing the Search response, like httpx's resp.json().
+
+    python benchmarks/bench_serialization.py
+    python benchmarks/bench_serialization.py --docs 1000 --repeat 20
+"""
+import os
+import sys
+import json
+import time
+import base64
+import argparse
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from backend.serializers import ARTICLE_FIELDS, FastJSONResponse, to_article  # noqa: E402
+from ingest_fakes import make_article  # noqa: E402
+
+
+def index_document(i: int) -> dict:
+    """What the blob indexer stores for one uploaded article."""
+    art = make_article(i)
+    url = art["url"]
+    blob = base64.urlsafe_b64encode(url.encode()).decode() + ".json"
+    return {
+        "@search.score": 1.0,
+        "content": {
+            "id": url,
+            "title": art["title"],
+            "published": art["publishedAt"],
+            "summary": art["content"][:300],
+            "sentiment": "neutral",
+            "keyphrases": art["content"].split()[:5],
+            "source": art["source"]["name"],
+            "url": url,
+            "category": art["category"],
+            "engine": "azure-language",
+        },
+        "metadata_storage_content_type": "application/json",
+        "metadata_storage_size": 1200 + i % 500,
+        "metadata_storage_last_modified": "2025-01-02T03:04:05Z",
+        "metadata_storage_content_md5": base64.b64encode(os.urandom(16)).decode(),
+        "metadata_storage_name": blob,
+        "metadata_storage_path": base64.urlsafe_b64encode(
+            f"https://account.blob.core.windows.net/news/{blob}".encode()).decode(),
+        "metadata_storage_file_extension": ".json",
+        "metadata_content_type": "application/json",
+        "metadata_language": "en",
+    }
+
+
+def project(doc: dict) -> dict:
+    """What Search returns for the same document with `select`."""
+    content = {path.split("/", 1)[1]: doc["content"].get(path.split("/", 1)[1]) for path in ARTICLE_FIELDS}
+    return {"@search.score": doc["@search.score"], "content": content}
+
+
+def before(raw: bytes) -> bytes:
+    docs = json.loads(raw)["value"]
+    result = [
+        {
+            "title":       d["content"]["title"],
+            "source":      d["content"]["source"],
+            "date":        d["content"]["published"],
+            "sentiment":   d["content"]["sentiment"],
+            "summary":     d["content"]["summary"],
+            "url":         d["content"]["url"],
+            "keyphrases":  d["content"]["keyphrases"],
+            "category":    d["content"].get("category", "general"),
+        }
+        for d in docs
+    ]
+    return JSONResponse(jsonable_encoder(result)).body
+
+
+def after(raw: bytes) -> bytes:
+    docs = json.loads(raw)["value"]
+    return FastJSONResponse([to_article(d) for d in docs]).body
+
+
+def timed(fn, raw: bytes, repeat: int) -> tuple:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        body = fn(raw)
+        best = min(best, time.perf_counter() - started)
+    return best, body
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--docs", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    full = [index_document(i) for i in range(args.docs)]
+    raw_full = json.dumps({"value": full}).encode()
+    raw_selected = json.dumps({"value": [project(d) for d in full]}).encode()
+
+    t_before, body_before = timed(before, raw_full, args.repeat)
+    t_after, body_after = timed(after, raw_selected, args.repeat)
+    assert json.loads(body_before) == json.loads(body_after), "responses differ"
+
+    per = 1000 / args.docs
+    print(f"per 1,000 docs   {'search bytes':>12} {'response bytes':>14} {'serialize ms':>12}")
+    print(f"{'before':<16} {len(raw_full) * per:>12,.0f} {len(body_before) * per:>14,.0f} {t_before * 1000 * per:>12.2f}")
+    print(f"{'after':<16} {len(raw_selected) * per:>12,.0f} {len(body_after) * per:>14,.0f} {t_after * 1000 * per:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Incremental trend updates: cost of one ingest run as the store grows, and
+whether an injected burst comes out on top.
+
+A synthetic stream of articles (Zipf-distributed key phrases, three
+categories) is fed hour by hour over `--days` days. Every `--run` articles
+count as one ingest run: TrendStore.add() for each, then prune + snapshot,
+as close_trends() does. In the last six hours one phrase of "science" gets
+`--burst` extra mentions per hour.
+
+The run time should stay flat while the number of stored articles grows;
+a rescan-the-corpus approach grows linearly with it.
+
+    python benchmarks/bench_trends.py
+    python benchmarks/bench_trends.py --days 30 --per-hour 150 --run 500
+"""
+import os
+import sys
+import time
+import random
+import shutil
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from trends import TrendStore, iso_time  # noqa: E402
+
+CATEGORIES = ["technology", "science", "business"]
+BURST_PHRASE = "solar flare"
+
+
+def article(rng: random.Random, i: int, t: float, vocab: list, weights: list, category: str = None) -> dict:
+    return {
+        "url": f"https://example.com/{i}",
+        "published": iso_time(t),
+        "category": category or rng.choice(CATEGORIES),
+        "keyphrases": rng.choices(vocab, cum_weights=weights, k=6),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--per-hour", type=int, default=150)
+    parser.add_argument("--run", type=int, default=500, help="articles per ingest run")
+    parser.add_argument("--vocab", type=int, default=20000)
+    parser.add_argument("--burst", type=int, default=8, help="extra articles per hour with the burst phrase")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    vocab = [f"phrase {i}" for i in range(args.vocab)]
+    weights, total = [], 0.0
+    for rank in range(1, args.vocab + 1):
+        total += 1.0 / rank
+        weights.append(total)
+
+    root = tempfile.mkdtemp(prefix="newspulse-trends-")
+    store = TrendStore(os.path.join(root, "trends.sqlite"))
+    end = (time.time() // 3600) * 3600
+    start = end - args.days * 86400
+    i, pending, runs, done = 0, 0, [], 0
+    try:
+        print(f"{'stored':>8} {'run ms':>8} {'ms/article':>10} {'snapshot ms':>11} {'db MB':>6}")
+        hour = start
+        while hour < end:
+            batch = [article(rng, i + k, hour + rng.random() * 3600, vocab, weights) for k in range(args.per_hour)]
+            if hour >= end - 6 * 3600:
+                for _ in range(args.burst):
+                    doc = article(rng, i + len(batch), hour + rng.random() * 3600, vocab, weights, "science")
+                    doc["keyphrases"][0] = BURST_PHRASE
+                    batch.append(doc)
+            started = time.perf_counter()
+            for doc in batch:
+                store.add(doc, now=end)
+            pending += len(batch)
+            elapsed = time.perf_counter() - started
+            i += len(batch)
+            hour += 3600
+            runs.append((len(batch), elapsed))
+            if pending >= args.run or hour >= end:
+                n = sum(r[0] for r in runs)
+                t_add = sum(r[1] for r in runs)
+                started = time.perf_counter()
+                store.prune(now=end)
+                snapshot = store.snapshot(50, now=end)
+                store.conn.commit()
+                t_snap = time.perf_counter() - started
+                size = os.path.getsize(store.path) / 1e6
+                done += 1
+                if done % 10 == 0 or hour >= end:
+                    print(f"{i:>8} {t_add * 1000:>8.1f} {t_add * 1000 / n:>10.3f} {t_snap * 1000:>11.1f} {size:>6.1f}")
+                pending, runs = 0, []
+
+        print()
+        for category, phrases in snapshot["categories"].items():
+            top = ", ".join(f"{p['phrase']} ({p['burst']:.1f})" for p in phrases[:3])
+            print(f"{category:<11} {top}")
+        print(store.summary())
+    finally:
+        store.close()
+        shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Vector search recall vs. latency.
+
+Embeds a synthetic corpus with the hashing embedder into a VectorStore in a
+temp directory, then compares brute force with the IVF index at several
+`nprobe` settings. Like real news, the corpus is topical: every article
+draws most of its words from one of `--topics` topic vocabularies, the rest
+from a shared Zipf-distributed one (uniformly random text has no neighbour
+structure for any index to exploit).
+
+* recall@k of IVF against the exact brute-force neighbours;
+* p50 / p99 latency of one query, and throughput of batched queries.
+
+Queries are article titles, embedded the way /search?mode=vector does it.
+
+    python benchmarks/bench_vectors.py
+    python benchmarks/bench_vectors.py --docs 200000 --queries 500 --nprobe 1 4 16 64
+"""
+import os
+import sys
+import time
+import random
+import itertools
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from embeddings import embedding_text, make_embedder  # noqa: E402
+from vector_store import IVFIndex, VectorStore  # noqa: E402
+
+
+def topical_corpus(n: int, topics: int, seed: int = 7) -> list:
+    rng = random.Random(seed)
+    common = [f"w{i}" for i in range(5000)]
+    cum = list(itertools.accumulate(1 / (i + 1) for i in range(len(common))))
+    vocab = [[f"t{t}x{i}" for i in range(40)] for t in range(topics)]
+    docs = []
+    for i in range(n):
+        topic = vocab[rng.randrange(topics)]
+        words = lambda k: [rng.choice(topic) if rng.random() < 0.6 else rng.choices(common, cum_weights=cum)[0]
+                           for _ in range(k)]  # noqa: E731
+        docs.append({
+            "id": f"https://news.example.com/{i}",
+            "title": " ".join(words(9)),
+            "summary": " ".join(words(60)),
+            "keyphrases": [" ".join(words(2)) for _ in range(5)],
+        })
+    return docs
+
+
+def percentiles(samples: list) -> tuple:
+    samples = sorted(samples)
+    pick = lambda q: samples[min(len(samples) - 1, int(q * len(samples)))] * 1000  # noqa: E731
+    return pick(0.50), pick(0.99)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--docs", type=int, default=100_000)
+    parser.add_argument("--topics", type=int, default=500)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[1, 2, 4, 8, 16, 32])
+    parser.add_argument("--batch", type=int, default=64, help="queries per batched brute-force call")
+    args = parser.parse_args()
+
+    docs = topical_corpus(args.docs, args.topics)
+    embedder = make_embedder("hashing")
+    with tempfile.TemporaryDirectory() as tmp:
+        store = VectorStore.create(tmp, embedder.spec, embedder.dim)
+        started = time.perf_counter()
+        for s in range(0, len(docs), 10_000):
+            chunk = docs[s:s + 10_000]
+            store.append([d["id"] for d in chunk], embedder.embed([embedding_text(d) for d in chunk]))
+        elapsed = time.perf_counter() - started
+        print(f"embedded {store.count} docs in {elapsed:.1f}s ({store.count / elapsed:.0f} docs/s), "
+              f"matrix {store.count * store.dim * 4 / 1e6:.0f} MB")
+        store = VectorStore.open(tmp)  # okuyucu gibi: memmap
+
+        rng = random.Random(3)
+        queries = embedder.embed([d["title"] for d in rng.sample(docs, args.queries)])
+
+        times, exact = [], []
+        for q in queries:
+            started = time.perf_counter()
+            rows, _ = store.search(q, args.k)
+            times.append(time.perf_counter() - started)
+            exact.append(set(rows[0].tolist()))
+        p50, p99 = percentiles(times)
+        started = time.perf_counter()
+        for s in range(0, len(queries), args.batch):
+            store.search(queries[s:s + args.batch], args.k)
+        batched = len(queries) / (time.perf_counter() - started)
+        print(f"\n{'method':<16} {'recall@' + str(args.k):>10} {'p50 ms':>8} {'p99 ms':>8} {'q/s':>8}")
+        print(f"{'brute force':<16} {1.0:>10.3f} {p50:>8.2f} {p99:>8.2f} {1000 / p50:>8.0f}")
+        print(f"{'brute, batched':<16} {1.0:>10.3f} {'':>8} {'':>8} {batched:>8.0f}")
+
+        started = time.perf_counter()
+        ivf = IVFIndex.build(store)
+        print(f"{'':<16} (IVF with {len(ivf.centroids)} lists built in {time.perf_counter() - started:.1f}s)")
+        for nprobe in args.nprobe:
+            times, hits = [], 0
+            for q, truth in zip(queries, exact):
+                started = time.perf_counter()
+                rows, _ = ivf.search(store, q, args.k, nprobe)
+                times.append(time.perf_counter() - started)
+                hits += len(truth & set(rows[0].tolist()))
+            p50, p99 = percentiles(times)
+            recall = hits / sum(len(t) for t in exact)
+            print(f"{'ivf nprobe=' + str(nprobe):<16} {recall:>10.3f} {p50:>8.2f} {p99:>8.2f} {1000 / p50:>8.0f}")
+
+
+if __name__ == "__main__":
+    main()
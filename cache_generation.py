@@ -0,0 +1,49 @@
+"""
+Corpus generation counter shared by the ingester and the backend.
+
+The backend caches Azure Search results (backend/query_cache.py). The
+corpus only changes when ingest_news.py uploads new articles, so each run
+that uploaded something bumps a counter in the state container. The backend
+polls that blob and drops its cached results as soon as the number changes,
+instead of serving them until their TTL runs out.
+"""
+import json
+from datetime import datetime, timezone
+
+from azure.core.exceptions import ResourceNotFoundError, ResourceExistsError
+
+GENERATION_BLOB_NAME = "generation.json"
+
+
+def _parse(data) -> int:
+    return int(json.loads(data).get("generation", 0))
+
+
+def read_generation(state_container) -> int:
+    try:
+        return _parse(state_container.download_blob(GENERATION_BLOB_NAME).readall())
+    except ResourceNotFoundError:
+        return 0
+
+
+async def read_generation_async(state_container) -> int:
+    """Same as read_generation() for an azure.storage.blob.aio container client."""
+    try:
+        download = await state_container.download_blob(GENERATION_BLOB_NAME)
+        return _parse(await download.readall())
+    except ResourceNotFoundError:
+        return 0
+
+
+def bump_generation(state_container) -> int:
+    generation = read_generation(state_container) + 1
+    try:
+        state_container.create_container()
+    except ResourceExistsError:
+        pass
+    state_container.upload_blob(
+        GENERATION_BLOB_NAME,
+        json.dumps({"generation": generation, "updated": datetime.now(timezone.utc).isoformat()}),
+        overwrite=True,
+    )
+    return generation
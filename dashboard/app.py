@@ -1,10 +1,11 @@
 import streamlit as st
 import requests
-from collections import Counter
 import plotly.express as px
 import pandas as pd
 import math
 
+from cards import cards_html
+
 # ─────────────────────────────────────────────────────────────────────────────
 # 🎨 Tema Yöneticisi
 def get_theme_css(dark_mode=False):
@@ -434,53 +435,96 @@ if keyword and keyword not in st.session_state.search_history:
 
 # ─────────────────────────────────────────────────────────────────────────────
 # 🔗 API Functions
-@st.cache_data(ttl=300)
-def call_api(path, params=None):
+def api_get(path, params=None):
     try:
         r = requests.get(f"{API_BASE}{path}", params=params, timeout=10)
         r.raise_for_status()
-        return r.json()
+        return r
     except requests.exceptions.ConnectionError:
         st.error("🔌 Cannot connect to API. Please ensure the backend is running on http://localhost:8000")
-        return []
     except requests.exceptions.Timeout:
         st.error("⏱️ Request timed out. Please try again.")
-        return []
     except Exception as e:
         st.error(f"❌ API error: {str(e)}")
-        return []
+    return None
+
+@st.cache_data(ttl=300)
+def call_api(path, params=None):
+    r = api_get(path, params)
+    return r.json() if r is not None else []
+
+def fetch_dashboard(params, cursor=None):
+    """Kartlar, grafik serileri ve tek sayfa makale; hepsi backend'de, tek istekte."""
+    data = call_api("/dashboard", {**params, "cursor": cursor} if cursor else params)
+    return data or {"cards": {}, "charts": {}, "articles": [], "total": 0, "next_cursor": None}
 
 # ─────────────────────────────────────────────────────────────────────────────
 # 📊 Load Data
-fetch_count = 1000 if pagination_mode == "Show All" else 100
+# Sadece görünen sayfa istenir; "Show All" da tek istekle en fazla bu kadar getirir
+SHOW_ALL_LIMIT = 100
+
+filters = {}
+if keyword:
+    filters["q"] = keyword
+if category != "All":
+    filters["category"] = category
+if sentiment != "All":
+    filters["sentiment"] = sentiment
+
+if pagination_mode == "Pagination":
+    page_size = st.session_state.articles_per_page
+elif pagination_mode == "Load More":
+    page_size = st.session_state.loaded_articles
+else:
+    page_size = SHOW_ALL_LIMIT
+params = {"top": page_size, **filters}
+
+# Filtre ya da görünüm değişince sayfalama baştan başlar
+view = (pagination_mode, page_size, tuple(sorted(filters.items())))
+if st.session_state.get("view") != view:
+    st.session_state.view = view
+    st.session_state.current_page = 1
+    st.session_state.page_cursors = [None]  # sayfa n → page_cursors[n - 1]
+    st.session_state.more_articles = None
+    st.session_state.more_next = None
+    st.session_state.more_dashboard = None
 
 with st.spinner("Loading news articles..."):
-    if category != "All":
-        news = call_api("/category", {"category": category, "top": fetch_count})
-    elif keyword:
-        news = call_api("/search", {"q": keyword, "top": fetch_count})
-    elif sentiment != "All":
-        news = call_api("/sentiment", {"type": sentiment, "top": fetch_count})
+    if pagination_mode == "Load More":
+        if st.session_state.more_articles is None:
+            dashboard = fetch_dashboard(params)
+            st.session_state.more_dashboard = dashboard
+            st.session_state.more_articles = list(dashboard["articles"])
+            st.session_state.more_next = dashboard["next_cursor"]
+        dashboard = st.session_state.more_dashboard
+        news = st.session_state.more_articles
     else:
-        news = call_api("/news", {"top": fetch_count})
+        dashboard = fetch_dashboard(params, st.session_state.page_cursors[st.session_state.current_page - 1])
+        news = dashboard["articles"]
+        # Sonraki sayfanın cursor'ı ancak bu sayfa gelince bilinir
+        if dashboard["next_cursor"] and st.session_state.current_page == len(st.session_state.page_cursors):
+            st.session_state.page_cursors.append(dashboard["next_cursor"])
+
+# Sayılar ve grafikler tüm sonuç kümesinden (facet), yüklenen sayfadan değil
+cards = dashboard["cards"]
+charts = dashboard["charts"]
+total = dashboard["total"] if dashboard["total"] is not None else cards.get("total", len(news))
 
 # ─────────────────────────────────────────────────────────────────────────────
 # 📈 Statistics
 if news:
-    sentiments = [a["sentiment"] for a in news if a.get("sentiment")]
-    
     col1, col2, col3, col4 = st.columns(4)
     
     with col1:
         st.markdown(f"""
         <div class="stat-card">
-            <div class="stat-number">{len(news)}</div>
+            <div class="stat-number">{total}</div>
             <div class="stat-label">Total Articles</div>
         </div>
         """, unsafe_allow_html=True)
     
     with col2:
-        positive_count = sentiments.count("positive")
+        positive_count = cards.get("positive", 0)
         st.markdown(f"""
         <div class="stat-card">
             <div class="stat-number">{positive_count}</div>
@@ -489,7 +533,9 @@ if news:
         """, unsafe_allow_html=True)
     
     with col3:
-        sources = len(set(a["source"] for a in news))
+        sources = cards.get("sources", 0)
+        if cards.get("sources_truncated"):
+            sources = f"{sources}+"
         st.markdown(f"""
         <div class="stat-card">
             <div class="stat-number">{sources}</div>
@@ -498,11 +544,12 @@ if news:
         """, unsafe_allow_html=True)
     
     with col4:
-        avg_keyphrases = round(sum(len(a["keyphrases"]) for a in news) / len(news), 1)
+        avg = cards.get("avg_keyphrases")
+        avg_keyphrases = "–" if avg is None else round(avg, 1)
         st.markdown(f"""
         <div class="stat-card">
             <div class="stat-number">{avg_keyphrases}</div>
-            <div class="stat-label">Avg Keyphrases</div>
+            <div class="stat-label">Avg Keyphrases{" (page)" if cards.get("avg_keyphrases_scope") == "page" else ""}</div>
         </div>
         """, unsafe_allow_html=True)
 
@@ -510,26 +557,29 @@ if news:
 # 📰 Articles with Pagination
 if news:
     st.markdown("## 📰 Latest Articles")
+    displayed_articles = news
     
     # Sayfalama mantığı
     if pagination_mode == "Pagination":
-        total_pages = math.ceil(len(news) / st.session_state.articles_per_page)
-        start_idx = (st.session_state.current_page - 1) * st.session_state.articles_per_page
-        end_idx = start_idx + st.session_state.articles_per_page
-        displayed_articles = news[start_idx:end_idx]
+        per_page = st.session_state.articles_per_page
+        current_page = st.session_state.current_page
+        total_pages = max(1, math.ceil(total / per_page))
+        # İleriye sadece cursor'ı bilinen sayfalara atlanabilir
+        reachable = len(st.session_state.page_cursors)
+        start_idx = (current_page - 1) * per_page
         
         # Sayfalama kontrolleri
         st.markdown(f"""
         <div class="pagination-container">
             <div class="pagination-info">
-                Showing {start_idx + 1}-{min(end_idx, len(news))} of {len(news)} articles (Page {st.session_state.current_page}/{total_pages})
+                Showing {start_idx + 1}-{start_idx + len(news)} of {total} articles (Page {current_page}/{total_pages})
             </div>
         </div>
         """, unsafe_allow_html=True)
         
         col1, col2, col3 = st.columns([1, 2, 1])
         with col1:
-            if st.button("⬅️ Previous", disabled=st.session_state.current_page <= 1):
+            if st.button("⬅️ Previous", disabled=current_page <= 1):
                 st.session_state.current_page -= 1
                 st.rerun()
         
@@ -537,69 +587,43 @@ if news:
             # Sayfa numaraları
             page_cols = st.columns(min(5, total_pages))
             for i, page_col in enumerate(page_cols):
-                page_num = i + max(1, st.session_state.current_page - 2)
+                page_num = i + max(1, current_page - 2)
                 if page_num <= total_pages:
                     with page_col:
                         if st.button(str(page_num), key=f"page_{page_num}",
-                                   disabled=page_num == st.session_state.current_page):
+                                   disabled=page_num == current_page or page_num > reachable):
                             st.session_state.current_page = page_num
                             st.rerun()
         
         with col3:
-            if st.button("Next ➡️", disabled=st.session_state.current_page >= total_pages):
+            if st.button("Next ➡️", disabled=current_page >= reachable):
                 st.session_state.current_page += 1
                 st.rerun()
     
     elif pagination_mode == "Load More":
-        displayed_articles = news[:st.session_state.loaded_articles]
-        
-        if len(news) > st.session_state.loaded_articles:
+        if len(news) < total:
             st.markdown(f"""
             <div class="pagination-container">
                 <div class="pagination-info">
-                    Showing {len(displayed_articles)} of {len(news)} articles
+                    Showing {len(news)} of {total} articles
                 </div>
             </div>
             """, unsafe_allow_html=True)
     
-    else:  # Show All
-        displayed_articles = news
+    elif len(news) < total:  # Show All
+        st.info(f"Showing the latest {len(news)} of {total} articles. Use the API's /export endpoint for the full set.")
     
-    # Makaleleri göster
-    for art in displayed_articles:
-        sentiment_class = f"sentiment-{art['sentiment']}" if art.get('sentiment') else "sentiment-neutral"
-        
-        st.markdown(f"""
-        <div class="article-card">
-            <div class="article-title">{art['title']}</div>
-            <div class="article-meta">
-                <span>📰 <strong>{art['source']}</strong></span>
-                <span>📅 {art['date'][:10]}</span>
-                <span>📂 {art.get('category', 'general').title()}</span>
-            </div>
-            <div class="sentiment-badge {sentiment_class}">
-                {art['sentiment'].title() if art.get('sentiment') else 'Neutral'}
-            </div>
-            <p style="margin-top: 1rem; line-height: 1.6; color: #495057;">{art["summary"]}</p>
-            <a href="{art['url']}" target="_blank" class="read-more-btn">📖 Read Full Article</a>
-        </div>
-        """, unsafe_allow_html=True)
-        
-        if art.get("keyphrases"):
-            keyphrase_tags = "".join([f'<span class="keyphrase-tag">{kp}</span>' for kp in art["keyphrases"]])
-            st.markdown(f"""
-            <div class="keyphrases">
-                <div style="font-size: 0.9rem; font-weight: 600; color: #495057; margin-bottom: 0.5rem;">🏷️ Key Phrases:</div>
-                {keyphrase_tags}
-            </div>
-            """, unsafe_allow_html=True)
+    # Tüm kartlar tek markdown mesajıyla; kart HTML'i makale başına bir kez üretilir
+    st.markdown(cards_html(displayed_articles), unsafe_allow_html=True)
     
-    # Load More butonu
-    if pagination_mode == "Load More" and len(news) > st.session_state.loaded_articles:
+    # Load More butonu: sadece bir sonraki sayfa istenir, öncekiler session state'te
+    if pagination_mode == "Load More" and st.session_state.more_next:
         col1, col2, col3 = st.columns([1, 1, 1])
         with col2:
             if st.button("📄 Load More Articles", key="load_more"):
-                st.session_state.loaded_articles += 10
+                page = fetch_dashboard(params, st.session_state.more_next)
+                st.session_state.more_articles = news + page["articles"]
+                st.session_state.more_next = page["next_cursor"]
                 st.rerun()
 
 else:
@@ -620,7 +644,7 @@ if news:
     
     with col1:
         st.markdown("### Sentiment Distribution")
-        sentiment_counts = Counter([a["sentiment"] for a in news if a.get("sentiment")])
+        sentiment_counts = charts.get("sentiment", {})
         if sentiment_counts:
             fig = px.pie(
                 values=list(sentiment_counts.values()),
@@ -643,7 +667,7 @@ if news:
     
     with col2:
         st.markdown("### Category Distribution")
-        category_counts = Counter([a.get("category", "general") for a in news])
+        category_counts = charts.get("category", {})
         if category_counts:
             fig = px.bar(
                 x=list(category_counts.keys()),
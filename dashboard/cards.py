@@ -0,0 +1,74 @@
+"""
+HTML for the dashboard's article cards.
+
+Every value is HTML-escaped and links are limited to http(s). Each article
+becomes one fragment, memoised on its content (URL included), so a rerun
+only formats articles it has not seen yet. A page of cards is joined into
+one block and sent with a single st.markdown call instead of two per article.
+
+Fragments carry no blank lines or indentation: inside st.markdown a blank
+line ends the raw HTML block and the rest would be parsed as Markdown.
+"""
+import html
+from functools import lru_cache
+
+# Bellekte tutulan kart sayısı; "Show All" sayfasının birkaç katı
+CARD_CACHE_SIZE = 4096
+SENTIMENTS = ("positive", "neutral", "negative")
+
+
+def _text(value) -> str:
+    # Boş satır HTML bloğunu bitirir; tüm boşluklar tek boşluğa iner
+    return html.escape(" ".join(str(value or "").split()))
+
+
+def _href(url: str) -> str:
+    url = (url or "").strip()
+    return html.escape(url) if url.lower().startswith(("http://", "https://")) else "#"
+
+
+@lru_cache(maxsize=CARD_CACHE_SIZE)
+def _card(url: str, title: str, source: str, date: str, category: str, sentiment: str,
+          summary: str, keyphrases: tuple) -> str:
+    sentiment = sentiment if sentiment in SENTIMENTS else ""
+    parts = [
+        '<div class="article-card">',
+        f'<div class="article-title">{_text(title)}</div>',
+        '<div class="article-meta">',
+        f"<span>📰 <strong>{_text(source)}</strong></span>",
+        f"<span>📅 {_text(date[:10])}</span>",
+        f"<span>📂 {_text(category.title())}</span>",
+        "</div>",
+        f'<div class="sentiment-badge sentiment-{sentiment or "neutral"}">{(sentiment or "neutral").title()}</div>',
+        f'<p style="margin-top: 1rem; line-height: 1.6; color: #495057;">{_text(summary)}</p>',
+        f'<a href="{_href(url)}" target="_blank" rel="noopener noreferrer" class="read-more-btn">📖 Read Full Article</a>',
+        "</div>",
+    ]
+    if keyphrases:
+        tags = "".join(f'<span class="keyphrase-tag">{_text(kp)}</span>' for kp in keyphrases)
+        parts += [
+            '<div class="keyphrases">',
+            '<div style="font-size: 0.9rem; font-weight: 600; color: #495057; margin-bottom: 0.5rem;">🏷️ Key Phrases:</div>',
+            tags,
+            "</div>",
+        ]
+    return "".join(parts)
+
+
+def article_card(art: dict) -> str:
+    """Card (and key phrase block) of one /dashboard article."""
+    return _card(
+        art.get("url") or "",
+        art.get("title") or "",
+        art.get("source") or "",
+        art.get("date") or "",
+        art.get("category") or "general",
+        art.get("sentiment") or "",
+        art.get("summary") or "",
+        tuple(art.get("keyphrases") or ()),
+    )
+
+
+def cards_html(articles: list) -> str:
+    """All cards of a page as one HTML block."""
+    return "\n".join(article_card(a) for a in articles)
@@ -0,0 +1,26 @@
+"""
+Deterministic document keys shared by the ingester and the backend.
+
+An article's key is its URL, exactly as stored in content/id, in URL-safe
+base64, which only uses characters Azure Search allows in document keys.
+The ingester stores the article as `{key}.json`, so the blob indexer can map
+metadata_storage_name to the index key with extractTokenAtPosition(".", 0)
+(a field mapping on the indexer), and the backend can fetch a document by
+key without searching for it. An index whose key is still the indexer's
+default misses those lookups; the backend then finds the article with a
+content/id filter instead (backend/main.py, find_by_url).
+"""
+import base64
+
+
+def url_to_key(url: str) -> str:
+    return base64.urlsafe_b64encode(url.encode("utf-8")).decode("ascii")
+
+
+def key_to_url(key: str) -> str:
+    return base64.urlsafe_b64decode(key.encode("ascii")).decode("utf-8")
+
+
+def to_key(id: str) -> str:
+    """Accepts either an article URL or its key."""
+    return url_to_key(id) if "://" in id else id
@@ -0,0 +1,101 @@
+"""
+Text embeddings for articles, shared by the ingester and the backend.
+
+Providers are picked by a spec string (EMBEDDING_PROVIDER):
+
+* `hashing[:DIM]` (default, 256 dims) — feature hashing of word unigrams and
+  bigrams with a signed CRC32, L2-normalised. No model, no network, and the
+  same text always gives the same vector on every machine, so the backend
+  can embed queries offline and they land in the ingester's space.
+* `azure-openai:DEPLOYMENT` — an Azure OpenAI embeddings deployment
+  (AZURE_OPENAI_ENDPOINT, AZURE_OPENAI_KEY). Given a RateLimiter, every
+  request goes through its "embeddings" bucket, retries and budget.
+
+Vectors from different specs are not comparable; the vector store records
+the spec it was built with and the backend embeds queries with that one.
+"""
+import os
+import re
+import zlib
+import math
+from collections import Counter
+
+import numpy as np
+
+DEFAULT_PROVIDER = "hashing"
+HASHING_DIM = 256
+AZURE_OPENAI_API_VERSION = "2024-02-01"
+AZURE_OPENAI_BATCH = 16
+
+_WORD = re.compile(r"\w+")
+
+
+def embedding_text(doc: dict) -> str:
+    """What gets embedded for an article: title, key phrases, summary."""
+    parts = [doc.get("title") or "", " ".join(doc.get("keyphrases") or []), doc.get("summary") or ""]
+    return "\n".join(p for p in parts if p)
+
+
+class HashingEmbedder:
+    def __init__(self, dim: int = HASHING_DIM):
+        self.dim = dim
+        self.spec = f"hashing:{dim}"
+
+    def _features(self, text: str) -> Counter:
+        words = _WORD.findall((text or "").lower())
+        return Counter(words + [f"{a} {b}" for a, b in zip(words, words[1:])])
+
+    def embed(self, texts: list) -> np.ndarray:
+        out = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in zip(out, texts):
+            for feature, count in self._features(text).items():
+                h = zlib.crc32(feature.encode("utf-8"))
+                # Alt bitler sütunu, üst bit işareti seçer
+                row[h % self.dim] += (1.0 if h & 0x80000000 else -1.0) * (1.0 + math.log(count))
+        norms = np.linalg.norm(out, axis=1, keepdims=True)
+        return out / np.where(norms == 0, 1, norms)
+
+
+class AzureOpenAIEmbedder:
+    def __init__(self, deployment: str, endpoint: str = None, key: str = None, limiter=None):
+        import httpx
+
+        self.spec = f"azure-openai:{deployment}"
+        self.dim = None
+        self.limiter = limiter
+        self._client = httpx.Client(
+            base_url=endpoint or os.environ["AZURE_OPENAI_ENDPOINT"],
+            headers={"api-key": key or os.environ["AZURE_OPENAI_KEY"]},
+            timeout=30,
+        )
+        self._url = f"/openai/deployments/{deployment}/embeddings?api-version={AZURE_OPENAI_API_VERSION}"
+
+    def embed(self, texts: list) -> np.ndarray:
+        rows = []
+        for start in range(0, len(texts), AZURE_OPENAI_BATCH):
+            batch = texts[start:start + AZURE_OPENAI_BATCH]
+            if self.limiter is None:
+                data = self._post(batch)
+            else:
+                data = self.limiter.call("embeddings", self._post, batch)
+            rows.extend(d["embedding"] for d in sorted(data, key=lambda d: d["index"]))
+        out = np.array(rows, dtype=np.float32).reshape(len(texts), -1)
+        self.dim = out.shape[1]
+        return out / np.maximum(np.linalg.norm(out, axis=1, keepdims=True), 1e-12)
+
+    def _post(self, batch: list) -> list:
+        resp = self._client.post(self._url, json={"input": batch})
+        resp.raise_for_status()
+        return resp.json()["data"]
+
+
+def make_embedder(spec: str = None, limiter=None):
+    spec = spec or os.getenv("EMBEDDING_PROVIDER", DEFAULT_PROVIDER)
+    name, _, arg = spec.partition(":")
+    if name == "hashing":
+        return HashingEmbedder(int(arg) if arg else HASHING_DIM)
+    if name == "azure-openai":
+        if not arg:
+            raise ValueError("azure-openai needs a deployment: azure-openai:DEPLOYMENT")
+        return AzureOpenAIEmbedder(arg, limiter=limiter)
+    raise ValueError(f"Unknown embedding provider: {spec}")
@@ -0,0 +1,135 @@
+"""
+Content-hash enrichment cache.
+
+Keyed by sha256(config version + title + content), so an article whose text
+has not changed since the last run is neither re-enriched nor re-uploaded.
+Entries live in a local SQLite file; between CI runs the file is parked in
+the state container. Size is bounded with LRU eviction on `last_used`.
+
+The same content can be stored under several URLs (syndicated stories).
+Which blobs hold which content is recorded per blob, so each of those
+articles sees its own blob as up to date instead of the last one written.
+"""
+import os
+import json
+import time
+import sqlite3
+import hashlib
+
+from azure.core.exceptions import ResourceNotFoundError, ResourceExistsError
+
+CACHE_BLOB_NAME = "enrich_cache.sqlite"
+
+
+class EnrichmentCache:
+    def __init__(self, path: str, config_version: str, max_entries: int = 5000):
+        self.path = path
+        self.config_version = config_version
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        # url → key; enrichment upload edildikten sonra put() ile yazılır
+        self._pending = {}
+
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.conn = sqlite3.connect(path)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS enrichments ("
+            " key TEXT PRIMARY KEY,"
+            " blob_name TEXT NOT NULL,"
+            " doc TEXT NOT NULL,"
+            " last_used REAL NOT NULL)"
+        )
+        self.conn.execute(
+            "CREATE INDEX IF NOT EXISTS enrichments_last_used ON enrichments(last_used)"
+        )
+        # blob → içerik anahtarı; aynı içerik birden çok URL'de saklanabilir
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS enrichment_blobs ("
+            " blob_name TEXT PRIMARY KEY,"
+            " key TEXT NOT NULL)"
+        )
+
+    def key(self, article: dict) -> str:
+        raw = "\0".join([self.config_version, article.get("title") or "", article.get("content") or ""])
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, article: dict, blob_name: str = None):
+        """
+        Returns {"blob_name", "doc"} for a hit, None for a miss. `blob_name`
+        is the given one if that blob already holds this content, otherwise
+        the first blob the content was stored under.
+        """
+        key = self.key(article)
+        self._pending[article["url"]] = key
+        row = self.conn.execute(
+            "SELECT blob_name, doc FROM enrichments WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.conn.execute("UPDATE enrichments SET last_used = ? WHERE key = ?", (time.time(), key))
+        stored = blob_name is not None and self.conn.execute(
+            "SELECT 1 FROM enrichment_blobs WHERE blob_name = ? AND key = ?", (blob_name, key)
+        ).fetchone() is not None
+        return {"blob_name": blob_name if stored else row[0], "doc": json.loads(row[1])}
+
+    def put(self, doc: dict, blob_name: str):
+        key = self._pending.pop(doc["url"], None)
+        if key is None:
+            return
+        # İlk yazılan blob kalır; sonraki URL'ler enrichment_blobs'a eklenir
+        self.conn.execute(
+            "INSERT INTO enrichments (key, blob_name, doc, last_used) VALUES (?, ?, ?, ?)"
+            " ON CONFLICT (key) DO UPDATE SET doc = excluded.doc, last_used = excluded.last_used",
+            (key, blob_name, json.dumps(doc, ensure_ascii=False), time.time()),
+        )
+        self.conn.execute(
+            "INSERT OR REPLACE INTO enrichment_blobs (blob_name, key) VALUES (?, ?)", (blob_name, key)
+        )
+
+    def __len__(self):
+        return self.conn.execute("SELECT COUNT(*) FROM enrichments").fetchone()[0]
+
+    def evict(self) -> int:
+        cur = self.conn.execute(
+            "DELETE FROM enrichments WHERE key IN ("
+            " SELECT key FROM enrichments ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,),
+        )
+        self.conn.execute("DELETE FROM enrichment_blobs WHERE key NOT IN (SELECT key FROM enrichments)")
+        return cur.rowcount
+
+    def summary(self) -> str:
+        total = self.hits + self.misses
+        rate = self.hits / total if total else 0.0
+        return f"cache hits={self.hits} misses={self.misses} hit rate={rate:.0%} size={len(self)}"
+
+    def close(self):
+        self.evict()
+        self.conn.commit()
+        self.conn.close()
+
+
+def download_cache(state_container, path: str, blob_name: str = CACHE_BLOB_NAME):
+    """Pull the cache file parked by the previous run, if there is one."""
+    try:
+        data = state_container.download_blob(blob_name).readall()
+    except ResourceNotFoundError:
+        return False
+    if os.path.dirname(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(data)
+    return True
+
+
+def upload_cache(state_container, path: str, blob_name: str = CACHE_BLOB_NAME):
+    try:
+        state_container.create_container()
+    except ResourceExistsError:
+        pass
+    with open(path, "rb") as f:
+        state_container.upload_blob(blob_name, f, overwrite=True)
@@ -0,0 +1,62 @@
+"""
+Incremental ingest state.
+
+Two pieces of information decide whether an article has to go through
+enrichment at all:
+
+* the set of blob names already in the news container, built with a single
+  `list_blobs` pass at startup instead of one existence check per article;
+* a per-category `publishedAt` watermark persisted in the state container.
+
+An article is new when its blob does not exist yet, and changed when its
+blob exists but it was (re)published after the category watermark.
+"""
+import json
+
+from azure.core.exceptions import ResourceNotFoundError, ResourceExistsError
+
+WATERMARK_BLOB_NAME = "watermarks.json"
+
+
+class IngestState:
+    def __init__(self, watermarks: dict = None, existing: set = None, full: bool = False):
+        self.watermarks = watermarks or {}
+        self.existing = existing or set()
+        self.full = full
+        self.skipped = 0
+
+    @classmethod
+    def load(cls, container, state_container, full: bool = False):
+        watermarks = {}
+        try:
+            watermarks = json.loads(state_container.download_blob(WATERMARK_BLOB_NAME).readall())
+        except ResourceNotFoundError:
+            pass
+        # --full: her şey yeniden işlenir, listeleme gereksiz
+        existing = set() if full else {b.name for b in container.list_blobs()}
+        print(f"Incremental state: {len(existing)} stored blobs, watermarks={watermarks}")
+        return cls(watermarks, existing, full)
+
+    def wants(self, article: dict, blob_name: str) -> bool:
+        if self.full or blob_name not in self.existing:
+            return True
+        watermark = self.watermarks.get(article.get("category", "general"))
+        if watermark is None or article["publishedAt"] > watermark:
+            return True
+        self.skipped += 1
+        return False
+
+    def advance(self, doc: dict, blob_name: str):
+        self.existing.add(blob_name)
+        category = doc.get("category", "general")
+        if doc["published"] > self.watermarks.get(category, ""):
+            self.watermarks[category] = doc["published"]
+
+    def save(self, state_container):
+        try:
+            state_container.create_container()
+        except ResourceExistsError:
+            pass
+        state_container.upload_blob(
+            WATERMARK_BLOB_NAME, json.dumps(self.watermarks, indent=2), overwrite=True
+        )
@@ -0,0 +1,81 @@
+"""
+Client factory for the ingester.
+
+`make_clients("azure")` builds the real NewsAPI / Language / Blob clients from
+environment variables; `make_clients("fake")` returns the offline stand-ins in
+ingest_fakes.py. Both expose the same attributes:
+
+    newsapi, lang, container, state_container, bulk_container
+    async_clients()  → async context manager yielding (lang, container) .aio clients
+"""
+import os
+import contextlib
+
+from dotenv import load_dotenv
+from newsapi import NewsApiClient
+from azure.core.credentials import AzureKeyCredential
+from azure.ai.textanalytics import TextAnalyticsClient
+from azure.ai.textanalytics.aio import TextAnalyticsClient as AsyncTextAnalyticsClient
+from azure.storage.blob import BlobServiceClient
+from azure.storage.blob.aio import BlobServiceClient as AsyncBlobServiceClient
+
+from rate_limits import PollCounter
+
+CLIENT_KINDS = ["azure", "fake"]
+# Retry'ları rate_limits.RateLimiter yapar (backoff + bütçe); SDK'nın kendi
+# RetryPolicy'si açık kalırsa denemeler çarpılır ve ledger'a hiç yazılmaz
+SDK_RETRY_TOTAL = 0
+
+
+class AzureClients:
+    def __init__(self):
+        load_dotenv()
+        self.newsapi = NewsApiClient(api_key=os.getenv("NEWSAPI_KEY"))
+        # LRO durum sorguları da limiter'a sayılsın (bkz. rate_limits.PollCounter)
+        self.lang_polls = PollCounter("language")
+
+        self.lang = TextAnalyticsClient(
+            endpoint=os.getenv("LANG_ENDPOINT"),
+            credential=AzureKeyCredential(os.getenv("LANG_KEY")),
+            retry_total=SDK_RETRY_TOTAL,
+            per_call_policies=[self.lang_polls],
+        )
+
+        blob_service = BlobServiceClient.from_connection_string(
+            os.getenv("STORAGE_CONN_STR"), retry_total=SDK_RETRY_TOTAL
+        )
+        self.container = blob_service.get_container_client(
+            os.getenv("BLOB_CONTAINER")
+        )
+        # Ingest state'i (cache, watermark) ayrı container'da tutulur, indexer görmesin
+        self.state_container = blob_service.get_container_client(
+            os.getenv("STATE_CONTAINER") or f"{os.getenv('BLOB_CONTAINER')}-state"
+        )
+        # Toplu okuma için NDJSON shard'lar + manifest (bkz. news_shards.py)
+        self.bulk_container = blob_service.get_container_client(
+            os.getenv("BULK_CONTAINER") or f"{os.getenv('BLOB_CONTAINER')}-bulk"
+        )
+
+    @contextlib.asynccontextmanager
+    async def async_clients(self):
+        lang = AsyncTextAnalyticsClient(
+            endpoint=os.getenv("LANG_ENDPOINT"),
+            credential=AzureKeyCredential(os.getenv("LANG_KEY")),
+            retry_total=SDK_RETRY_TOTAL,
+            per_call_policies=[self.lang_polls],
+        )
+        blob_service = AsyncBlobServiceClient.from_connection_string(
+            os.getenv("STORAGE_CONN_STR"), retry_total=SDK_RETRY_TOTAL
+        )
+        async with lang, blob_service:
+            yield lang, blob_service.get_container_client(os.getenv("BLOB_CONTAINER"))
+
+
+def make_clients(kind: str = None, **options):
+    kind = kind or os.getenv("INGEST_CLIENTS", "azure")
+    if kind == "azure":
+        return AzureClients()
+    if kind == "fake":
+        from ingest_fakes import FakeClients
+        return FakeClients(**options)
+    raise ValueError(f"Unknown client kind: {kind!r} (expected one of {CLIENT_KINDS})")
@@ -0,0 +1,357 @@
+"""
+Offline stand-ins for NewsAPI, the Language service and Blob Storage.
+
+They implement the subset of each SDK the ingester uses, so the whole
+pipeline can run (and be measured) without credentials. Every fake supports
+
+* `latency`    – seconds added to each request,
+* `error_rate` – probability of a failure (per document for Language,
+                 per request for NewsAPI and Blob),
+* `max_rps`    – requests per second before the fake answers 429 with a
+                 Retry-After header, like the real services do when throttling.
+
+The blob fake is backed by the filesystem: one directory per container, one
+file per blob, so runs can be inspected and repeated.
+"""
+import os
+import time
+import random
+import asyncio
+import contextlib
+from types import SimpleNamespace
+
+from newsapi.newsapi_exception import NewsAPIException
+from azure.core.exceptions import HttpResponseError, ResourceNotFoundError, ResourceExistsError
+
+
+def http_error(status: int, message: str, retry_after: float = None) -> HttpResponseError:
+    headers = {"Retry-After": str(retry_after)} if retry_after is not None else {}
+    err = HttpResponseError(message=message)
+    err.status_code = status
+    err.response = SimpleNamespace(status_code=status, headers=headers)
+    return err
+
+
+class FakeService:
+    def __init__(self, latency: float = 0.0, error_rate: float = 0.0, max_rps: float = None, seed: int = 0):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.max_rps = max_rps
+        self.calls = 0
+        self.throttled = 0
+        self._rng = random.Random(seed)
+        self._window = []
+
+    def _throttle_delay(self):
+        """Retry-After in seconds if this request exceeds max_rps, else None."""
+        if not self.max_rps:
+            return None
+        now = time.monotonic()
+        self._window = [t for t in self._window if now - t < 1.0]
+        if len(self._window) >= self.max_rps:
+            self.throttled += 1
+            return round(1.0 - (now - self._window[0]), 3)
+        self._window.append(now)
+        return None
+
+    def _failed(self) -> bool:
+        return self.error_rate > 0 and self._rng.random() < self.error_rate
+
+    def _request(self):
+        self.calls += 1
+        retry_after = self._throttle_delay()
+        if retry_after is not None:
+            raise http_error(429, "Too Many Requests", retry_after)
+        time.sleep(self.latency)
+
+    async def _request_async(self):
+        self.calls += 1
+        retry_after = self._throttle_delay()
+        if retry_after is not None:
+            raise http_error(429, "Too Many Requests", retry_after)
+        await asyncio.sleep(self.latency)
+
+
+# ── NewsAPI ─────────────────────────────────────────────────
+VOCABULARY = (
+    "market chip launch court study climate rocket vaccine bank merger startup "
+    "privacy battery satellite election tariff quantum robot drought earnings "
+    "breach model telescope inflation supply union patent fusion ocean crypto"
+).split()
+
+
+def synthetic_text(seed: str, words: int) -> str:
+    rng = random.Random(seed)
+    return " ".join(rng.choice(VOCABULARY) for _ in range(words))
+
+
+def make_article(i: int, category: str = "technology") -> dict:
+    return {
+        "source": {"id": None, "name": f"Source {i % 7}"},
+        "title": f"{category.title()} headline {i}: {synthetic_text(f'{category}/{i}/t', 6)}",
+        "content": synthetic_text(f"{category}/{i}", 40) + ".",
+        "publishedAt": f"2025-01-{1 + i % 28:02d}T{i % 24:02d}:00:00Z",
+        "url": f"https://example.com/{category}/{i}",
+        "category": category,
+    }
+
+
+class FakeNewsApiClient(FakeService):
+    def __init__(self, articles_per_category: int = 15, **kwargs):
+        super().__init__(**kwargs)
+        self.articles_per_category = articles_per_category
+
+    def get_top_headlines(self, language="en", category="general", page_size=20, page=1, **kwargs):
+        self.calls += 1
+        if self._throttle_delay() is not None:
+            raise NewsAPIException({"status": "error", "code": "rateLimited",
+                                    "message": "You have made too many requests recently."})
+        time.sleep(self.latency)
+        if self._failed():
+            raise NewsAPIException({"status": "error", "code": "unexpectedError",
+                                    "message": "Simulated failure"})
+        start = (page - 1) * page_size
+        stop = min(start + page_size, self.articles_per_category)
+        articles = [make_article(i, category) for i in range(start, stop)]
+        for art in articles:
+            art.pop("category")
+        return {"status": "ok", "totalResults": self.articles_per_category, "articles": articles}
+
+
+# ── Language ────────────────────────────────────────────────
+def _documents(documents):
+    return [
+        d if isinstance(d, dict) else {"id": str(i), "text": d}
+        for i, d in enumerate(documents)
+    ]
+
+
+def _sentiment_for(text: str) -> str:
+    return ("positive", "neutral", "negative")[sum(map(ord, text)) % 3]
+
+
+class FakeTextAnalyticsClient(FakeService):
+    def __init__(self, poll: float = 0.0, **kwargs):
+        super().__init__(**kwargs)
+        self.poll = poll
+
+    def _action_result(self, action, doc, failed):
+        if failed:
+            return SimpleNamespace(id=doc["id"], is_error=True, kind="DocumentError",
+                                   error="InvalidDocument: simulated failure")
+        name = type(action).__name__
+        if name == "AnalyzeSentimentAction":
+            return SimpleNamespace(id=doc["id"], is_error=False, sentiment=_sentiment_for(doc["text"]))
+        if name == "ExtractKeyPhrasesAction":
+            return SimpleNamespace(id=doc["id"], is_error=False, key_phrases=doc["text"].split()[:3])
+        return SimpleNamespace(id=doc["id"], is_error=False,
+                               sentences=[SimpleNamespace(text=doc["text"][:120])])
+
+    def _analyze(self, documents, actions):
+        pages = []
+        for doc in _documents(documents):
+            failed = self._failed()
+            pages.append([self._action_result(a, doc, failed) for a in actions])
+        return pages
+
+    def begin_analyze_actions(self, documents, actions, **kwargs):
+        self._request()
+        return FakePoller(self._analyze(documents, actions), self.poll)
+
+    def analyze_sentiment(self, documents, **kwargs):
+        self._request()
+        return [SimpleNamespace(id=d["id"], is_error=False, sentiment=_sentiment_for(d["text"]))
+                for d in _documents(documents)]
+
+    def extract_key_phrases(self, documents, **kwargs):
+        self._request()
+        return [SimpleNamespace(id=d["id"], is_error=False, key_phrases=d["text"].split()[:3])
+                for d in _documents(documents)]
+
+
+class FakePoller:
+    def __init__(self, pages, delay):
+        self._pages = pages
+        self._delay = delay
+
+    def result(self):
+        time.sleep(self._delay)
+        return self._pages
+
+
+class _AsyncPages:
+    def __init__(self, pages):
+        self._pages = pages
+
+    def __aiter__(self):
+        return self._iter()
+
+    async def _iter(self):
+        for page in self._pages:
+            yield page
+
+
+class FakeAsyncPoller(FakePoller):
+    async def result(self):
+        await asyncio.sleep(self._delay)
+        return _AsyncPages(self._pages)
+
+
+class FakeAsyncTextAnalyticsClient(FakeTextAnalyticsClient):
+    async def begin_analyze_actions(self, documents, actions, **kwargs):
+        await self._request_async()
+        return FakeAsyncPoller(self._analyze(documents, actions), self.poll)
+
+
+# ── Blob ────────────────────────────────────────────────────
+class _Download:
+    def __init__(self, data: bytes):
+        self._data = data
+
+    def readall(self) -> bytes:
+        return self._data
+
+
+class _AsyncDownload(_Download):
+    async def readall(self) -> bytes:
+        return self._data
+
+
+def _as_bytes(data) -> bytes:
+    if hasattr(data, "read"):
+        data = data.read()
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    return data
+
+
+class FakeContainerClient(FakeService):
+    def __init__(self, root: str, name: str, **kwargs):
+        super().__init__(**kwargs)
+        self.container_name = name
+        self.path = os.path.join(root, name)
+
+    def _blob_path(self, name: str) -> str:
+        return os.path.join(self.path, *name.split("/"))
+
+    def _check(self):
+        if self._failed():
+            raise http_error(500, "Simulated storage failure")
+
+    def create_container(self, **kwargs):
+        self._request()
+        if os.path.isdir(self.path):
+            raise ResourceExistsError("The specified container already exists.")
+        os.makedirs(self.path)
+
+    def upload_blob(self, name, data, overwrite=False, **kwargs):
+        self._request()
+        self._check()
+        self._write(name, data, overwrite)
+
+    def _write(self, name, data, overwrite):
+        path = self._blob_path(name)
+        if not overwrite and os.path.exists(path):
+            raise ResourceExistsError("The specified blob already exists.")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(_as_bytes(data))
+
+    def download_blob(self, name, offset=None, length=None, **kwargs):
+        self._request()
+        self._check()
+        return _Download(self._read(name, offset, length))
+
+    def _read(self, name, offset, length):
+        path = self._blob_path(name)
+        if not os.path.isfile(path):
+            raise ResourceNotFoundError("The specified blob does not exist.")
+        with open(path, "rb") as f:
+            if offset:
+                f.seek(offset)
+            return f.read() if length is None else f.read(length)
+
+    def delete_blob(self, name, **kwargs):
+        self._request()
+        self._check()
+        path = self._blob_path(name)
+        if not os.path.isfile(path):
+            raise ResourceNotFoundError("The specified blob does not exist.")
+        os.remove(path)
+
+    def list_blobs(self, name_starts_with=None, **kwargs):
+        self._request()
+        if not os.path.isdir(self.path):
+            raise ResourceNotFoundError("The specified container does not exist.")
+        for dirpath, _, filenames in os.walk(self.path):
+            for filename in sorted(filenames):
+                full = os.path.join(dirpath, filename)
+                name = os.path.relpath(full, self.path).replace(os.sep, "/")
+                if name_starts_with is None or name.startswith(name_starts_with):
+                    yield SimpleNamespace(name=name, size=os.path.getsize(full))
+
+
+class FakeAsyncContainerClient(FakeContainerClient):
+    async def upload_blob(self, name, data, overwrite=False, **kwargs):
+        await self._request_async()
+        self._check()
+        self._write(name, data, overwrite)
+
+    async def download_blob(self, name, offset=None, length=None, **kwargs):
+        await self._request_async()
+        self._check()
+        return _AsyncDownload(self._read(name, offset, length))
+
+
+# ── Factory tarafı ──────────────────────────────────────────
+class FakeClients:
+    """Same shape as ingest_clients.AzureClients, backed by the fakes above."""
+
+    def __init__(
+        self,
+        root: str = None,
+        articles_per_category: int = None,
+        latency: float = None,
+        poll: float = None,
+        error_rate: float = None,
+        max_rps: float = None,
+    ):
+        env = os.getenv
+        root = root or env("FAKE_ROOT", ".fake_azure")
+        articles_per_category = articles_per_category or int(env("FAKE_ARTICLES_PER_CATEGORY", "15"))
+        latency = float(env("FAKE_LATENCY", "0.05")) if latency is None else latency
+        poll = float(env("FAKE_POLL", "0.5")) if poll is None else poll
+        error_rate = float(env("FAKE_ERROR_RATE", "0")) if error_rate is None else error_rate
+        if max_rps is None and env("FAKE_MAX_RPS"):
+            max_rps = float(env("FAKE_MAX_RPS"))
+        service = dict(latency=latency, error_rate=error_rate, max_rps=max_rps)
+
+        container = env("BLOB_CONTAINER") or "news"
+        self.root = root
+        self.newsapi = FakeNewsApiClient(articles_per_category, **service)
+        self.lang = FakeTextAnalyticsClient(poll=poll, **service)
+        self.async_lang = FakeAsyncTextAnalyticsClient(poll=poll, **service)
+        self.container = FakeContainerClient(root, container, **service)
+        self.async_container = FakeAsyncContainerClient(root, container, **service)
+        # State/bulk okumaları ölçülen yük değil; gecikmesiz
+        self.state_container = FakeContainerClient(root, env("STATE_CONTAINER") or f"{container}-state")
+        self.bulk_container = FakeContainerClient(root, env("BULK_CONTAINER") or f"{container}-bulk")
+        os.makedirs(self.container.path, exist_ok=True)
+
+    def services(self) -> dict:
+        return {
+            "newsapi": self.newsapi,
+            "language": [self.lang, self.async_lang],
+            "blob": [self.container, self.async_container, self.state_container, self.bulk_container],
+        }
+
+    def calls(self) -> dict:
+        out = {}
+        for name, fakes in self.services().items():
+            fakes = fakes if isinstance(fakes, list) else [fakes]
+            out[name] = sum(f.calls for f in fakes)
+        return out
+
+    @contextlib.asynccontextmanager
+    async def async_clients(self):
+        yield self.async_lang, self.async_container
@@ -1,44 +1,103 @@
 import os
 import json
-import base64
-from dotenv import load_dotenv
-from newsapi import NewsApiClient
-from azure.core.credentials import AzureKeyCredential
-from azure.ai.textanalytics import TextAnalyticsClient, ExtractiveSummaryAction
-from azure.storage.blob import BlobServiceClient
-
-load_dotenv()
-
-newsapi = NewsApiClient(api_key=os.getenv("NEWSAPI_KEY"))
-
-lang_client = TextAnalyticsClient(
-    endpoint=os.getenv("LANG_ENDPOINT"),
-    credential=AzureKeyCredential(os.getenv("LANG_KEY"))
+import asyncio
+import argparse
+from azure.core.exceptions import HttpResponseError, ServiceRequestError
+from azure.ai.textanalytics import (
+    ExtractiveSummaryAction,
+    AnalyzeSentimentAction,
+    ExtractKeyPhrasesAction,
 )
 
-blob_service = BlobServiceClient.from_connection_string(
-    os.getenv("STORAGE_CONN_STR")
-)
-container_client = blob_service.get_container_client(
-    os.getenv("BLOB_CONTAINER")
+import local_enrich
+from ingest_clients import CLIENT_KINDS, make_clients
+from rate_limits import BudgetExhausted, BudgetLedger, LimitedClients, RateLimiter
+from enrich_cache import EnrichmentCache, download_cache, upload_cache
+from near_dupes import NearDuplicateIndex, FINGERPRINT_BLOB_NAME
+from trends import TRENDS_BLOB_NAME, TRENDS_SNAPSHOT_BLOB_NAME, TrendStore
+from rollups import ROLLUP_BLOB_NAME, RollupStore, month_blob_name
+from cache_generation import bump_generation
+from doc_keys import url_to_key
+from incremental import IngestState
+from news_shards import ShardWriter
+from embeddings import embedding_text, make_embedder
+from vector_store import VECTORS_NAME, KEYS_NAME, META_NAME, VectorStore, VectorWriter
+from news_fetch import (
+    DEFAULT_PAGE_SIZE,
+    DEFAULT_MAX_PAGES,
+    Deduper,
+    fetch_all,
+    fetch_newsapi,
+    feeds_from_env,
+    parse_feed_specs,
 )
 
+# Client'lar main() içinde make_clients() ile kurulur; benchmark/offline
+# çalıştırmalar use_clients() ile sahte client'ları verebilir (bkz. ingest_fakes.py)
+clients = None
+newsapi = None
+lang_client = None
+container_client = None
+state_container_client = None
+bulk_container_client = None
+
+def use_clients(c):
+    global clients, newsapi, lang_client, container_client, state_container_client, bulk_container_client
+    clients = c
+    newsapi = c.newsapi
+    lang_client = c.lang
+    container_client = c.container
+    state_container_client = c.state_container
+    bulk_container_client = c.bulk_container
+
 CATEGORIES = ["technology", "science", "business"]  # Dilediğini ekle/çıkar
 
-def fetch_articles_with_category(category):
-    resp = newsapi.get_top_headlines(
-        language="en",
-        category=category,
-        page_size=15
-    )
-    return [
-        {**a, "category": category}
-        for a in resp.get("articles", [])
-        if a.get("content")
-    ]
+# Language servisi tek bir analyze-actions işinde en fazla 25 doküman kabul ediyor
+ENRICH_BATCH_SIZE = 25
+
+# azure: sadece Language servisi, local: local_enrich.py,
+# auto: Language servisi; hata/throttle olursa o batch local_enrich ile
+ENGINES = ["auto", "azure", "local"]
+AZURE_ENGINE = "azure-language"
+
+# enrich_actions() veya build_doc() değişirse artır: eski cache kayıtları geçersiz olur
+ENRICH_CONFIG_VERSION = "summary3+sentiment+keyphrases/v2"
+ENRICH_CACHE_PATH = os.getenv("ENRICH_CACHE_PATH", ".cache/enrich_cache.sqlite")
+ENRICH_CACHE_MAX_ENTRIES = int(os.getenv("ENRICH_CACHE_MAX_ENTRIES", "5000"))
+FINGERPRINT_PATH = os.getenv("FINGERPRINT_PATH", ".cache/fingerprints.sqlite")
+# Embedding matrisi (bkz. vector_store.py); state container'da vectors/ altında durur
+VECTOR_PATH = os.getenv("VECTOR_PATH", ".cache/vectors")
+VECTOR_BLOB_PREFIX = "vectors/"
+TRENDS_PATH = os.getenv("TRENDS_PATH", ".cache/trends.sqlite")
+TRENDS_SNAPSHOT_PATH = os.getenv("TRENDS_SNAPSHOT_PATH", ".cache/trends.json")
+TRENDS_TOP = int(os.getenv("TRENDS_TOP", "50"))
+ROLLUP_PATH = os.getenv("ROLLUP_PATH", ".cache/rollups.sqlite")
+# Ay blob'larının yerel kopyaları; STORAGE_CONN_STR'siz backend buradan okur
+ROLLUP_DIR = os.getenv("ROLLUP_DIR", ".cache/rollups")
+
+def fetch_articles_with_category(category, client=None, page_size=DEFAULT_PAGE_SIZE, max_pages=DEFAULT_MAX_PAGES):
+    return fetch_newsapi(client or newsapi, category, page_size, max_pages)
+
+def article_text(article: dict) -> str:
+    return article["title"] + ". " + (article.get("content") or "")
+
+def build_doc(article: dict, summary: str, sentiment, keyphrases, engine: str = AZURE_ENGINE) -> dict:
+    return {
+        "id": article["url"],
+        "title": article["title"],
+        "published": article["publishedAt"],
+        "summary": summary,
+        "sentiment": sentiment,
+        "keyphrases": keyphrases,
+        "keyphrase_count": len(keyphrases or []),
+        "source": article["source"]["name"],
+        "url": article["url"],
+        "category": article.get("category", "general"),
+        "engine": engine,
+    }
 
 def enrich(article: dict) -> dict:
-    text = article["title"] + ". " + (article.get("content") or "")
+    text = article_text(article)
     poller = lang_client.begin_analyze_actions(
         [text],
         actions=[ExtractiveSummaryAction(max_sentence_count=3)]
@@ -54,41 +113,390 @@ def enrich(article: dict) -> dict:
     sentiment = lang_client.analyze_sentiment([text])[0].sentiment
     keyphrases = lang_client.extract_key_phrases([text])[0].key_phrases
 
-    return {
-        "id": article["url"],
-        "title": article["title"],
-        "published": article["publishedAt"],
-        "summary": summary,
-        "sentiment": sentiment,
-        "keyphrases": keyphrases,
-        "source": article["source"]["name"],
-        "url": article["url"],
-        "category": article.get("category", "general")
-    }
+    return build_doc(article, summary, sentiment, keyphrases)
+
+def enrich_actions() -> list:
+    return [
+        ExtractiveSummaryAction(max_sentence_count=3),
+        AnalyzeSentimentAction(),
+        ExtractKeyPhrasesAction(),
+    ]
+
+def batch_inputs(chunk: list) -> list:
+    return [{"id": str(i), "text": article_text(a)} for i, a in enumerate(chunk)]
+
+def map_batch_results(chunk: list, results) -> list:
+    """
+    analyze-actions sonuçlarını doküman id'si ile makalelere geri eşler.
+    Hatalı dokümanlar boş alanlarla döner, batch'in geri kalanını düşürmez.
+    """
+    # Sonuç listesi önce dokümana, sonra aksiyon sırasına göre dizili
+    by_id = {}
+    for document_results in results:
+        by_id[document_results[0].id] = tuple(document_results)
+
+    docs = []
+    for i, art in enumerate(chunk):
+        results = by_id.get(str(i))
+        if results is None:
+            print(f"Enrichment missing for {art['url']}")
+            results = (None, None, None)
+        errors = [res.error for res in results if res is not None and res.is_error]
+        if errors:
+            print(f"Enrichment error for {art['url']}: {errors[0]}")
+        summary_res, sentiment_res, keyphrase_res = [
+            None if res is None or res.is_error else res for res in results
+        ]
+
+        summary = " ".join([s.text for s in summary_res.sentences]) if summary_res else ""
+        sentiment = sentiment_res.sentiment if sentiment_res else None
+        keyphrases = keyphrase_res.key_phrases if keyphrase_res else []
+        docs.append(build_doc(art, summary, sentiment, keyphrases))
+    return docs
+
+def enrich_batch(articles: list) -> list:
+    """
+    Özet, sentiment ve keyphrase aksiyonlarını tek bir analyze-actions işinde
+    çalıştırır: her ENRICH_BATCH_SIZE makale için tek istek + polling.
+    """
+    docs = []
+    for start in range(0, len(articles), ENRICH_BATCH_SIZE):
+        chunk = articles[start:start + ENRICH_BATCH_SIZE]
+        poller = lang_client.begin_analyze_actions(batch_inputs(chunk), actions=enrich_actions())
+        docs.extend(map_batch_results(chunk, poller.result()))
+    return docs
+
+def enrich_local(articles: list) -> list:
+    return [
+        build_doc(art, r["summary"], r["sentiment"], r["keyphrases"], local_enrich.ENGINE_NAME)
+        for art, r in zip(articles, local_enrich.enrich_batch(articles))
+    ]
+
+def fill_failed(chunk: list, docs: list) -> list:
+    """Language servisinin tek tek düşürdüğü dokümanları local engine ile doldurur."""
+    failed = [i for i, doc in enumerate(docs) if doc["sentiment"] is None]
+    for i, doc in zip(failed, enrich_local([chunk[i] for i in failed])):
+        docs[i] = doc
+    return docs
+
+def enrich_with_engine(articles: list, engine: str = "auto") -> list:
+    if engine == "local":
+        return enrich_local(articles)
+    docs = []
+    for start in range(0, len(articles), ENRICH_BATCH_SIZE):
+        chunk = articles[start:start + ENRICH_BATCH_SIZE]
+        try:
+            chunk_docs = enrich_batch(chunk)
+        except (HttpResponseError, ServiceRequestError) as e:
+            if engine != "auto":
+                raise
+            print(f"Language service failed ({e.__class__.__name__}: {e}), using local engine for {len(chunk)} articles")
+            chunk_docs = enrich_local(chunk)
+        docs.extend(fill_failed(chunk, chunk_docs) if engine == "auto" else chunk_docs)
+    return docs
 
 def url_to_blobname(url):
-    # Unique: url'yi base64 ile encode et, Windows'a uyumlu!
-    return base64.urlsafe_b64encode(url.encode("utf-8")).decode("ascii") + ".json"
+    # Unique: url'yi base64 ile encode et, Windows'a uyumlu! Aynı key Search'te doküman anahtarı
+    return url_to_key(url) + ".json"
 
-def upload_news_article(doc: dict):
+def serialize_doc(doc: dict):
     blob_name = url_to_blobname(doc["url"])
     data = json.dumps(doc, ensure_ascii=False).encode("utf-8")
+    return blob_name, data
+
+class RunContext:
+    """Bir run boyunca taşınan opsiyonel yardımcılar; her biri None olabilir."""
+    def __init__(self, cache=None, state=None, shards=None, near=None, engine="auto", vectors=None,
+                 trends=None, rollups=None):
+        self.cache = cache
+        self.state = state
+        self.shards = shards
+        self.near = near
+        self.engine = engine
+        self.vectors = vectors
+        self.trends = trends
+        self.rollups = rollups
+        self.uploaded = 0
+
+def check_cache(article: dict, cache):
+    """
+    (True, None)  → enrich + upload gerekli
+    (False, doc)  → enrichment cache'ten geldi, sadece upload (aynı içerik yeni URL'de)
+    (False, None) → blob zaten aynı makaleyi tutuyor, atla
+    """
+    if cache is None:
+        return True, None
+    blob_name = url_to_blobname(article["url"])
+    hit = cache.get(article, blob_name)
+    if hit is None:
+        return True, None
+    if hit["blob_name"] == blob_name:
+        return False, None
+    cached = hit["doc"]
+    return False, build_doc(article, cached["summary"], cached["sentiment"], cached["keyphrases"],
+                            cached.get("engine", AZURE_ENGINE))
+
+def is_new_or_changed(article: dict, state) -> bool:
+    return state is None or state.wants(article, url_to_blobname(article["url"]))
+
+def link_duplicate(article: dict, canonical: dict) -> dict:
+    doc = build_doc(article, canonical["summary"], canonical["sentiment"], canonical["keyphrases"],
+                    canonical.get("engine", AZURE_ENGINE))
+    doc["duplicate_of"] = canonical["url"]
+    return doc
+
+def plan_article(article: dict, ctx: RunContext):
+    """
+    ("skip", None)   → blob zaten güncel
+    ("upload", doc)  → enrichment cache'ten ya da kanonik kopyadan geldi, sadece upload
+    ("parked", None) → near-duplicate; kanoniği bu run'da zenginleşiyor, remember_upload() geri verir
+    ("enrich", None) → Language servisine gidecek
+    """
+    if not is_new_or_changed(article, ctx.state):
+        return "skip", None
+    needs_enrich, doc = check_cache(article, ctx.cache)
+    if not needs_enrich:
+        return ("skip", None) if doc is None else ("upload", doc)
+    if ctx.near is not None:
+        found = ctx.near.find(article)
+        if found is not None:
+            kind, value = found
+            return ("upload", link_duplicate(article, value)) if kind == "doc" else ("parked", None)
+    return "enrich", None
+
+def remember_upload(doc: dict, blob_name: str, ctx: RunContext) -> tuple:
+    """
+    Upload sonrası kayıtlar. Bu makaleyi bekleyen near-duplicate'leri döndürür:
+    (yüklenecek bağlı dokümanlar, kendisi zenginleştirilecek makaleler).
+    """
+    ctx.uploaded += 1
+    enriched_ok = doc["sentiment"] is not None
+    # Hatalı ve fallback enrichment'lar cache'lenmez, bir sonraki run'da servis tekrar denenir
+    fallback = ctx.engine == "auto" and doc.get("engine") == local_enrich.ENGINE_NAME
+    if ctx.cache is not None and enriched_ok and not fallback:
+        ctx.cache.put(doc, blob_name)
+    if ctx.state is not None:
+        ctx.state.advance(doc, blob_name)
+    if ctx.shards is not None:
+        ctx.shards.add(doc)
+    # Near-duplicate kopyalar /similar sonuçlarını doldurmasın
+    if ctx.vectors is not None and "duplicate_of" not in doc:
+        ctx.vectors.add(url_to_key(doc["url"]), embedding_text(doc))
+    # Kopyalar da sayılır: aynı hikâyeyi başka kaynakların da vermesi trendin kendisi
+    if ctx.trends is not None:
+        ctx.trends.add(doc)
+    if ctx.rollups is not None:
+        ctx.rollups.add(doc)
+    if ctx.near is None or "duplicate_of" in doc:
+        return [], []
+    if not enriched_ok:
+        # Kanoniğin enrichment'ı başarısız; kopyalar boş sonucu miras almasın
+        return [], ctx.near.release(doc)
+    ctx.near.add(doc)
+    return [link_duplicate(art, doc) for art in ctx.near.resolve(doc)], []
+
+def orphaned_followers(ctx: RunContext) -> list:
+    """Kanoniği bu run'da hiç yüklenmeyen near-duplicate'ler; kendileri zenginleştirilir."""
+    return ctx.near.orphans() if ctx.near is not None else []
+
+def upload_news_article(doc: dict, ctx: RunContext = None) -> tuple:
+    blob_name, data = serialize_doc(doc)
     container_client.upload_blob(blob_name, data, overwrite=True)  # overwrite=True: Günceller!
     print(f"Uploaded/Updated: {blob_name}")
+    return remember_upload(doc, blob_name, ctx or RunContext())
 
-def main():
+def run_serial(ctx: RunContext = None, categories=CATEGORIES, feeds=(),
+               page_size=DEFAULT_PAGE_SIZE, max_pages=DEFAULT_MAX_PAGES):
+    ctx = ctx or RunContext()
     print("Fetching articles by category…")
-    all_arts = []
-    for cat in CATEGORIES:
-        arts = fetch_articles_with_category(cat)
-        all_arts.extend(arts)
-        print(f"Found {len(arts)} articles in category: {cat}")
+    deduper = Deduper()
+    all_arts = fetch_all(newsapi, categories, feeds, page_size, max_pages, workers=1, deduper=deduper)
+    print(f"Dropped {deduper.duplicates} duplicate URLs")
 
-    print(f"Total {len(all_arts)} articles, enriching…")
+    to_enrich, to_upload = [], []
     for art in all_arts:
-        enriched = enrich(art)
-        upload_news_article(enriched)
+        action, doc = plan_article(art, ctx)
+        if action == "enrich":
+            to_enrich.append(art)
+        elif action == "upload":
+            to_upload.append(doc)
+
+    print(f"Total {len(all_arts)} articles, enriching {len(to_enrich)}…")
+    pending = to_upload + enrich_with_engine(to_enrich, ctx.engine)
+    while pending:
+        linked, unlinked = upload_news_article(pending.pop(0), ctx)
+        pending.extend(linked)
+        if unlinked:
+            pending.extend(enrich_with_engine(unlinked, ctx.engine))
+        if not pending:
+            orphans = orphaned_followers(ctx)
+            if orphans:
+                print(f"Enriching {len(orphans)} near-duplicates whose canonical was not uploaded")
+                pending = enrich_with_engine(orphans, ctx.engine)
     print("Done.")
 
+def open_cache(engine="auto"):
+    download_cache(state_container_client, ENRICH_CACHE_PATH)
+    # Engine'ler birbirinin sonucunu cache'ten almasın
+    version = f"{ENRICH_CONFIG_VERSION}/{'local' if engine == 'local' else 'azure'}"
+    return EnrichmentCache(ENRICH_CACHE_PATH, version, ENRICH_CACHE_MAX_ENTRIES)
+
+def close_cache(cache):
+    print(cache.summary())
+    cache.close()
+    upload_cache(state_container_client, ENRICH_CACHE_PATH)
+
+def open_near_index():
+    download_cache(state_container_client, FINGERPRINT_PATH, FINGERPRINT_BLOB_NAME)
+    return NearDuplicateIndex(FINGERPRINT_PATH)
+
+def close_near_index(near):
+    print(near.summary())
+    near.close()
+    upload_cache(state_container_client, FINGERPRINT_PATH, FINGERPRINT_BLOB_NAME)
+
+def open_vector_writer(limiter=None):
+    embedder = make_embedder(limiter=limiter)
+    for name in (VECTORS_NAME, KEYS_NAME, META_NAME):
+        download_cache(state_container_client, os.path.join(VECTOR_PATH, name), VECTOR_BLOB_PREFIX + name)
+    store = VectorStore.open(VECTOR_PATH)
+    if store is None or store.spec != embedder.spec:
+        if store is not None:
+            print(f"Vector store was built with {store.spec}; starting a new one for {embedder.spec}")
+        store = VectorStore.create(VECTOR_PATH, embedder.spec, embedder.dim or probe_dim(embedder))
+    return VectorWriter(store, embedder)
+
+def probe_dim(embedder) -> int:
+    return embedder.embed(["dimension probe"]).shape[1]
+
+def close_vector_writer(writer):
+    try:
+        writer.close()
+    except BudgetExhausted as e:
+        # Gömülemeyenler bu run'da kalır; yazılanlar yine yüklenir
+        print(f"Embeddings stopped, {writer.pending} articles not embedded: {e}")
+    print(writer.summary())
+    if writer.added:
+        # meta.json en son: yarım yüklenmiş bir store okunmasın
+        for name in (VECTORS_NAME, KEYS_NAME, META_NAME):
+            upload_cache(state_container_client, os.path.join(VECTOR_PATH, name), VECTOR_BLOB_PREFIX + name)
+
+def open_trends():
+    download_cache(state_container_client, TRENDS_PATH, TRENDS_BLOB_NAME)
+    return TrendStore(TRENDS_PATH)
+
+def close_trends(trends):
+    trends.prune()
+    os.makedirs(os.path.dirname(TRENDS_SNAPSHOT_PATH) or ".", exist_ok=True)
+    with open(TRENDS_SNAPSHOT_PATH, "w", encoding="utf-8") as f:
+        json.dump(trends.snapshot(TRENDS_TOP), f, ensure_ascii=False)
+    print(trends.summary())
+    trends.close()
+    upload_cache(state_container_client, TRENDS_PATH, TRENDS_BLOB_NAME)
+    upload_cache(state_container_client, TRENDS_SNAPSHOT_PATH, TRENDS_SNAPSHOT_BLOB_NAME)
+
+def open_rollups():
+    download_cache(state_container_client, ROLLUP_PATH, ROLLUP_BLOB_NAME)
+    return RollupStore(ROLLUP_PATH)
+
+def close_rollups(rollups):
+    months = {m: rollups.month(m) for m in sorted(rollups.touched)}
+    print(rollups.summary())
+    rollups.close()
+    upload_cache(state_container_client, ROLLUP_PATH, ROLLUP_BLOB_NAME)
+    os.makedirs(ROLLUP_DIR, exist_ok=True)
+    for month, rollup in months.items():
+        path = os.path.join(ROLLUP_DIR, f"{month}.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(rollup, f, ensure_ascii=False)
+        upload_cache(state_container_client, path, month_blob_name(month))
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Fetch, enrich and upload news articles.")
+    parser.add_argument("--clients", choices=CLIENT_KINDS, default=os.getenv("INGEST_CLIENTS", "azure"),
+                        help="'fake' runs against the offline stand-ins in ingest_fakes.py")
+    parser.add_argument("--categories", nargs="+", default=CATEGORIES)
+    parser.add_argument("--rss", nargs="*", default=None, metavar="[CATEGORY=]URL",
+                        help="RSS feeds to pull as well (default: RSS_FEEDS, comma separated)")
+    parser.add_argument("--page-size", type=int, default=DEFAULT_PAGE_SIZE)
+    parser.add_argument("--max-pages", type=int, default=DEFAULT_MAX_PAGES,
+                        help="NewsAPI pages per category")
+    parser.add_argument("--serial", action="store_true",
+                        help="run the old one-step-at-a-time path instead of the async pipeline")
+    parser.add_argument("--fetch-concurrency", type=int, default=3)
+    parser.add_argument("--enrich-concurrency", type=int, default=4)
+    parser.add_argument("--upload-concurrency", type=int, default=8)
+    parser.add_argument("--queue-size", type=int, default=100,
+                        help="max items buffered between two stages (backpressure)")
+    parser.add_argument("--engine", choices=ENGINES, default=os.getenv("ENRICH_ENGINE", "auto"),
+                        help="enrichment backend; 'auto' falls back to the local engine when the service fails")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="ignore the enrichment cache and re-enrich every article")
+    parser.add_argument("--no-near-dupes", action="store_true",
+                        help="enrich near-duplicate stories instead of linking them to the canonical copy")
+    parser.add_argument("--no-embeddings", action="store_true",
+                        help="do not embed uploaded articles for /similar and vector search")
+    parser.add_argument("--no-trends", action="store_true",
+                        help="do not update the keyphrase trend counts behind /trends")
+    parser.add_argument("--no-rollups", action="store_true",
+                        help="do not update the daily rollups behind /rollups")
+    parser.add_argument("--full", action="store_true",
+                        help="full rebuild: ignore watermarks and already-stored blobs")
+    args = parser.parse_args(argv)
+    args.feeds = feeds_from_env() if args.rss is None else parse_feed_specs(args.rss)
+    return args
+
+def run(args, policies=None):
+    ledger = BudgetLedger.load(state_container_client)
+    limiter = RateLimiter(policies, ledger)
+    unlimited = clients
+    # Bu run'daki tüm servis çağrıları token bucket + backoff + günlük bütçeden geçer
+    use_clients(LimitedClients(unlimited, limiter))
+    try:
+        _run(args, limiter)
+    finally:
+        use_clients(unlimited)
+        ledger.save(state_container_client)
+        print(limiter.summary())
+
+def _run(args, limiter=None):
+    state = IngestState.load(container_client, state_container_client, full=args.full)
+    # --full enrichment cache'i ve near-duplicate index'ini de atlar: her makale yeniden zenginleştirilir
+    cache = None if args.no_cache or args.full else open_cache(args.engine)
+    near = None if args.no_near_dupes or args.full else open_near_index()
+    vectors = None if args.no_embeddings else open_vector_writer(limiter)
+    trends = None if args.no_trends else open_trends()
+    rollups = None if args.no_rollups else open_rollups()
+    ctx = RunContext(cache, state, ShardWriter(), near, args.engine, vectors, trends, rollups)
+    try:
+        if args.serial:
+            run_serial(ctx, args.categories, args.feeds, args.page_size, args.max_pages)
+        else:
+            import ingest_pipeline
+            asyncio.run(ingest_pipeline.main_async(args, clients, ctx))
+    finally:
+        ctx.shards.flush(bulk_container_client)
+        print(f"Skipped {state.skipped} already-stored articles")
+        state.save(state_container_client)
+        # trends.json ve rollup'lar generation artmadan yerinde olsun; backend yeni generation'da okur
+        if trends is not None:
+            close_trends(trends)
+        if rollups is not None:
+            close_rollups(rollups)
+        if ctx.uploaded:
+            # Backend'in sorgu cache'i yeni makaleleri TTL'i beklemeden görsün
+            print(f"Corpus generation is now {bump_generation(state_container_client)}")
+        if cache is not None:
+            close_cache(cache)
+        if near is not None:
+            close_near_index(near)
+        if vectors is not None:
+            close_vector_writer(vectors)
+
+def main(argv=None):
+    args = parse_args(argv)
+    use_clients(make_clients(args.clients))
+    run(args)
+
 if __name__ == "__main__":
     main()
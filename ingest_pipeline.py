@@ -0,0 +1,250 @@
+"""
+Asyncio ingest pipeline: fetch → enrich → upload.
+
+Stages are connected with bounded queues. A slow stage fills its input queue
+and the stage before it blocks on `put()` (backpressure), so memory stays
+bounded no matter how many articles a run sees. Each stage has its own
+concurrency limit. On shutdown (end of input or SIGINT/SIGTERM) fetching
+stops and everything already queued is drained through enrich and upload.
+"""
+import time
+import signal
+import asyncio
+
+from azure.core.exceptions import HttpResponseError, ServiceRequestError
+
+from ingest_news import (
+    CATEGORIES,
+    ENRICH_BATCH_SIZE,
+    batch_inputs,
+    enrich_actions,
+    map_batch_results,
+    serialize_doc,
+    RunContext,
+    enrich_local,
+    fill_failed,
+    orphaned_followers,
+    plan_article,
+    remember_upload,
+)
+from news_fetch import DEFAULT_PAGE_SIZE, DEFAULT_MAX_PAGES, Deduper, source_jobs
+
+# Kuyruğun sonuna her worker için bir tane konur
+_DONE = object()
+
+
+class PipelineStats:
+    def __init__(self):
+        self.fetched = 0
+        self.enriched = 0
+        self.uploaded = 0
+        self.started = time.perf_counter()
+
+    def summary(self) -> str:
+        elapsed = time.perf_counter() - self.started
+        rate = self.uploaded / elapsed if elapsed else 0.0
+        return (
+            f"fetched={self.fetched} enriched={self.enriched} uploaded={self.uploaded} "
+            f"in {elapsed:.2f}s ({rate:.1f} articles/s)"
+        )
+
+
+async def enrich_batch_async(lang, chunk: list) -> list:
+    poller = await lang.begin_analyze_actions(batch_inputs(chunk), actions=enrich_actions())
+    pages = await poller.result()
+    return map_batch_results(chunk, [document_results async for document_results in pages])
+
+
+async def _enrich_chunk(lang, chunk: list, engine: str) -> list:
+    if engine == "local":
+        # CPU işi; event loop'u bloklamasın
+        return await asyncio.to_thread(enrich_local, chunk)
+    try:
+        docs = await enrich_batch_async(lang, chunk)
+    except (HttpResponseError, ServiceRequestError) as e:
+        if engine != "auto":
+            raise
+        print(f"Language service failed ({e.__class__.__name__}: {e}), using local engine for {len(chunk)} articles")
+        return await asyncio.to_thread(enrich_local, chunk)
+    if engine == "auto" and any(doc["sentiment"] is None for doc in docs):
+        docs = await asyncio.to_thread(fill_failed, chunk, docs)
+    return docs
+
+
+async def _enrich_all(lang, articles: list, engine: str) -> list:
+    docs = []
+    for start in range(0, len(articles), ENRICH_BATCH_SIZE):
+        docs.extend(await _enrich_chunk(lang, articles[start:start + ENRICH_BATCH_SIZE], engine))
+    return docs
+
+
+async def _fetch_stage(jobs, enrich_q, upload_q, concurrency, stop, stats, ctx):
+    sem = asyncio.Semaphore(concurrency)
+    deduper = Deduper()
+
+    async def fetch_one(label, fetch):
+        async with sem:
+            if stop.is_set():
+                return
+            # newsapi-python ve feedparser senkron; thread'de çalıştır
+            arts = await asyncio.to_thread(fetch)
+            # Dedupe event loop thread'inde: kilit gerekmez
+            kept = deduper.filter(arts)
+            print(f"Found {len(arts)} articles from {label} ({len(kept)} new)")
+            for art in kept:
+                if stop.is_set():
+                    return
+                stats.fetched += 1
+                action, doc = plan_article(art, ctx)
+                if action == "enrich":
+                    await enrich_q.put(art)
+                elif action == "upload":
+                    await upload_q.put(doc)
+
+    await asyncio.gather(*(fetch_one(label, fetch) for label, fetch in jobs))
+    print(f"Dropped {deduper.duplicates} duplicate URLs")
+
+
+async def _enrich_worker(lang, in_q, out_q, stats, engine):
+    finished = False
+    while not finished:
+        item = await in_q.get()
+        if item is _DONE:
+            return
+        # Kuyrukta bekleyenleri tek analyze-actions işine topla
+        chunk = [item]
+        while len(chunk) < ENRICH_BATCH_SIZE:
+            try:
+                item = in_q.get_nowait()
+            except asyncio.QueueEmpty:
+                break
+            if item is _DONE:
+                finished = True
+                break
+            chunk.append(item)
+
+        for doc in await _enrich_chunk(lang, chunk, engine):
+            stats.enriched += 1
+            await out_q.put(doc)
+
+
+async def _upload_all(lang, container, pending: list, stats, ctx):
+    # Bu makaleyi bekleyen near-duplicate'ler aynı worker'da yüklenir
+    while pending:
+        doc = pending.pop(0)
+        blob_name, data = serialize_doc(doc)
+        await container.upload_blob(blob_name, data, overwrite=True)
+        linked, unlinked = remember_upload(doc, blob_name, ctx)
+        pending.extend(linked)
+        if unlinked:
+            # Enrich kuyruğu bu noktada kapanmış olabilir; kopyalar burada zenginleşir
+            docs = await _enrich_all(lang, unlinked, ctx.engine)
+            stats.enriched += len(docs)
+            pending.extend(docs)
+        stats.uploaded += 1
+        print(f"Uploaded/Updated: {blob_name}")
+
+
+async def _upload_worker(lang, container, in_q, stats, ctx):
+    while True:
+        doc = await in_q.get()
+        if doc is _DONE:
+            return
+        await _upload_all(lang, container, [doc], stats, ctx)
+
+
+def _install_signal_handlers(stop):
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stop.set)
+        except (NotImplementedError, RuntimeError):
+            # Windows / ana thread dışı: Ctrl+C yine KeyboardInterrupt olarak gelir
+            pass
+
+
+async def run_pipeline(
+    newsapi,
+    lang,
+    container,
+    categories=CATEGORIES,
+    feeds=(),
+    page_size: int = DEFAULT_PAGE_SIZE,
+    max_pages: int = DEFAULT_MAX_PAGES,
+    fetch_concurrency: int = 3,
+    enrich_concurrency: int = 4,
+    upload_concurrency: int = 8,
+    queue_size: int = 100,
+    stop: asyncio.Event = None,
+    ctx: RunContext = None,
+) -> PipelineStats:
+    stats = PipelineStats()
+    ctx = ctx or RunContext()
+    stop = stop or asyncio.Event()
+    enrich_q = asyncio.Queue(maxsize=queue_size)
+    upload_q = asyncio.Queue(maxsize=queue_size)
+
+    async def fetch_stage():
+        jobs = source_jobs(newsapi, categories, feeds, page_size, max_pages)
+        await _fetch_stage(jobs, enrich_q, upload_q, fetch_concurrency, stop, stats, ctx)
+        for _ in range(enrich_concurrency):
+            await enrich_q.put(_DONE)
+
+    async def enrich_stage():
+        await asyncio.gather(*(
+            _enrich_worker(lang, enrich_q, upload_q, stats, ctx.engine) for _ in range(enrich_concurrency)
+        ))
+        for _ in range(upload_concurrency):
+            await upload_q.put(_DONE)
+
+    async def upload_stage():
+        await asyncio.gather(*(
+            _upload_worker(lang, container, upload_q, stats, ctx) for _ in range(upload_concurrency)
+        ))
+        # Kanoniği hiç yüklenmeyen kopyalar sessizce düşmesin
+        orphans = orphaned_followers(ctx)
+        if orphans:
+            print(f"Enriching {len(orphans)} near-duplicates whose canonical was not uploaded")
+            docs = await _enrich_all(lang, orphans, ctx.engine)
+            stats.enriched += len(docs)
+            await _upload_all(lang, container, docs, stats, ctx)
+
+    tasks = [
+        asyncio.create_task(fetch_stage()),
+        asyncio.create_task(enrich_stage()),
+        asyncio.create_task(upload_stage()),
+    ]
+    try:
+        await asyncio.gather(*tasks)
+    except BaseException:
+        # Bir stage patlarsa diğerleri dolu kuyrukta sonsuza dek beklemesin
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
+    return stats
+
+
+async def main_async(args, clients, ctx=None):
+    stop = asyncio.Event()
+    _install_signal_handlers(stop)
+
+    async with clients.async_clients() as (lang, container):
+        print("Running ingest pipeline…")
+        stats = await run_pipeline(
+            clients.newsapi,
+            lang,
+            container,
+            categories=args.categories,
+            feeds=args.feeds,
+            page_size=args.page_size,
+            max_pages=args.max_pages,
+            fetch_concurrency=args.fetch_concurrency,
+            enrich_concurrency=args.enrich_concurrency,
+            upload_concurrency=args.upload_concurrency,
+            queue_size=args.queue_size,
+            stop=stop,
+            ctx=ctx,
+        )
+    print(f"Done. {stats.summary()}")
+    return stats
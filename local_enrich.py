@@ -0,0 +1,220 @@
+"""
+In-process enrichment engine (no Language service calls).
+
+Produces the same `summary` / `sentiment` / `keyphrases` fields as the Azure
+path, for runs where the service is throttled, out of quota or simply not
+wanted. A whole batch is processed in one pass over scipy sparse matrices:
+
+* sentiment  – lexicon scores: doc-term counts × word polarity vector;
+* keyphrases – RAKE-style candidates (runs of non-stopwords) ranked by the
+               summed TF-IDF of their words across the batch;
+* summary    – TextRank over sentence similarity. Term columns are made
+               document-specific, so S·Sᵀ is block diagonal and the power
+               iteration ranks the sentences of every document at once.
+"""
+import re
+import unicodedata
+
+import numpy as np
+import scipy.sparse as sp
+
+ENGINE_NAME = "local"
+
+SUMMARY_SENTENCES = 3
+MAX_KEYPHRASES = 5
+MAX_PHRASE_WORDS = 4
+SENTIMENT_THRESHOLD = 0.05
+DAMPING = 0.85
+ITERATIONS = 30
+
+STOPWORDS = set("""
+a about above after again against all also am an and any are as at be because been before being
+below between both but by can could did do does doing down during each few for from further had has
+have having he her here hers herself him himself his how i if in into is it its itself just me more
+most my myself no nor not now of off on once only or other our ours ourselves out over own said same
+says she should so some such than that the their theirs them themselves then there these they this
+those through to too under until up very was we were what when where which while who whom why will
+with would you your yours yourself yourselves new one two according year years week per
+via mr mrs ms chars told like get got make made many much may might must us well
+""".split())
+
+POSITIVE = set("""
+achieve achieved advance advanced agreement approve approved benefit benefits best better boost
+boosted breakthrough calm celebrate celebrated confident cure cured deal delight earn effective
+efficient gain gained gains good great grow growing growth happy healthy hope improve improved
+improvement innovative innovation launch leading love milestone optimistic outperform peace popular
+positive praise praised profit profitable progress promising prosper rally rallied record recover
+recovered recovery relief resilient rise rising rose safe saved secure soar soared solution stable
+strong stronger succeed success successful support surge surged thrive top upbeat upgrade win winning
+wins won
+""".split())
+
+NEGATIVE = set("""
+abuse accident accused attack attacked bad bankrupt bankruptcy ban banned breach collapse collapsed
+concern concerns conflict crash crashed crime crisis cut cuts damage danger dead death decline
+declined delay delayed deficit destroy disaster dispute downturn drop dropped fail failed failure
+fall fallen falling fear fears fell fined fire fired flood fraud hack hacked harm hurt illegal
+injured kill killed lawsuit layoffs lose loses losing loss losses negative outage plunge plunged
+poor protest recall recession risk risks scandal shortage shut slump sue sued threat threats
+tumble tumbled uncertain uncertainty violence virus vulnerability war warn warned warning weak worse
+worst
+""".split())
+
+_SENTENCE_RE = re.compile(r"(?<=[.!?])\s+")
+# Harfle başlayan kelimeler, her alfabede (ş, ğ, ı, é…); sayılar ve _ kelime başlatmaz
+_WORD_RE = re.compile(r"[^\W\d_][\w'-]*", re.UNICODE)
+# NewsAPI içerikleri "… [+1234 chars]" ile biter
+_TRUNCATION_RE = re.compile(r"\s*(…|\.\.\.)?\s*\[\+\d+ chars\]\s*$")
+
+
+def _text(article: dict) -> str:
+    content = _TRUNCATION_RE.sub("", article.get("content") or "")
+    return (article.get("title") or "") + ". " + content
+
+
+def _words(text: str) -> list:
+    if text.isascii():
+        return _WORD_RE.findall(text.lower())
+    # casefold "İ"yi i + birleşik nokta yapar; nokta \w değil, kelimeyi böler
+    return _WORD_RE.findall(unicodedata.normalize("NFC", text).casefold().replace("i\u0307", "i"))
+
+
+def _phrases(sentence: str) -> list:
+    """RAKE candidates: maximal runs of non-stopwords."""
+    out, run = [], []
+    for word in _words(sentence):
+        if word in STOPWORDS or len(word) < 3:
+            if run:
+                out.append(run)
+            run = []
+        else:
+            run.append(word)
+    if run:
+        out.append(run)
+    return [tuple(p[:MAX_PHRASE_WORDS]) for p in out]
+
+
+def _polarity(word: str) -> float:
+    return 1.0 if word in POSITIVE else -1.0 if word in NEGATIVE else 0.0
+
+
+class LocalEnricher:
+    """
+    Stateless: every batch builds its own vocabulary, so one enricher can be
+    shared by the pipeline's worker threads and memory does not grow with
+    the number of batches processed.
+    """
+
+    def enrich_batch(self, articles: list) -> list:
+        """Returns one {"summary", "sentiment", "keyphrases"} dict per article."""
+        if not articles:
+            return []
+
+        # ── Tokenize: doc-term ve sentence-term üçlüleri ────────────
+        # Sözlük bu batch'e özel; thread'ler arasında paylaşılan durum yok
+        vocab = {}
+        sentences, sent_doc, doc_rows, doc_cols = [], [], [], []
+        sent_rows, sent_cols, phrases = [], [], []
+        for d, art in enumerate(articles):
+            doc_phrases = []
+            for s in _SENTENCE_RE.split(_text(art).strip()):
+                if not s:
+                    continue
+                words = [w for w in _words(s) if w not in STOPWORDS]
+                ids = [vocab.setdefault(w, len(vocab)) for w in words]
+                sent_rows.extend([len(sentences)] * len(ids))
+                sent_cols.extend(ids)
+                doc_rows.extend([d] * len(ids))
+                doc_cols.extend(ids)
+                sent_doc.append(d)
+                sentences.append(s.strip())
+                doc_phrases.extend(_phrases(s))
+            phrases.append(doc_phrases)
+
+        n_docs, n_terms, n_sents = len(articles), len(vocab), len(sentences)
+        counts = sp.csr_matrix(
+            (np.ones(len(doc_rows), dtype=np.float32), (doc_rows, doc_cols)), shape=(n_docs, n_terms)
+        )
+        counts.sum_duplicates()
+
+        sentiments = self._sentiment(counts, vocab)
+        keyphrases = self._keyphrases(counts, phrases, vocab)
+        summaries = self._summaries(
+            np.asarray(sent_doc), np.asarray(sent_rows, dtype=np.int64),
+            np.asarray(sent_cols, dtype=np.int64), sentences, n_docs, n_terms, n_sents,
+        )
+        return [
+            {"summary": summaries[d], "sentiment": sentiments[d], "keyphrases": keyphrases[d]}
+            for d in range(n_docs)
+        ]
+
+    def _sentiment(self, counts, vocab: dict) -> list:
+        # vocab sıra numaraları ekleme sırasıyla 0..n-1
+        polarity = np.fromiter((_polarity(w) for w in vocab), dtype=np.float32, count=len(vocab))
+        hits = counts @ np.abs(polarity)
+        score = (counts @ polarity) / np.maximum(np.asarray(counts.sum(axis=1)).ravel(), 1.0)
+        labels = np.where(score > SENTIMENT_THRESHOLD, "positive",
+                          np.where(score < -SENTIMENT_THRESHOLD, "negative", "neutral"))
+        labels[hits == 0] = "neutral"
+        return labels.tolist()
+
+    def _keyphrases(self, counts, phrases, vocab: dict) -> list:
+        n_docs = counts.shape[0]
+        df = np.bincount(counts.indices, minlength=counts.shape[1])
+        idf = np.log((1 + n_docs) / (1 + df)) + 1.0
+        tfidf = counts.multiply(idf).tocsr()
+
+        out = []
+        for d, doc_phrases in enumerate(phrases):
+            row = tfidf.getrow(d)
+            weight = dict(zip(row.indices.tolist(), row.data.tolist()))
+            scored = {}
+            for phrase in doc_phrases:
+                ids = [vocab[w] for w in phrase if w in vocab]
+                score = sum(weight.get(i, 0.0) for i in ids)
+                key = " ".join(phrase)
+                if score > scored.get(key, 0.0):
+                    scored[key] = score
+            ranked = sorted(scored.items(), key=lambda kv: -kv[1])[:MAX_KEYPHRASES]
+            out.append([phrase for phrase, _ in ranked])
+        return out
+
+    def _summaries(self, sent_doc, sent_rows, sent_cols, sentences, n_docs, n_terms, n_sents) -> list:
+        if n_sents == 0:
+            return [""] * n_docs
+        # Doküman-özel terim sütunları → S·Sᵀ blok diyagonal, dokümanlar arası benzerlik yok
+        cols = sent_doc[sent_rows] * n_terms + sent_cols
+        _, cols = np.unique(cols, return_inverse=True)
+        S = sp.csr_matrix((np.ones(len(cols), dtype=np.float32), (sent_rows, cols)),
+                          shape=(n_sents, int(cols.max()) + 1 if len(cols) else 1))
+        S.data[:] = 1.0  # küme benzeri: tekrar eden kelime ağırlık kazanmasın
+        norms = np.sqrt(np.asarray(S.multiply(S).sum(axis=1)).ravel())
+        S = sp.diags(1.0 / np.maximum(norms, 1e-9)) @ S
+        sim = (S @ S.T).tocsr()
+        sim.setdiag(0)
+        sim.eliminate_zeros()
+
+        out_degree = np.asarray(sim.sum(axis=1)).ravel()
+        M = (sp.diags(1.0 / np.maximum(out_degree, 1e-9)) @ sim).T.tocsr()
+        doc_sizes = np.bincount(sent_doc, minlength=n_docs)
+        teleport = (1.0 - DAMPING) / doc_sizes[sent_doc]
+        rank = 1.0 / doc_sizes[sent_doc]
+        for _ in range(ITERATIONS):
+            rank = teleport + DAMPING * (M @ rank)
+        # Hiç benzerliği olmayan cümlelerde ilk cümleler öne çıksın
+        rank = rank - np.arange(n_sents) * 1e-9
+
+        order = np.lexsort((-rank, sent_doc))
+        picked = [[] for _ in range(n_docs)]
+        for i in order:
+            d = sent_doc[i]
+            if len(picked[d]) < SUMMARY_SENTENCES:
+                picked[d].append(i)
+        return [" ".join(sentences[i] for i in sorted(p)) for p in picked]
+
+
+_default = LocalEnricher()
+
+
+def enrich_batch(articles: list) -> list:
+    return _default.enrich_batch(articles)
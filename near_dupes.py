@@ -0,0 +1,203 @@
+"""
+Near-duplicate detection before enrichment (MinHash + LSH).
+
+Wire stories show up under different URLs from different outlets; each copy
+would otherwise pay for full Language enrichment. Every enriched article
+gets a MinHash signature over its title+content word shingles; two articles
+are near-duplicates when the estimated Jaccard similarity of their shingle
+sets is at least THRESHOLD.
+
+Lookups stay sublinear with LSH banding: the signature is cut into BANDS
+bands of ROWS values, each band hashed to one indexed key. Only articles that
+share at least one band key are compared, so the cost of a lookup depends on
+the number of similar articles, not on corpus size. With 32 bands of 4 rows a
+pair at Jaccard 0.7 collides in some band with ~99.99% probability, a pair at
+0.3 with ~23% (and is then rejected by the signature comparison).
+
+The index lives in its own SQLite file, parked in the state container between
+runs like the enrichment cache.
+"""
+import os
+import re
+import json
+import time
+import sqlite3
+import hashlib
+
+import numpy as np
+
+FINGERPRINT_BLOB_NAME = "fingerprints.sqlite"
+SHINGLE_SIZE = 3
+NUM_PERM = 128
+BANDS = 32
+ROWS = NUM_PERM // BANDS
+THRESHOLD = 0.5
+
+_WORD_RE = re.compile(r"\w+")
+# 2^32'den büyük asal; a*x (a, x < 2^32) uint64'e sığar
+_PRIME = np.uint64(4294967311)
+_rng = np.random.default_rng(20250101)
+_PERM_A = _rng.integers(1, 2**32 - 1, size=NUM_PERM, dtype=np.uint64)
+_PERM_B = _rng.integers(0, 2**32 - 1, size=NUM_PERM, dtype=np.uint64)
+_BAND_MULT = _rng.integers(1, 2**63 - 1, size=(BANDS, ROWS), dtype=np.uint64) | np.uint64(1)
+_BAND_SALT = _rng.integers(0, 2**63 - 1, size=BANDS, dtype=np.uint64)
+
+
+def shingles(text: str) -> set:
+    words = _WORD_RE.findall(text.lower())
+    if len(words) < SHINGLE_SIZE:
+        return {" ".join(words)}
+    return {" ".join(words[i:i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1)}
+
+
+def signature(text: str) -> np.ndarray:
+    digests = b"".join(hashlib.blake2b(s.encode("utf-8"), digest_size=4).digest() for s in shingles(text))
+    x = np.frombuffer(digests, dtype="<u4").astype(np.uint64)
+    # (NUM_PERM, n) hash matrisi; her permütasyon için minimum
+    hashed = ((_PERM_A[:, None] * x[None, :]) % _PRIME + _PERM_B[:, None]) % _PRIME
+    return hashed.min(axis=1).astype(np.uint32)
+
+
+def band_keys(sig: np.ndarray) -> list:
+    rows = sig.astype(np.uint64).reshape(BANDS, ROWS)
+    keys = (rows * _BAND_MULT).sum(axis=1) + _BAND_SALT
+    # SQLite INTEGER işaretli 64 bit
+    return keys.view(np.int64).tolist()
+
+
+def similarity(a: np.ndarray, b: np.ndarray) -> float:
+    return float(np.count_nonzero(a == b)) / NUM_PERM
+
+
+class NearDuplicateIndex:
+    def __init__(self, path: str, max_entries: int = 200_000, threshold: float = THRESHOLD):
+        self.path = path
+        self.max_entries = max_entries
+        self.threshold = threshold
+        self.linked = 0
+        # Bu run'da enrichment'a giden kanonikler (url → signature, band key → url)
+        # ve onları bekleyen kopyalar (url → [article])
+        self._pending = {}
+        self._pending_keys = {}
+        self._followers = {}
+
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.conn = sqlite3.connect(path)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS fingerprints ("
+            " url TEXT PRIMARY KEY,"
+            " signature BLOB NOT NULL,"
+            " doc TEXT NOT NULL,"
+            " last_used REAL NOT NULL)"
+        )
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS fingerprint_bands (key INTEGER NOT NULL, url TEXT NOT NULL)"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS fingerprint_bands_key ON fingerprint_bands(key)")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS fingerprint_bands_url ON fingerprint_bands(url)")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS fingerprints_last_used ON fingerprints(last_used)")
+
+    @staticmethod
+    def signature(article: dict) -> np.ndarray:
+        return signature((article.get("title") or "") + " " + (article.get("content") or ""))
+
+    def _stored_match(self, sig: np.ndarray, keys: list, own_url: str):
+        placeholders = ", ".join("?" * len(keys))
+        best = None
+        # Makalenin kendi eski sürümü kopyası sayılmaz; değişen içerik yeniden zenginleşir
+        for url, stored, doc in self.conn.execute(
+            "SELECT f.url, f.signature, f.doc FROM fingerprints f WHERE f.url != ? AND f.url IN ("
+            f" SELECT DISTINCT url FROM fingerprint_bands WHERE key IN ({placeholders}))",
+            [own_url, *keys],
+        ):
+            score = similarity(sig, np.frombuffer(stored, dtype=np.uint32))
+            if score >= self.threshold and (best is None or score > best[0]):
+                best = (score, url, doc)
+        return best
+
+    def _pending_match(self, sig: np.ndarray, keys: list):
+        best = None
+        for url in {u for k in keys for u in self._pending_keys.get(k, ())}:
+            score = similarity(sig, self._pending[url])
+            if score >= self.threshold and (best is None or score > best[0]):
+                best = (score, url)
+        return best[1] if best else None
+
+    def find(self, article: dict):
+        """
+        ("doc", canonical_doc)  → already enriched near-duplicate, reuse it
+        ("pending", url)        → canonical is being enriched in this run; the
+                                  article is parked and comes back from resolve()
+        None                    → new story, enrich it (it becomes canonical)
+        """
+        sig = self.signature(article)
+        keys = band_keys(sig)
+        match = self._stored_match(sig, keys, article["url"])
+        if match is not None:
+            _, url, doc = match
+            self.conn.execute("UPDATE fingerprints SET last_used = ? WHERE url = ?", (time.time(), url))
+            self.linked += 1
+            return "doc", json.loads(doc)
+
+        url = self._pending_match(sig, keys)
+        if url is not None:
+            self._followers.setdefault(url, []).append(article)
+            self.linked += 1
+            return "pending", url
+
+        self._pending[article["url"]] = sig
+        for key in keys:
+            self._pending_keys.setdefault(key, []).append(article["url"])
+        return None
+
+    def add(self, doc: dict, sig: np.ndarray = None):
+        if sig is None:
+            sig = self._pending.get(doc["url"])
+        if sig is None:
+            return
+        self.conn.execute("DELETE FROM fingerprint_bands WHERE url = ?", (doc["url"],))
+        self.conn.execute(
+            "INSERT OR REPLACE INTO fingerprints (url, signature, doc, last_used) VALUES (?, ?, ?, ?)",
+            (doc["url"], sig.tobytes(), json.dumps(doc, ensure_ascii=False), time.time()),
+        )
+        self.conn.executemany(
+            "INSERT INTO fingerprint_bands (key, url) VALUES (?, ?)",
+            [(key, doc["url"]) for key in band_keys(sig)],
+        )
+
+    def resolve(self, doc: dict) -> list:
+        """Articles parked behind `doc` (its near-duplicates in this run)."""
+        return self._followers.pop(doc["url"], [])
+
+    def release(self, doc: dict) -> list:
+        """Articles parked behind `doc` that must be enriched on their own after all."""
+        followers = self._followers.pop(doc["url"], [])
+        self.linked -= len(followers)
+        return followers
+
+    def orphans(self) -> list:
+        """Articles still parked behind a canonical that never came back; clears them."""
+        followers = [art for arts in self._followers.values() for art in arts]
+        self._followers = {}
+        self.linked -= len(followers)
+        return followers
+
+    def __len__(self):
+        return self.conn.execute("SELECT COUNT(*) FROM fingerprints").fetchone()[0]
+
+    def evict(self) -> int:
+        stale = [row[0] for row in self.conn.execute(
+            "SELECT url FROM fingerprints ORDER BY last_used DESC LIMIT -1 OFFSET ?", (self.max_entries,)
+        )]
+        self.conn.executemany("DELETE FROM fingerprint_bands WHERE url = ?", [(u,) for u in stale])
+        self.conn.executemany("DELETE FROM fingerprints WHERE url = ?", [(u,) for u in stale])
+        return len(stale)
+
+    def summary(self) -> str:
+        return f"near-duplicates linked={self.linked} index size={len(self)}"
+
+    def close(self):
+        self.evict()
+        self.conn.commit()
+        self.conn.close()
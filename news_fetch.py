@@ -0,0 +1,179 @@
+"""
+Fetch layer: paged NewsAPI top headlines + RSS feeds, deduplicated by URL.
+
+Every source yields articles in NewsAPI's shape (title, content, publishedAt,
+url, source.name) plus our `category`, so the rest of the ingester does not
+care where an article came from. The same story often shows up under several
+categories or feeds with different tracking parameters; `normalize_url`
+reduces those to one key and `Deduper` keeps the first copy it sees.
+"""
+import os
+import re
+import html
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+import feedparser
+
+from rate_limits import BudgetExhausted
+
+DEFAULT_PAGE_SIZE = 15
+DEFAULT_MAX_PAGES = 3
+
+TRACKING_PARAMS = {
+    "fbclid", "gclid", "dclid", "msclkid", "mc_cid", "mc_eid", "igshid",
+    "ref", "ref_src", "cmpid", "ocid", "ito", "smid", "taid", "spm", "guccounter",
+}
+TRACKING_PREFIXES = ("utm_", "at_", "ns_", "_hs")
+_DEFAULT_PORTS = {"http": "80", "https": "443"}
+_TAG_RE = re.compile(r"<[^>]+>")
+
+
+def normalize_url(url: str) -> str:
+    """
+    Canonical form used for dedupe: scheme/host lowercased, default port,
+    fragment and tracking query params dropped, remaining params sorted.
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    if parts.port and str(parts.port) != _DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{parts.port}"
+    query = sorted(
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if k.lower() not in TRACKING_PARAMS and not k.lower().startswith(TRACKING_PREFIXES)
+    )
+    path = parts.path or "/"
+    if len(path) > 1 and path.endswith("/"):
+        path = path.rstrip("/")
+    return urlunsplit((scheme, host, path, urlencode(query), ""))
+
+
+class Deduper:
+    def __init__(self):
+        self.seen = set()
+        self.duplicates = 0
+
+    def add(self, article: dict) -> bool:
+        """False if an article with the same normalized URL was already seen."""
+        # Normalize URL sadece dedupe anahtarı; blob adı, id ve link yayıncının URL'i kalır
+        key = normalize_url(article["url"])
+        if key in self.seen:
+            self.duplicates += 1
+            return False
+        self.seen.add(key)
+        return True
+
+    def filter(self, articles: list) -> list:
+        return [a for a in articles if self.add(a)]
+
+
+# ── NewsAPI ─────────────────────────────────────────────────
+def fetch_newsapi(client, category: str, page_size: int = DEFAULT_PAGE_SIZE,
+                  max_pages: int = DEFAULT_MAX_PAGES) -> list:
+    articles = []
+    for page in range(1, max_pages + 1):
+        try:
+            resp = client.get_top_headlines(
+                language="en",
+                category=category,
+                page_size=page_size,
+                page=page
+            )
+        except BudgetExhausted as e:
+            # Günlük kota bitti; elde olanla devam, kalan sayfalar bir sonraki run'a
+            print(f"Stopped {category} at page {page}: {e}")
+            break
+        batch = resp.get("articles", [])
+        articles.extend({**a, "category": category} for a in batch if a.get("content"))
+        if len(batch) < page_size or page * page_size >= resp.get("totalResults", 0):
+            break
+    return articles
+
+
+# ── RSS ─────────────────────────────────────────────────────
+def parse_feed_specs(specs) -> list:
+    """["technology=https://…", "https://…"] → [(category, url), …]"""
+    feeds = []
+    for spec in specs or []:
+        spec = spec.strip()
+        if not spec:
+            continue
+        category, sep, url = spec.partition("=")
+        if not sep or "://" in category:
+            category, url = "general", spec
+        feeds.append((category.strip(), url.strip()))
+    return feeds
+
+
+def feeds_from_env() -> list:
+    return parse_feed_specs(os.getenv("RSS_FEEDS", "").split(","))
+
+
+def _entry_time(entry) -> str:
+    parsed = entry.get("published_parsed") or entry.get("updated_parsed")
+    if not parsed:
+        return None
+    return time.strftime("%Y-%m-%dT%H:%M:%SZ", parsed)
+
+
+def _plain_text(value: str) -> str:
+    return html.unescape(_TAG_RE.sub(" ", value or "")).strip()
+
+
+def fetch_rss(url: str, category: str = "general") -> list:
+    feed = feedparser.parse(url)
+    source = feed.feed.get("title") or urlsplit(url).hostname or url
+    articles = []
+    for entry in feed.entries:
+        content = ""
+        if entry.get("content"):
+            content = entry.content[0].get("value", "")
+        content = _plain_text(content or entry.get("summary", ""))
+        published = _entry_time(entry)
+        if not entry.get("link") or not content or not published:
+            continue
+        articles.append({
+            "title": _plain_text(entry.get("title", "")),
+            "content": content,
+            "publishedAt": published,
+            "url": entry.link,
+            "source": {"id": None, "name": source},
+            "category": category,
+        })
+    return articles
+
+
+# ── Hepsi birden ────────────────────────────────────────────
+def source_jobs(client, categories, feeds, page_size=DEFAULT_PAGE_SIZE, max_pages=DEFAULT_MAX_PAGES):
+    """(label, callable) pairs, one per NewsAPI category and RSS feed."""
+    jobs = [
+        (f"newsapi:{cat}", lambda cat=cat: fetch_newsapi(client, cat, page_size, max_pages))
+        for cat in categories
+    ]
+    jobs += [
+        (f"rss:{url}", lambda cat=cat, url=url: fetch_rss(url, cat))
+        for cat, url in feeds
+    ]
+    return jobs
+
+
+def fetch_all(client, categories, feeds=(), page_size=DEFAULT_PAGE_SIZE,
+              max_pages=DEFAULT_MAX_PAGES, workers: int = 8, deduper: Deduper = None) -> list:
+    """
+    Fetches every source concurrently and returns the deduplicated articles.
+    Sources are merged in job order (categories first, then feeds), so which
+    copy of a duplicate wins does not depend on network timing.
+    """
+    deduper = deduper or Deduper()
+    jobs = source_jobs(client, categories, feeds, page_size, max_pages)
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(jobs)))) as pool:
+        results = list(pool.map(lambda job: job[1](), jobs))
+
+    articles = []
+    for (label, _), arts in zip(jobs, results):
+        kept = deduper.filter(arts)
+        print(f"Found {len(arts)} articles from {label} ({len(kept)} new)")
+        articles.extend(kept)
+    return articles
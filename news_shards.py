@@ -0,0 +1,255 @@
+"""
+Bulk corpus format: gzip-compressed NDJSON shards plus a manifest.
+
+Per-article JSON blobs stay the source for the Azure Search indexer, but
+anyone who wants the whole corpus (indexers, backfills, analytics) would have
+to issue one GET per article. Each ingest run therefore also writes one shard
+blob per category per publish day into the bulk container:
+
+    shards/{day}/{category}/{run_id}.ndjson.gz
+
+A shard is a concatenation of independent gzip members ("blocks") of up to
+BLOCK_ROWS documents each, so any block can be fetched with a range read and
+decompressed on its own. `manifest.json` lists every shard with its row
+count, size and block byte ranges; ShardReader streams the corpus from it.
+
+Every run adds shards, so without upkeep the manifest and the number of range
+reads would grow with the run count. After a run's shards are written, each
+(month, category) the run touched is compacted once it holds COMPACT_MIN_SHARDS
+shards: they are merged into one
+
+    shards/{month}/{category}/compact-{run_id}.ndjson.gz
+
+keeping only the latest version of every article, and the merged blobs are
+deleted after the new manifest is up. A month/category therefore never holds
+more than COMPACT_MIN_SHARDS shards and the manifest grows with the months
+covered, not with the number of runs. A compacted entry spans `day` to
+`last_day`; ShardReader filters its documents by publish day.
+"""
+import gzip
+import json
+import os
+from datetime import datetime, timezone
+
+from azure.core.exceptions import ResourceNotFoundError, ResourceExistsError
+
+MANIFEST_BLOB_NAME = "manifest.json"
+MANIFEST_VERSION = 1
+BLOCK_ROWS = 1000
+COMPACT_MIN_SHARDS = int(os.getenv("SHARD_COMPACT_MIN", "8"))
+
+
+def _encode_block(docs: list) -> bytes:
+    lines = "".join(json.dumps(d, ensure_ascii=False) + "\n" for d in docs)
+    return gzip.compress(lines.encode("utf-8"))
+
+
+def _decode_block(data: bytes):
+    for line in gzip.decompress(data).decode("utf-8").splitlines():
+        if line:
+            yield json.loads(line)
+
+
+def _encode_shard(docs: list, block_rows: int):
+    blocks, parts, offset = [], [], 0
+    for start in range(0, len(docs), block_rows):
+        chunk = docs[start:start + block_rows]
+        data = _encode_block(chunk)
+        blocks.append({"offset": offset, "length": len(data), "rows": len(chunk)})
+        parts.append(data)
+        offset += len(data)
+    return blocks, b"".join(parts)
+
+
+def _doc_day(doc: dict) -> str:
+    return (doc.get("published") or "")[:10] or "unknown"
+
+
+def _month(shard: dict) -> str:
+    return shard.get("month") or shard["day"][:7]
+
+
+def load_manifest(bulk_container) -> dict:
+    try:
+        return json.loads(bulk_container.download_blob(MANIFEST_BLOB_NAME).readall())
+    except ResourceNotFoundError:
+        return {"version": MANIFEST_VERSION, "shards": []}
+
+
+class ShardWriter:
+    def __init__(self, run_id: str = None, block_rows: int = BLOCK_ROWS,
+                 compact_min: int = COMPACT_MIN_SHARDS):
+        self.run_id = run_id or datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+        self.block_rows = block_rows
+        self.compact_min = compact_min
+        self._groups = {}
+
+    def add(self, doc: dict):
+        key = (_doc_day(doc), doc.get("category", "general"))
+        self._groups.setdefault(key, []).append(doc)
+
+    def __len__(self):
+        return sum(len(docs) for docs in self._groups.values())
+
+    def build(self):
+        """Yields (manifest entry, shard bytes) for every category/day group."""
+        for (day, category), docs in sorted(self._groups.items()):
+            blocks, data = _encode_shard(docs, self.block_rows)
+            entry = {
+                "blob": f"shards/{day}/{category}/{self.run_id}.ndjson.gz",
+                "run": self.run_id,
+                "day": day,
+                "category": category,
+                "rows": len(docs),
+                "bytes": len(data),
+                "blocks": blocks,
+            }
+            yield entry, data
+
+    def compact(self, bulk_container, manifest: dict, months: set) -> list:
+        """
+        Merges every (month, category) group in `months` that holds at least
+        `compact_min` shards into a single shard, keeping the latest version of
+        each article. Updates `manifest` in place and returns the blob names it
+        replaced; the caller deletes them once the new manifest is written.
+        """
+        groups = {}
+        for shard in manifest["shards"]:
+            key = (_month(shard), shard["category"])
+            if key in months:
+                groups.setdefault(key, []).append(shard)
+
+        reader = ShardReader(bulk_container)
+        replaced = []
+        for (month, category), shards in sorted(groups.items()):
+            if len(shards) < max(self.compact_min, 2):
+                continue
+            # En yeni run önce: aynı makalenin son sürümü kalır
+            seen, docs = set(), []
+            for shard in sorted(shards, key=lambda s: s["run"], reverse=True):
+                for doc in reader.iter_shard(shard):
+                    if doc["id"] not in seen:
+                        seen.add(doc["id"])
+                        docs.append(doc)
+            docs.sort(key=_doc_day)
+            blocks, data = _encode_shard(docs, self.block_rows)
+            days = [_doc_day(d) for d in docs]
+            entry = {
+                "blob": f"shards/{month}/{category}/compact-{self.run_id}.ndjson.gz",
+                "run": self.run_id,
+                "day": days[0],
+                "last_day": days[-1],
+                "month": month,
+                "category": category,
+                "rows": len(docs),
+                "bytes": len(data),
+                "blocks": blocks,
+                "merged": len(shards),
+            }
+            bulk_container.upload_blob(entry["blob"], data, overwrite=True)
+
+            merged = {s["blob"] for s in shards}
+            manifest["shards"] = [s for s in manifest["shards"] if s["blob"] not in merged] + [entry]
+            replaced.extend(sorted(merged - {entry["blob"]}))
+            print(f"Compacted {len(shards)} shards of {month}/{category} into {len(docs)} docs")
+        return replaced
+
+    def flush(self, bulk_container) -> list:
+        if not self._groups:
+            return []
+        try:
+            bulk_container.create_container()
+        except ResourceExistsError:
+            pass
+
+        entries = []
+        for entry, data in self.build():
+            bulk_container.upload_blob(entry["blob"], data, overwrite=True)
+            entries.append(entry)
+
+        # Manifest en son yazılır: okuyucular yarım kalmış shard görmez
+        manifest = load_manifest(bulk_container)
+        written = {e["blob"] for e in entries}
+        manifest["shards"] = [s for s in manifest["shards"] if s["blob"] not in written] + entries
+        months = {(day[:7], category) for day, category in self._groups}
+        replaced = self.compact(bulk_container, manifest, months)
+        bulk_container.upload_blob(
+            MANIFEST_BLOB_NAME, json.dumps(manifest, ensure_ascii=False), overwrite=True
+        )
+        print(f"Wrote {len(entries)} shards ({len(self)} docs) for run {self.run_id}")
+
+        # Birleşen shard'lar ancak manifest'ten çıktıktan sonra silinir
+        for name in replaced:
+            try:
+                bulk_container.delete_blob(name)
+            except ResourceNotFoundError:
+                pass
+        self._groups = {}
+        return entries
+
+
+class ShardReader:
+    """
+    Streams documents out of the bulk container.
+
+    Consecutive blocks are coalesced into range reads of up to
+    `max_request_bytes`, so a whole shard usually costs a single GET while
+    memory stays bounded by one request's worth of compressed data.
+    """
+
+    def __init__(self, bulk_container, max_request_bytes: int = 4 * 1024 * 1024):
+        self.container = bulk_container
+        self.max_request_bytes = max_request_bytes
+        self.requests = 0
+
+    def manifest(self) -> dict:
+        self.requests += 1
+        return load_manifest(self.container)
+
+    def shards(self, category: str = None, since: str = None, until: str = None) -> list:
+        """Manifest entries matching the filters, newest run first."""
+        selected = [
+            s for s in self.manifest()["shards"]
+            if (category is None or s["category"] == category)
+            and (since is None or s.get("last_day", s["day"]) >= since)
+            and (until is None or s["day"] <= until)
+        ]
+        return sorted(selected, key=lambda s: s["run"], reverse=True)
+
+    def _ranges(self, shard: dict):
+        group = []
+        for block in shard["blocks"]:
+            if group and sum(b["length"] for b in group) + block["length"] > self.max_request_bytes:
+                yield group
+                group = []
+            group.append(block)
+        if group:
+            yield group
+
+    def iter_shard(self, shard: dict):
+        for group in self._ranges(shard):
+            offset = group[0]["offset"]
+            length = sum(b["length"] for b in group)
+            self.requests += 1
+            data = self.container.download_blob(shard["blob"], offset=offset, length=length).readall()
+            for block in group:
+                start = block["offset"] - offset
+                yield from _decode_block(data[start:start + block["length"]])
+
+    def iter_docs(self, category: str = None, since: str = None, until: str = None, dedupe: bool = True):
+        """
+        Yields every document in the corpus. With `dedupe` an article that
+        several runs re-ingested is returned once, in its latest version.
+        """
+        seen = set()
+        for shard in self.shards(category, since, until):
+            # Sıkıştırılmış shard birden çok günü kapsar; aralık dışını ele
+            spans = shard.get("last_day", shard["day"]) != shard["day"]
+            for doc in self.iter_shard(shard):
+                if spans and ((since and _doc_day(doc) < since) or (until and _doc_day(doc) > until)):
+                    continue
+                if dedupe:
+                    if doc["id"] in seen:
+                        continue
+                    seen.add(doc["id"])
+                yield doc
@@ -0,0 +1,356 @@
+"""
+Client-side rate limiting for NewsAPI, the Language service, Blob Storage
+and the embeddings provider.
+
+Every outgoing call goes through a RateLimiter, which gives each service
+
+* a token bucket (`rate` requests/s, bursts of up to `burst`) shared by all
+  threads and tasks, so concurrent workers pace themselves instead of
+  running into 429s;
+* retries with jittered exponential backoff for throttling and transient
+  errors. A Retry-After header is honoured and pauses the whole bucket, not
+  just the request that got it;
+* optionally a daily budget. NewsAPI's developer plan allows 100 requests
+  per 24 hours; the requests spent are kept in a ledger parked in the state
+  container, so back-to-back runs share the allowance. Once it is used up,
+  calls raise BudgetExhausted instead of hitting the API.
+
+The limiter is the only retry layer: the Azure clients are built with the
+SDK's own retries off (ingest_clients.SDK_RETRY_TOTAL), so every attempt is
+paced and charged to the budget exactly once. The status polls of a
+long-running operation (begin_analyze_actions) are sent by the SDK's poller;
+a PollCounter in the Language clients' pipeline charges them to the same
+bucket and budget as they go out. A
+failed poll is not retried; the caller's fallback (local enrichment) takes
+over.
+
+Limits come from the environment (NEWSAPI_RPS, NEWSAPI_DAILY_LIMIT,
+LANGUAGE_RPS, BLOB_RPS, EMBEDDINGS_RPS, EMBEDDINGS_DAILY_LIMIT); a rate of 0 turns off pacing for that service, but
+429s still pause it.
+"""
+import os
+import json
+import time
+import random
+import asyncio
+import inspect
+import threading
+import contextlib
+
+import httpx
+from newsapi.newsapi_exception import NewsAPIException
+from azure.core.pipeline.policies import SansIOHTTPPolicy
+from azure.core.exceptions import (
+    HttpResponseError,
+    ServiceRequestError,
+    ResourceNotFoundError,
+    ResourceExistsError,
+)
+
+LEDGER_BLOB_NAME = "budget_ledger.json"
+LEDGER_WINDOW = 24 * 3600
+
+RETRYABLE_STATUS = {408, 429, 500, 502, 503, 504}
+RETRYABLE_NEWSAPI_CODES = {"rateLimited", "unexpectedError"}
+
+# Servis başına sarılan client metotları
+LIMITED_METHODS = {
+    "newsapi": {"get_top_headlines", "get_everything", "get_sources"},
+    "language": {"begin_analyze_actions", "analyze_sentiment", "extract_key_phrases"},
+    "blob": {"upload_blob", "download_blob", "delete_blob"},
+}
+
+
+class BudgetExhausted(Exception):
+    def __init__(self, service: str, limit: int):
+        super().__init__(f"{service} daily budget of {limit} requests is used up")
+        self.service = service
+        self.limit = limit
+
+
+class ServicePolicy:
+    def __init__(self, rate: float = None, burst: int = 1, daily_limit: int = None,
+                 max_retries: int = 5, backoff_base: float = 0.5, backoff_cap: float = 30.0):
+        self.rate = rate or None
+        self.burst = burst
+        self.daily_limit = daily_limit
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+
+
+def default_policies() -> dict:
+    env = os.getenv
+    return {
+        "newsapi": ServicePolicy(rate=float(env("NEWSAPI_RPS", "2")), burst=5,
+                                 daily_limit=int(env("NEWSAPI_DAILY_LIMIT", "100"))),
+        "language": ServicePolicy(rate=float(env("LANGUAGE_RPS", "10")), burst=10),
+        "blob": ServicePolicy(rate=float(env("BLOB_RPS", "0")), burst=50),
+        "embeddings": ServicePolicy(rate=float(env("EMBEDDINGS_RPS", "5")), burst=5,
+                                    daily_limit=int(env("EMBEDDINGS_DAILY_LIMIT", "0")) or None),
+    }
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket, kept as a "theoretical arrival time": a caller
+    reserves the next slot and sleeps until it is due, so sync threads and
+    asyncio tasks can share one bucket without holding the lock while waiting.
+    """
+
+    def __init__(self, rate: float = None, burst: int = 1):
+        # rate=None: tempo yok, sadece pause() ile kapanan bir kapı
+        self.interval = 1.0 / rate if rate else 0.0
+        self.tolerance = (max(1, burst) - 1) * self.interval
+        self._tat = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """Takes one token; returns the seconds to wait before using it."""
+        with self._lock:
+            now = time.monotonic()
+            tat = max(self._tat, now)
+            self._tat = tat + self.interval
+            return max(0.0, tat - self.tolerance - now)
+
+    def pause(self, seconds: float):
+        """No token is handed out for `seconds`; afterwards they come one interval apart."""
+        with self._lock:
+            self._tat = max(self._tat, time.monotonic() + seconds + self.tolerance)
+
+
+class BudgetLedger:
+    """Timestamps of the requests spent per service over the last 24 hours."""
+
+    def __init__(self, spent: dict = None, window: float = LEDGER_WINDOW):
+        self.window = window
+        self.spent = spent or {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, state_container):
+        try:
+            spent = json.loads(state_container.download_blob(LEDGER_BLOB_NAME).readall())
+        except ResourceNotFoundError:
+            spent = {}
+        return cls(spent)
+
+    def _prune(self, service: str, now: float) -> list:
+        stamps = [t for t in self.spent.get(service, []) if now - t < self.window]
+        self.spent[service] = stamps
+        return stamps
+
+    def used(self, service: str) -> int:
+        with self._lock:
+            return len(self._prune(service, time.time()))
+
+    def spend(self, service: str, limit: int):
+        with self._lock:
+            now = time.time()
+            stamps = self._prune(service, now)
+            if len(stamps) >= limit:
+                raise BudgetExhausted(service, limit)
+            stamps.append(now)
+
+    def save(self, state_container):
+        try:
+            state_container.create_container()
+        except ResourceExistsError:
+            pass
+        with self._lock:
+            data = json.dumps(self.spent)
+        state_container.upload_blob(LEDGER_BLOB_NAME, data, overwrite=True)
+
+
+def retry_after(err) -> float:
+    """Server-requested delay in seconds, or None."""
+    headers = getattr(getattr(err, "response", None), "headers", None) or {}
+    for name, scale in (("retry-after-ms", 0.001), ("x-ms-retry-after-ms", 0.001), ("Retry-After", 1.0)):
+        value = headers.get(name) or headers.get(name.lower())
+        if value is None:
+            continue
+        try:
+            return float(value) * scale
+        except ValueError:
+            # HTTP-date biçimi; backoff'a bırak
+            return None
+    return None
+
+
+def classify(err):
+    """(retryable, throttled) for an exception raised by one of the clients."""
+    if isinstance(err, NewsAPIException):
+        code = err.get_code()
+        return code in RETRYABLE_NEWSAPI_CODES, code == "rateLimited"
+    if isinstance(err, (ServiceRequestError, httpx.TransportError)):
+        return True, False
+    if isinstance(err, httpx.HTTPStatusError):
+        status = err.response.status_code
+        return status in RETRYABLE_STATUS, status == 429
+    if isinstance(err, HttpResponseError):
+        status = err.status_code or getattr(err.response, "status_code", None)
+        return status in RETRYABLE_STATUS, status == 429
+    return False, False
+
+
+class ServiceStats:
+    def __init__(self):
+        self.calls = 0
+        self.polls = 0
+        self.retries = 0
+        self.throttled = 0
+        self.waited = 0.0
+
+    def __str__(self):
+        polls = f" polls={self.polls}" if self.polls else ""
+        return f"calls={self.calls}{polls} retries={self.retries} throttled={self.throttled} waited={self.waited:.1f}s"
+
+
+class RateLimiter:
+    def __init__(self, policies: dict = None, ledger: BudgetLedger = None, seed: int = None):
+        self.policies = policies or default_policies()
+        self.ledger = ledger
+        self.buckets = {name: TokenBucket(p.rate, p.burst) for name, p in self.policies.items()}
+        self.stats = {name: ServiceStats() for name in self.policies}
+        self._rng = random.Random(seed)
+
+    def _admit(self, service: str) -> float:
+        """Budget check + token; returns the seconds to wait before sending."""
+        policy = self.policies[service]
+        if self.ledger is not None and policy.daily_limit is not None:
+            self.ledger.spend(service, policy.daily_limit)
+        self.stats[service].calls += 1
+        wait = self.buckets[service].reserve()
+        self.stats[service].waited += wait
+        return wait
+
+    def observe(self, service: str):
+        """Charges a request the SDK sends on its own (an LRO status poll) to the bucket and budget."""
+        policy = self.policies[service]
+        if self.ledger is not None and policy.daily_limit is not None:
+            self.ledger.spend(service, policy.daily_limit)
+        self.stats[service].polls += 1
+        # Beklemez: poll zaten gidiyor, token'ı harcar ve sonraki çağrı bekler
+        self.buckets[service].reserve()
+
+    def _backoff(self, service: str, err, attempt: int) -> float:
+        """Delay before the next attempt, or None when `err` should propagate."""
+        policy = self.policies[service]
+        retryable, throttled = classify(err)
+        if not retryable or attempt >= policy.max_retries:
+            return None
+        stats = self.stats[service]
+        stats.retries += 1
+        # Full jitter; Retry-After varsa en az o kadar bekle
+        delay = self._rng.uniform(0, min(policy.backoff_cap, policy.backoff_base * 2 ** attempt))
+        server_delay = retry_after(err)
+        if server_delay is not None:
+            delay = server_delay + self._rng.uniform(0, policy.backoff_base)
+        if throttled:
+            stats.throttled += 1
+            # Diğer worker'lar da beklesin; yoksa hepsi ayrı ayrı 429 toplar
+            self.buckets[service].pause(delay)
+        stats.waited += delay
+        return delay
+
+    def call(self, service: str, fn, *args, **kwargs):
+        attempt = 0
+        while True:
+            wait = self._admit(service)
+            if wait:
+                time.sleep(wait)
+            try:
+                return fn(*args, **kwargs)
+            except (NewsAPIException, HttpResponseError, ServiceRequestError, httpx.HTTPError) as e:
+                delay = self._backoff(service, e, attempt)
+                if delay is None:
+                    raise
+            time.sleep(delay)
+            attempt += 1
+
+    async def call_async(self, service: str, fn, *args, **kwargs):
+        attempt = 0
+        while True:
+            wait = self._admit(service)
+            if wait:
+                await asyncio.sleep(wait)
+            try:
+                return await fn(*args, **kwargs)
+            except (HttpResponseError, ServiceRequestError) as e:
+                delay = self._backoff(service, e, attempt)
+                if delay is None:
+                    raise
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    def wrap(self, client, service: str):
+        return _Limited(client, self, service, LIMITED_METHODS[service])
+
+    def summary(self) -> str:
+        parts = [f"{name}: {stats}" for name, stats in self.stats.items() if stats.calls]
+        for name, policy in self.policies.items():
+            if self.ledger is not None and policy.daily_limit is not None:
+                parts.append(f"{name} budget {self.ledger.used(name)}/{policy.daily_limit} in 24h")
+        return "rate limits: " + ("; ".join(parts) or "no calls")
+
+
+class _Limited:
+    """Proxy that routes a client's request methods through the limiter."""
+
+    def __init__(self, client, limiter: RateLimiter, service: str, methods: set):
+        self._client = client
+        self._limiter = limiter
+        self._service = service
+        self._methods = methods
+
+    def __getattr__(self, name):
+        attr = getattr(self._client, name)
+        if name not in self._methods:
+            return attr
+        limiter, service = self._limiter, self._service
+        if inspect.iscoroutinefunction(attr):
+            async def limited_async(*args, **kwargs):
+                return await limiter.call_async(service, attr, *args, **kwargs)
+            return limited_async
+
+        def limited(*args, **kwargs):
+            return limiter.call(service, attr, *args, **kwargs)
+        return limited
+
+
+class PollCounter(SansIOHTTPPolicy):
+    """
+    Pipeline policy for the Language clients: charges the status polls of
+    long-running operations, which the SDK's poller sends on its own, to the
+    limiter it is attached to. Every Language request the ingester makes
+    itself is a POST through RateLimiter.call, so GETs are exactly the polls.
+    """
+
+    def __init__(self, service: str = "language"):
+        self.service = service
+        self.limiter = None  # LimitedClients bağlar
+
+    def on_request(self, request):
+        if self.limiter is not None and request.http_request.method == "GET":
+            self.limiter.observe(self.service)
+
+
+class LimitedClients:
+    """Same shape as ingest_clients.AzureClients, every client behind `limiter`."""
+
+    def __init__(self, clients, limiter: RateLimiter):
+        self.inner = clients
+        self.limiter = limiter
+        polls = getattr(clients, "lang_polls", None)
+        if polls is not None:
+            polls.limiter = limiter
+        self.newsapi = limiter.wrap(clients.newsapi, "newsapi")
+        self.lang = limiter.wrap(clients.lang, "language")
+        self.container = limiter.wrap(clients.container, "blob")
+        self.state_container = limiter.wrap(clients.state_container, "blob")
+        self.bulk_container = limiter.wrap(clients.bulk_container, "blob")
+
+    @contextlib.asynccontextmanager
+    async def async_clients(self):
+        async with self.inner.async_clients() as (lang, container):
+            yield self.limiter.wrap(lang, "language"), self.limiter.wrap(container, "blob")
@@ -0,0 +1,131 @@
+"""
+Daily article counts by category × source × sentiment, written at ingest.
+
+The ingester records every uploaded article in an SQLite file parked in the
+state container, like the fingerprint index:
+
+    rollup_members  url → (day, category, source, sentiment) it is counted under
+    rollup_counts   (day, category, source, sentiment) → count
+
+Adding an article that is already counted under the same cell is a no-op;
+if it moved (re-published on another day, sentiment re-enriched), the old
+cell is decremented first. Re-runs and --full rebuilds therefore never
+double-count, and a run costs O(its uploads).
+
+At the end of a run every month the run touched is exported as one small
+blob, rollups/YYYY-MM.json:
+
+    {"month": "2025-01",
+     "values": {"category": [...], "source": [...], "sentiment": [...]},
+     "days": {"2025-01-28": [[category_no, source_no, sentiment_no, count], ...]}}
+
+The backend answers range queries from those blobs alone, so a month-long
+time series is one or two reads, whatever the size of the corpus.
+"""
+import os
+import sqlite3
+
+ROLLUP_BLOB_NAME = "rollups.sqlite"
+ROLLUP_BLOB_PREFIX = "rollups/"
+DIMENSIONS = ("category", "source", "sentiment")
+# Zenginleştirmesi başarısız makalelerin sentiment'i
+UNKNOWN = "unknown"
+
+
+def month_blob_name(month: str) -> str:
+    return f"{ROLLUP_BLOB_PREFIX}{month}.json"
+
+
+def rollup_cell(doc: dict) -> tuple:
+    """(day, category, source, sentiment) an article is counted under."""
+    return (
+        str(doc["published"])[:10],
+        doc.get("category") or "general",
+        doc.get("source") or UNKNOWN,
+        doc.get("sentiment") or UNKNOWN,
+    )
+
+
+class RollupStore:
+    def __init__(self, path: str):
+        self.path = path
+        self.touched = set()  # bu run'da değişen aylar
+        self.added = 0
+        self.moved = 0
+
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.conn = sqlite3.connect(path)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS rollup_members ("
+            " url TEXT PRIMARY KEY,"
+            " day TEXT NOT NULL,"
+            " category TEXT NOT NULL,"
+            " source TEXT NOT NULL,"
+            " sentiment TEXT NOT NULL)"
+        )
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS rollup_counts ("
+            " day TEXT NOT NULL,"
+            " category TEXT NOT NULL,"
+            " source TEXT NOT NULL,"
+            " sentiment TEXT NOT NULL,"
+            " count INTEGER NOT NULL,"
+            " PRIMARY KEY (day, category, source, sentiment))"
+        )
+
+    def add(self, doc: dict) -> bool:
+        """Counts an uploaded article; False if it already is, under the same cell."""
+        cell = rollup_cell(doc)
+        old = self.conn.execute(
+            "SELECT day, category, source, sentiment FROM rollup_members WHERE url = ?", (doc["url"],)
+        ).fetchone()
+        if old == cell:
+            return False
+        if old is not None:
+            self._bump(old, -1)
+            self.moved += 1
+        else:
+            self.added += 1
+        self.conn.execute(
+            "INSERT OR REPLACE INTO rollup_members (url, day, category, source, sentiment) VALUES (?, ?, ?, ?, ?)",
+            (doc["url"], *cell),
+        )
+        self._bump(cell, 1)
+        return True
+
+    def _bump(self, cell: tuple, delta: int):
+        self.conn.execute(
+            "INSERT INTO rollup_counts (day, category, source, sentiment, count) VALUES (?, ?, ?, ?, ?)"
+            " ON CONFLICT (day, category, source, sentiment) DO UPDATE SET count = count + excluded.count",
+            (*cell, delta),
+        )
+        if delta < 0:
+            self.conn.execute(
+                "DELETE FROM rollup_counts WHERE day = ? AND category = ? AND source = ? AND sentiment = ?"
+                " AND count <= 0",
+                cell,
+            )
+        self.touched.add(cell[0][:7])
+
+    def month(self, month: str) -> dict:
+        """The rollup blob of one month (YYYY-MM)."""
+        values = {dim: {} for dim in DIMENSIONS}
+        days = {}
+        for day, *cell, count in self.conn.execute(
+            "SELECT day, category, source, sentiment, count FROM rollup_counts"
+            " WHERE day >= ? AND day < ? ORDER BY day, category, source, sentiment",
+            (month, month + "~"),
+        ):
+            # Değerler ay başına bir kez yazılır, hücreler indeksle
+            codes = [values[dim].setdefault(v, len(values[dim])) for dim, v in zip(DIMENSIONS, cell)]
+            days.setdefault(day, []).append([*codes, count])
+        return {"month": month, "values": {dim: list(v) for dim, v in values.items()}, "days": days}
+
+    def summary(self) -> str:
+        months = ", ".join(sorted(self.touched)) or "none"
+        return f"rollups: {self.added} articles counted, {self.moved} moved; months updated: {months}"
+
+    def close(self):
+        self.conn.commit()
+        self.conn.close()
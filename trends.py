@@ -0,0 +1,244 @@
+"""
+Keyphrase trends, maintained incrementally by the ingester.
+
+Every uploaded article adds one mention of each of its key phrases to its
+category, in three places:
+
+* hourly and daily bucket counts, kept for TREND_HOURS hours and
+  TREND_DAYS days;
+* a fast and a slow exponentially decayed counter per (category, phrase),
+  with half-lives FAST_HALF_LIFE and SLOW_HALF_LIFE hours.
+
+Decay is lazy: a counter stores its value as of `updated` and is only
+brought forward when a new mention arrives or when it is ranked. A run
+therefore costs O(key phrases of its new articles), never a corpus rescan.
+Mentions that arrive out of order are decayed back to `updated` instead.
+Articles are counted once per URL, so re-uploads do not inflate counts.
+
+The burst score is how far the fast counter sits above what the slow
+baseline predicts for it, in Poisson standard deviations. With a steady
+rate both counters settle at rate × half-life / ln 2, so:
+
+    expected = slow · FAST_HALF_LIFE / SLOW_HALF_LIFE
+    burst    = (fast − expected) / √(expected + 1)
+
+The store is an SQLite file parked in the state container like the
+fingerprint index. After each run the ingester writes the top rising phrases
+per category to trends.json, which the backend serves with a single read.
+"""
+import os
+import math
+import time
+import sqlite3
+from datetime import datetime, timezone
+
+TRENDS_BLOB_NAME = "trends.sqlite"
+TRENDS_SNAPSHOT_BLOB_NAME = "trends.json"
+FAST_HALF_LIFE = 6.0     # saat
+SLOW_HALF_LIFE = 168.0   # saat (7 gün)
+TREND_HOURS = 48
+TREND_DAYS = 30
+# Son 24 saatte bundan az geçen ifade sıralamaya girmez
+MIN_MENTIONS = 3
+
+
+def normalize_phrase(phrase: str) -> str:
+    return " ".join(str(phrase or "").lower().split())
+
+
+def parse_published(value: str):
+    """Epoch seconds of an ISO 8601 `published`, or None."""
+    try:
+        dt = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.timestamp()
+
+
+def iso_time(epoch: float, fmt: str = "%Y-%m-%dT%H:%M:%SZ") -> str:
+    return datetime.fromtimestamp(epoch, timezone.utc).strftime(fmt)
+
+
+def _decay(hours: float, half_life: float) -> float:
+    return 0.5 ** (hours / half_life)
+
+
+class TrendStore:
+    def __init__(self, path: str, fast_half_life: float = FAST_HALF_LIFE, slow_half_life: float = SLOW_HALF_LIFE,
+                 hours: int = TREND_HOURS, days: int = TREND_DAYS):
+        self.path = path
+        self.fast_half_life = fast_half_life
+        self.slow_half_life = slow_half_life
+        self.hours = hours
+        self.days = days
+        self.added = 0
+
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.conn = sqlite3.connect(path)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS trend_counters ("
+            " category TEXT NOT NULL,"
+            " phrase TEXT NOT NULL,"
+            " fast REAL NOT NULL,"
+            " slow REAL NOT NULL,"
+            " updated REAL NOT NULL,"
+            " PRIMARY KEY (category, phrase))"
+        )
+        for table, unit in (("trend_hours", "hour"), ("trend_days", "day")):
+            self.conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {table} ("
+                " category TEXT NOT NULL,"
+                " phrase TEXT NOT NULL,"
+                f" {unit} INTEGER NOT NULL,"
+                " count INTEGER NOT NULL,"
+                f" PRIMARY KEY (category, phrase, {unit}))"
+            )
+            self.conn.execute(f"CREATE INDEX IF NOT EXISTS {table}_{unit} ON {table}({unit})")
+        self.conn.execute("CREATE TABLE IF NOT EXISTS trend_seen (url TEXT PRIMARY KEY, published REAL NOT NULL)")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS trend_counters_updated ON trend_counters(updated)")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS trend_seen_published ON trend_seen(published)")
+
+    # ── Yazma ────────────────────────────────────────────
+    def add(self, doc: dict, now: float = None) -> bool:
+        """Counts the key phrases of an uploaded article; False if it was skipped."""
+        now = time.time() if now is None else now
+        published = parse_published(doc.get("published"))
+        phrases = {normalize_phrase(p) for p in doc.get("keyphrases") or []} - {""}
+        # Saklama süresinden eski makale hiçbir pencereye girmez
+        if published is None or not phrases or published < now - self.days * 86400:
+            return False
+        published = min(published, now)
+        cur = self.conn.execute("INSERT OR IGNORE INTO trend_seen (url, published) VALUES (?, ?)",
+                                (doc["url"], published))
+        if cur.rowcount == 0:
+            return False
+        category = doc.get("category") or "general"
+        for phrase in phrases:
+            self._mention(category, phrase, published)
+        self.added += 1
+        return True
+
+    def _mention(self, category: str, phrase: str, t: float):
+        row = self.conn.execute(
+            "SELECT fast, slow, updated FROM trend_counters WHERE category = ? AND phrase = ?", (category, phrase)
+        ).fetchone()
+        if row is None:
+            fast, slow, updated = 1.0, 1.0, t
+        else:
+            fast, slow, updated = row
+            if t >= updated:
+                hours = (t - updated) / 3600
+                fast = fast * _decay(hours, self.fast_half_life) + 1.0
+                slow = slow * _decay(hours, self.slow_half_life) + 1.0
+                updated = t
+            else:
+                hours = (updated - t) / 3600
+                fast += _decay(hours, self.fast_half_life)
+                slow += _decay(hours, self.slow_half_life)
+        self.conn.execute(
+            "INSERT OR REPLACE INTO trend_counters (category, phrase, fast, slow, updated) VALUES (?, ?, ?, ?, ?)",
+            (category, phrase, fast, slow, updated),
+        )
+        for table, unit, bucket in (("trend_hours", "hour", int(t // 3600)), ("trend_days", "day", int(t // 86400))):
+            self.conn.execute(
+                f"INSERT INTO {table} (category, phrase, {unit}, count) VALUES (?, ?, ?, 1)"
+                f" ON CONFLICT (category, phrase, {unit}) DO UPDATE SET count = count + 1",
+                (category, phrase, bucket),
+            )
+
+    def prune(self, now: float = None) -> int:
+        """Drops buckets and seen URLs that fell out of their windows."""
+        now = time.time() if now is None else now
+        removed = 0
+        for sql, arg in (
+            ("DELETE FROM trend_hours WHERE hour < ?", int(now // 3600) - self.hours + 1),
+            ("DELETE FROM trend_days WHERE day < ?", int(now // 86400) - self.days + 1),
+            ("DELETE FROM trend_seen WHERE published < ?", now - self.days * 86400),
+            # Yavaş sayaç bile 1/1000'in altına indiyse satır taşımaya değmez
+            ("DELETE FROM trend_counters WHERE updated < ?", now - 10 * self.slow_half_life * 3600),
+        ):
+            removed += self.conn.execute(sql, (arg,)).rowcount
+        return removed
+
+    # ── Okuma ────────────────────────────────────────────
+    def categories(self) -> list:
+        return [r[0] for r in self.conn.execute("SELECT DISTINCT category FROM trend_counters ORDER BY category")]
+
+    def top(self, category: str, n: int = 20, now: float = None, min_mentions: int = MIN_MENTIONS) -> list:
+        """Top `n` rising phrases of a category, highest burst first."""
+        now = time.time() if now is None else now
+        first_hour = int(now // 3600) - self.hours + 1
+        first_day = int(now // 86400) - self.days + 1
+        # Sadece pencere içinde geçen ifadeler aday; daha eskilerin hızlı sayacı sönmüştür
+        recent = dict(self.conn.execute(
+            "SELECT phrase, SUM(count) FROM trend_hours WHERE category = ? AND hour > ? GROUP BY phrase",
+            (category, int(now // 3600) - 24),
+        ))
+        candidates = [p for p, c in recent.items() if c >= min_mentions]
+        rows = []
+        for start in range(0, len(candidates), 500):
+            chunk = candidates[start:start + 500]
+            rows += self.conn.execute(
+                "SELECT phrase, fast, slow, updated FROM trend_counters WHERE category = ?"
+                f" AND phrase IN ({', '.join('?' * len(chunk))})",
+                [category, *chunk],
+            ).fetchall()
+
+        ranked = []
+        for phrase, fast, slow, updated in rows:
+            hours = max(0.0, (now - updated) / 3600)
+            fast *= _decay(hours, self.fast_half_life)
+            slow *= _decay(hours, self.slow_half_life)
+            expected = slow * self.fast_half_life / self.slow_half_life
+            burst = (fast - expected) / math.sqrt(expected + 1.0)
+            ranked.append((burst, phrase, fast, expected))
+        ranked.sort(key=lambda r: (-r[0], r[1]))
+
+        out = []
+        for burst, phrase, fast, expected in ranked[:n]:
+            hourly = [0] * self.hours
+            for hour, count in self.conn.execute(
+                "SELECT hour, count FROM trend_hours WHERE category = ? AND phrase = ? AND hour >= ?",
+                (category, phrase, first_hour),
+            ):
+                hourly[hour - first_hour] = count
+            daily = [0] * self.days
+            for day, count in self.conn.execute(
+                "SELECT day, count FROM trend_days WHERE category = ? AND phrase = ? AND day >= ?",
+                (category, phrase, first_day),
+            ):
+                daily[day - first_day] = count
+            out.append({
+                "phrase": phrase,
+                "burst": round(burst, 3),
+                "fast": round(fast, 3),
+                "expected": round(expected, 3),
+                "last_24h": recent[phrase],
+                "hourly": hourly,
+                "daily": daily,
+            })
+        return out
+
+    def snapshot(self, n: int = 50, now: float = None) -> dict:
+        """What the backend serves: top rising phrases of every category."""
+        now = time.time() if now is None else now
+        return {
+            "generated": iso_time(now),
+            "fast_half_life_hours": self.fast_half_life,
+            "slow_half_life_hours": self.slow_half_life,
+            # hourly[i] → hour_start + i saat, daily[i] → day_start + i gün
+            "hour_start": iso_time((int(now // 3600) - self.hours + 1) * 3600),
+            "day_start": iso_time((int(now // 86400) - self.days + 1) * 86400, "%Y-%m-%d"),
+            "categories": {c: self.top(c, n, now) for c in self.categories()},
+        }
+
+    def summary(self) -> str:
+        phrases = self.conn.execute("SELECT COUNT(*) FROM trend_counters").fetchone()[0]
+        return f"trends: {self.added} articles counted, {phrases} tracked phrases"
+
+    def close(self):
+        self.conn.commit()
+        self.conn.close()
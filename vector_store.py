@@ -0,0 +1,307 @@
+"""
+Article embeddings as one contiguous float32 matrix on disk.
+
+    {path}/meta.json     {"spec", "dim", "count", "epoch"}
+    {path}/vectors.f32   count × dim float32, row-major, append-only
+    {path}/keys.txt      document key of each row, one per line
+
+Readers memory-map the matrix, so opening a store costs nothing and the OS
+page cache is shared by every backend worker. `meta.json` is rewritten last
+on append, so a reader only ever sees rows that are fully written. When a
+document is embedded again, the new row wins and the old one is masked out.
+When an ingest run leaves more than COMPACT_RATIO of the rows masked, the
+writer rewrites the store with only the live rows and bumps `epoch`, so a
+re-embedding run does not grow the store without bound.
+
+Queries are brute force (a batched matrix product over row chunks) or, for
+large stores, an IVF index (k-means coarse quantiser): only the rows of the
+`nprobe` closest lists are scored, plus any rows appended after the IVF was
+built. The IVF is saved next to the matrix as ivf.npz.
+"""
+import os
+import json
+
+import numpy as np
+
+META_NAME = "meta.json"
+VECTORS_NAME = "vectors.f32"
+KEYS_NAME = "keys.txt"
+IVF_NAME = "ivf.npz"
+# Skor hesabında bir seferde taşınan satır sayısı (bellek sınırı)
+CHUNK_ROWS = 65536
+# Maskelenmiş satırlar bu oranı geçince store run sonunda compact() edilir
+COMPACT_RATIO = 0.25
+
+
+def top_k(scores: np.ndarray, k: int):
+    """(indices, scores) of the k largest entries of each row, best first."""
+    k = min(k, scores.shape[1])
+    if k <= 0:
+        empty = np.zeros((scores.shape[0], 0))
+        return empty.astype(np.int64), empty
+    idx = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    part = np.take_along_axis(scores, idx, axis=1)
+    order = np.argsort(-part, axis=1, kind="stable")
+    return np.take_along_axis(idx, order, axis=1), np.take_along_axis(part, order, axis=1)
+
+
+class VectorStore:
+    def __init__(self, path: str, spec: str, dim: int, count: int = 0, epoch: int = 0):
+        self.path = path
+        self.spec = spec
+        self.dim = dim
+        self.count = count
+        self.epoch = epoch  # compact() satır numaralarını değiştirince artar
+        self._matrix = None
+        self._keys = None
+        self._rows = None
+        self._valid = None
+
+    # ── Açma / yazma ─────────────────────────────────────
+    @classmethod
+    def open(cls, path: str):
+        """The store at `path`, or None if nothing was written there yet."""
+        try:
+            with open(os.path.join(path, META_NAME)) as f:
+                meta = json.load(f)
+        except FileNotFoundError:
+            return None
+        return cls(path, meta["spec"], meta["dim"], meta["count"], meta.get("epoch", 0))
+
+    @classmethod
+    def create(cls, path: str, spec: str, dim: int):
+        os.makedirs(path, exist_ok=True)
+        store = cls(path, spec, dim)
+        open(os.path.join(path, VECTORS_NAME), "wb").close()
+        open(os.path.join(path, KEYS_NAME), "w").close()
+        store._write_meta()
+        return store
+
+    def _write_meta(self):
+        tmp = os.path.join(self.path, META_NAME + ".tmp")
+        with open(tmp, "w") as f:
+            json.dump({"spec": self.spec, "dim": self.dim, "count": self.count, "epoch": self.epoch}, f)
+        os.replace(tmp, os.path.join(self.path, META_NAME))
+
+    def append(self, keys: list, vectors: np.ndarray):
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        if vectors.shape != (len(keys), self.dim):
+            raise ValueError(f"expected {len(keys)}×{self.dim} vectors, got {vectors.shape}")
+        if not keys:
+            return
+        # Yarım kalmış bir önceki append'in artıklarını kes
+        with open(os.path.join(self.path, VECTORS_NAME), "r+b") as f:
+            f.truncate(self.count * self.dim * 4)
+            f.seek(0, os.SEEK_END)
+            f.write(vectors.tobytes())
+        with open(os.path.join(self.path, KEYS_NAME), "r+", encoding="utf-8") as f:
+            lines = f.read().splitlines()
+            if len(lines) != self.count:
+                f.seek(0)
+                f.truncate()
+                f.write("".join(k + "\n" for k in lines[: self.count]))
+            f.write("".join(k + "\n" for k in keys))
+        self.count += len(keys)
+        self._write_meta()
+        self._matrix = self._keys = self._rows = self._valid = None
+
+    def compact(self) -> int:
+        """Rewrites the store with only the latest row of each key; returns the rows dropped."""
+        keep = np.flatnonzero(self.valid)
+        dropped = self.count - len(keep)
+        if not dropped:
+            return 0
+        vectors_tmp = os.path.join(self.path, VECTORS_NAME + ".tmp")
+        with open(vectors_tmp, "wb") as f:
+            for start in range(0, len(keep), CHUNK_ROWS):
+                f.write(np.ascontiguousarray(self.matrix[keep[start:start + CHUNK_ROWS]]).tobytes())
+        keys_tmp = os.path.join(self.path, KEYS_NAME + ".tmp")
+        keys = self.keys
+        with open(keys_tmp, "w", encoding="utf-8") as f:
+            f.write("".join(keys[i] + "\n" for i in keep))
+        self._matrix = self._keys = self._rows = self._valid = None
+        os.replace(vectors_tmp, os.path.join(self.path, VECTORS_NAME))
+        os.replace(keys_tmp, os.path.join(self.path, KEYS_NAME))
+        self.count = len(keep)
+        self.epoch += 1
+        self._write_meta()
+        return dropped
+
+    # ── Okuma ────────────────────────────────────────────
+    @property
+    def matrix(self) -> np.ndarray:
+        if self._matrix is None:
+            if self.count == 0:
+                self._matrix = np.zeros((0, self.dim), dtype=np.float32)
+            else:
+                self._matrix = np.memmap(os.path.join(self.path, VECTORS_NAME), dtype=np.float32,
+                                         mode="r", shape=(self.count, self.dim))
+        return self._matrix
+
+    @property
+    def keys(self) -> list:
+        if self._keys is None:
+            with open(os.path.join(self.path, KEYS_NAME), encoding="utf-8") as f:
+                self._keys = f.read().splitlines()[: self.count]
+        return self._keys
+
+    @property
+    def rows(self) -> dict:
+        """key → latest row."""
+        if self._rows is None:
+            self._rows = {k: i for i, k in enumerate(self.keys)}
+        return self._rows
+
+    @property
+    def dead(self) -> float:
+        """Fraction of rows a later row of the same key replaced."""
+        return 1 - len(self.rows) / self.count if self.count else 0.0
+
+    @property
+    def valid(self) -> np.ndarray:
+        """False for rows a later row of the same key replaced."""
+        if self._valid is None:
+            valid = np.zeros(self.count, dtype=np.bool_)
+            valid[list(self.rows.values())] = True
+            self._valid = valid
+        return self._valid
+
+    def vector(self, key: str):
+        row = self.rows.get(key)
+        return None if row is None else np.array(self.matrix[row])
+
+    def search(self, queries: np.ndarray, k: int, rows: np.ndarray = None):
+        """
+        Brute-force top-k by inner product (cosine for normalised vectors)
+        for a batch of queries; only over `rows` if given. Returns (rows, scores).
+        """
+        queries = np.atleast_2d(np.asarray(queries, dtype=np.float32))
+        best_rows = np.zeros((len(queries), 0), dtype=np.int64)
+        best_scores = np.zeros((len(queries), 0), dtype=np.float32)
+        candidates = np.flatnonzero(self.valid) if rows is None else rows[self.valid[rows]]
+        for start in range(0, len(candidates), CHUNK_ROWS):
+            chunk = candidates[start:start + CHUNK_ROWS]
+            if rows is None and len(chunk) and chunk[-1] - chunk[0] == len(chunk) - 1:
+                block = self.matrix[chunk[0]:chunk[-1] + 1]  # ardışık: kopyasız dilim
+            else:
+                block = self.matrix[chunk]
+            idx, scores = top_k(queries @ block.T, k)
+            best_rows = np.concatenate([best_rows, chunk[idx]], axis=1)
+            best_scores = np.concatenate([best_scores, scores], axis=1)
+            if best_rows.shape[1] > k:
+                idx, best_scores = top_k(best_scores, k)
+                best_rows = np.take_along_axis(best_rows, idx, axis=1)
+        return best_rows, best_scores
+
+
+class IVFIndex:
+    """Inverted-file index: rows grouped by their nearest k-means centroid."""
+
+    def __init__(self, centroids: np.ndarray, order: np.ndarray, offsets: np.ndarray, count: int, epoch: int = 0):
+        self.centroids = centroids
+        self.order = order        # satırlar liste sırasıyla
+        self.offsets = offsets    # liste i → order[offsets[i]:offsets[i + 1]]
+        self.count = count        # kurulduğu andaki satır sayısı
+        self.epoch = epoch        # kurulduğu store'un epoch'u; compact sonrası geçersiz
+
+    @classmethod
+    def build(cls, store: VectorStore, nlist: int = None, iters: int = 10, sample: int = 100_000, seed: int = 0):
+        n = store.count
+        nlist = nlist or max(1, int(np.sqrt(n)))
+        rng = np.random.default_rng(seed)
+        train = np.asarray(store.matrix[np.sort(rng.choice(n, size=min(n, sample), replace=False))])
+        centroids = train[rng.choice(len(train), size=min(nlist, len(train)), replace=False)].copy()
+        for _ in range(iters):
+            assign = cls._assign(train, centroids)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assign, train)
+            counts = np.bincount(assign, minlength=len(centroids))
+            moved = counts > 0
+            centroids[moved] = sums[moved] / counts[moved, None]
+            # Küresel k-means: merkezler de birim uzunlukta kalsın
+            centroids /= np.maximum(np.linalg.norm(centroids, axis=1, keepdims=True), 1e-12)
+
+        assign = np.concatenate([
+            cls._assign(np.asarray(store.matrix[s:s + CHUNK_ROWS]), centroids)
+            for s in range(0, n, CHUNK_ROWS)
+        ]) if n else np.zeros(0, dtype=np.int64)
+        order = np.argsort(assign, kind="stable")
+        offsets = np.concatenate([[0], np.cumsum(np.bincount(assign, minlength=len(centroids)))])
+        return cls(centroids, order, offsets, n, store.epoch)
+
+    @staticmethod
+    def _assign(vectors: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+        return np.argmax(vectors @ centroids.T, axis=1)
+
+    def candidates(self, query: np.ndarray, nprobe: int) -> np.ndarray:
+        lists = top_k((self.centroids @ query)[None, :], nprobe)[0][0]
+        return np.concatenate([self.order[self.offsets[i]:self.offsets[i + 1]] for i in lists])
+
+    def search(self, store: VectorStore, queries: np.ndarray, k: int, nprobe: int = 8):
+        queries = np.atleast_2d(np.asarray(queries, dtype=np.float32))
+        # IVF'ten sonra eklenen satırlar her sorguda tam taranır
+        tail = np.arange(self.count, store.count)
+        out_rows, out_scores = [], []
+        for q in queries:
+            rows = np.concatenate([self.candidates(q, nprobe), tail])
+            r, s = store.search(q, k, rows=rows)
+            out_rows.append(r[0])
+            out_scores.append(s[0])
+        return out_rows, out_scores
+
+    def save(self, path: str):
+        tmp = os.path.join(path, IVF_NAME + ".tmp.npz")
+        np.savez(tmp, centroids=self.centroids, order=self.order, offsets=self.offsets, count=self.count,
+                 epoch=self.epoch)
+        os.replace(tmp, os.path.join(path, IVF_NAME))
+
+    @classmethod
+    def load(cls, path: str):
+        try:
+            data = np.load(os.path.join(path, IVF_NAME))
+        except FileNotFoundError:
+            return None
+        epoch = int(data["epoch"]) if "epoch" in data.files else 0
+        return cls(data["centroids"], data["order"], data["offsets"], int(data["count"]), epoch)
+
+
+class VectorWriter:
+    """
+    Collects documents uploaded during an ingest run; close() embeds and
+    appends them in batches once the run is over, so a slow embeddings
+    provider never holds up the pipeline's event loop.
+    """
+
+    def __init__(self, store: VectorStore, embedder, batch: int = 256, compact_ratio: float = COMPACT_RATIO):
+        self.store = store
+        self.embedder = embedder
+        self.batch = batch
+        self.compact_ratio = compact_ratio
+        self.added = 0
+        self.dropped = 0
+        self._pending = []
+
+    def add(self, key: str, text: str):
+        # Sadece biriktirir; embed() close()'da, event loop dışında çağrılır
+        self._pending.append((key, text))
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def flush(self):
+        while self._pending:
+            keys, texts = zip(*self._pending[: self.batch])
+            self.store.append(list(keys), self.embedder.embed(list(texts)))
+            self.added += len(keys)
+            del self._pending[: self.batch]
+
+    def close(self):
+        """Flushes, then compacts the store if replaced rows exceed `compact_ratio`."""
+        self.flush()
+        if self.store.dead > self.compact_ratio:
+            self.dropped += self.store.compact()
+
+    def summary(self) -> str:
+        line = f"vectors: {self.added} embedded with {self.embedder.spec}, {self.store.count} rows in store"
+        return line + (f", {self.dropped} replaced rows compacted away" if self.dropped else "")